@@ -0,0 +1,295 @@
+"""
+Deduplicação das imagens do site por conteúdo (sha256).
+
+O repositório carrega cópias idênticas da mesma imagem em lugares diferentes
+(felipe_lei.jpg na raiz e em img/, figuras copiadas entre pastas), e cada
+ferramenta processava todas de novo. O AssetStore agrupa as fontes pelo hash
+do conteúdo (reaproveitando o cache de hashes do manifesto de build) e elege
+uma cópia canônica por grupo. Com --dedup, watermark_tiled/watermark_images
+processam só a primeira cópia de cada conteúdo e copiam as saídas para as
+demais; este script trata o site publicado:
+
+    python portfolio/assets.py                    # relatório das duplicatas
+    python portfolio/assets.py --map assets.json  # mapa duplicata -> canônica
+    python portfolio/assets.py --rewrite --prune  # referências -> canônica; remove as cópias
+    python portfolio/assets.py --link             # troca as cópias por symlinks relativos
+
+--rewrite reconhece caminhos relativos e as URLs do repositório no GitHub
+(raw.githubusercontent.com / github.com/.../raw/...), preservando o estilo da
+referência. --prune só apaga uma duplicata que nenhum arquivo de texto do site
+(HTML, CSS, JS, Markdown, JSON) cite mais.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+from batch import FileResult
+from manifest import BuildManifest, file_sha256
+
+SITE_ROOT = Path(__file__).resolve().parent.parent
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".tif", ".tiff"}
+TEXT_EXTS = {".html", ".css", ".js", ".md", ".json"}
+# Pastas que não fazem parte do site publicado ou são geradas (site_src: fonte do site_build.py)
+SKIP_DIRS = {".git", "node_modules", "unused_files", "responsive", "site_src"}
+# Em empate, a cópia em img/ é a canônica (é a pasta de assets do site)
+DEFAULT_PREFER = ["img"]
+REPO_URL_PREFIXES = [
+    "https://raw.githubusercontent.com/Felipeleii/LogikBioinfo/main/",
+    "https://github.com/Felipeleii/LogikBioinfo/raw/main/",
+]
+
+_REF_RE = re.compile(r'\b(src|href|data-full)="([^"]+)"|\bsrcset="([^"]+)"')
+
+
+class AssetStore:
+    """Fontes agrupadas por conteúdo; cada grupo tem uma cópia canônica."""
+
+    def __init__(self, manifest: Optional[BuildManifest] = None, prefer: Sequence[Path] = ()):
+        self.manifest = manifest
+        self.prefer = [Path(p).resolve() for p in prefer]
+        self.by_hash: Dict[str, List[Path]] = {}
+        self.hash_of: Dict[Path, str] = {}
+
+    def add(self, path: Path) -> Optional[str]:
+        """Registra path e devolve o hash (None para arquivos vazios, que não são assets)."""
+        path = Path(path).resolve()
+        if path in self.hash_of:
+            return self.hash_of[path]
+        if os.path.getsize(path) == 0:
+            return None
+        digest = self.manifest.source_hash(path) if self.manifest is not None else file_sha256(path)
+        self.hash_of[path] = digest
+        self.by_hash.setdefault(digest, []).append(path)
+        return digest
+
+    def scan(self, root: Path, exts: Iterable[str] = IMAGE_EXTS) -> "AssetStore":
+        exts = set(exts)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            for name in sorted(filenames):
+                if Path(name).suffix.lower() in exts:
+                    self.add(Path(dirpath) / name)
+        return self
+
+    def _rank(self, path: Path):
+        preferred = any(p in path.parents for p in self.prefer)
+        return (not preferred, len(path.parts), path.as_posix())
+
+    def canonical(self, path: Path) -> Path:
+        path = Path(path).resolve()
+        digest = self.hash_of.get(path)
+        if digest is None:
+            return path
+        return min(self.by_hash[digest], key=self._rank)
+
+    def duplicates(self) -> Dict[Path, List[Path]]:
+        """Canônica -> demais cópias, só para conteúdos repetidos."""
+        out = {}
+        for paths in self.by_hash.values():
+            if len(paths) > 1:
+                canon = min(paths, key=self._rank)
+                out[canon] = sorted((p for p in paths if p != canon), key=self._rank)
+        return out
+
+    def split(self, items: Sequence[Path]) -> Tuple[List[Path], Dict[Path, List[Path]]]:
+        """
+        Separa um lote em (fontes únicas a processar, canônica -> duplicatas do
+        lote). A ordem do lote é preservada; a primeira ocorrência de cada
+        conteúdo é a processada.
+        """
+        unique: List[Path] = []
+        dups: Dict[Path, List[Path]] = {}
+        first: Dict[str, Path] = {}
+        for item in items:
+            digest = self.add(item)
+            if digest is None or digest not in first:
+                if digest is not None:
+                    first[digest] = item
+                unique.append(item)
+            else:
+                dups.setdefault(first[digest], []).append(item)
+        return unique, dups
+
+
+def replicate_duplicates(
+    src: Path,
+    dups: Sequence[Path],
+    outputs_for: Callable[[Path], List[Path]],
+    manifest: Optional[BuildManifest] = None,
+    params: Optional[Dict] = None,
+    report=None,
+) -> None:
+    """
+    Replica as saídas já geradas de src para as duplicatas do mesmo conteúdo
+    (os nomes mudam, os bytes não). É cópia e não hardlink: as ferramentas
+    regravam as saídas no lugar, e um link propagaria a escrita de uma
+    duplicata que deixou de ser igual para a saída da canônica.
+    """
+    for dup in dups:
+        outputs = outputs_for(dup)
+        if manifest is not None and manifest.is_fresh(outputs, dup, params):
+            manifest.skipped += 1
+            if report is not None:
+                report.skipped(dup.name, outputs)
+            continue
+        try:
+            for out_src, out_dup in zip(outputs_for(src), outputs):
+                shutil.copyfile(out_src, out_dup)
+            res = FileResult(True, f"OK: {dup.name} -> {', '.join(p.name for p in outputs)} (duplicata de {src.name})")
+        except OSError as e:
+            res = FileResult(False, f"ERRO: {dup.name} -> {e}")
+        print(res.message)
+        if manifest is not None and res.ok:
+            manifest.record(outputs, dup, params)
+            manifest.built += 1
+        if report is not None:
+            report.record(dup.name, res, outputs)
+
+
+def add_dedup_args(parser) -> None:
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Processa uma vez cada conteúdo (sha256) e copia as saídas para as fontes idênticas.",
+    )
+
+
+def resolve_ref(ref: str, page: Path, site: Path) -> Tuple[Optional[Path], str]:
+    """Caminho local de uma referência e o prefixo de URL usado ('' para relativas)."""
+    for prefix in REPO_URL_PREFIXES:
+        if ref.startswith(prefix):
+            return (site / unquote(ref[len(prefix):])).resolve(), prefix
+    if re.match(r"^[a-z][a-z0-9+.-]*:|^//|^#", ref, re.I):
+        return None, ""
+    path = ref.split("#", 1)[0].split("?", 1)[0]
+    return (page.parent / unquote(path)).resolve(), ""
+
+
+def _format_ref(target: Path, page: Path, site: Path, prefix: str) -> str:
+    if prefix:
+        return prefix + quote(target.relative_to(site).as_posix())
+    return quote(os.path.relpath(target, page.parent).replace(os.sep, "/"))
+
+
+def rewrite_references(page: Path, mapping: Dict[Path, Path], site: Path) -> int:
+    """Troca as referências a duplicatas por referências à canônica; retorna quantas."""
+    text = page.read_text(encoding="utf-8")
+    count = 0
+
+    def swap(ref: str) -> str:
+        nonlocal count
+        path, prefix = resolve_ref(ref, page, site)
+        if path is None or path not in mapping:
+            return ref
+        count += 1
+        return _format_ref(mapping[path], page, site, prefix)
+
+    def replace(m: re.Match) -> str:
+        if m.group(1):
+            return f'{m.group(1)}="{swap(m.group(2))}"'
+        entries = []
+        for entry in m.group(3).split(","):
+            parts = entry.strip().split(None, 1)
+            if parts:
+                parts[0] = swap(parts[0])
+            entries.append(" ".join(parts))
+        return f'srcset="{", ".join(entries)}"'
+
+    new_text = _REF_RE.sub(replace, text)
+    if new_text != text:
+        page.write_text(new_text, encoding="utf-8")
+    return count
+
+
+def site_text_files(site: Path) -> List[Path]:
+    texts = []
+    for dirpath, dirnames, filenames in os.walk(site):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        texts += [Path(dirpath) / n for n in sorted(filenames) if Path(n).suffix.lower() in TEXT_EXTS]
+    return texts
+
+
+def is_referenced(path: Path, site: Path, texts: Iterable[Path]) -> bool:
+    """
+    Conservador: qualquer menção ao caminho relativo à raiz (em URL, caminho
+    relativo ou texto) conta. "img/x.png" casa com "../img/x.png" e com
+    ".../main/img/x.png", mas não com "outra_img/x.png".
+    """
+    rel = path.relative_to(site).as_posix()
+    pattern = re.compile(r"(?<![\w.-])(?:%s)" % "|".join(re.escape(n) for n in {rel, quote(rel)}))
+    for text_file in texts:
+        try:
+            if pattern.search(text_file.read_text(encoding="utf-8", errors="ignore")):
+                return True
+        except OSError:
+            continue
+    # Referências relativas à própria pasta (ex.: "x.png" num HTML ao lado da imagem)
+    siblings = [t for t in texts if t.parent == path.parent]
+    name = re.compile(r"(?<![\w./-])%s" % re.escape(path.name))
+    return any(name.search(t.read_text(encoding="utf-8", errors="ignore")) for t in siblings)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Deduplicação das imagens do site por conteúdo.")
+    ap.add_argument("--site", default=str(SITE_ROOT), help="Raiz do site (default: pasta acima de portfolio/).")
+    ap.add_argument("--prefer", nargs="*", default=DEFAULT_PREFER, help="Pastas preferidas para a cópia canônica (default: img).")
+    ap.add_argument("--map", help="Grava o mapa duplicata -> canônica (com sha256) neste JSON.")
+    ap.add_argument("--rewrite", action="store_true", help="Reescreve as referências HTML às duplicatas para a canônica.")
+    ap.add_argument("--prune", action="store_true", help="Remove as duplicatas que nenhum arquivo de texto do site cita.")
+    ap.add_argument("--link", action="store_true", help="Troca as duplicatas por symlinks relativos para a canônica.")
+    ap.add_argument("--manifest", help="Manifesto usado como cache de hashes entre execuções (opcional).")
+    args = ap.parse_args()
+
+    site = Path(args.site).resolve()
+    manifest = BuildManifest.for_outdir(site, args.manifest) if args.manifest else None
+    store = AssetStore(manifest, prefer=[site / p for p in args.prefer]).scan(site)
+    if manifest is not None:
+        manifest.save()
+    groups = store.duplicates()
+    mapping = {dup: canon for canon, dups in groups.items() for dup in dups}
+
+    saved = sum(os.path.getsize(d) for d in mapping)
+    print(f"{len(store.hash_of)} imagem(ns), {len(store.by_hash)} conteúdo(s) único(s), "
+          f"{len(mapping)} duplicata(s) ({saved / 1e6:.2f} MB).")
+    for canon, dups in groups.items():
+        print(f"  {canon.relative_to(site).as_posix()}")
+        for dup in dups:
+            print(f"    = {dup.relative_to(site).as_posix()}")
+
+    if args.map:
+        payload = {
+            dup.relative_to(site).as_posix(): {"canonical": canon.relative_to(site).as_posix(), "sha256": store.hash_of[dup]}
+            for dup, canon in sorted(mapping.items())
+        }
+        Path(args.map).write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+        print(f"Mapa: {args.map}")
+
+    texts = site_text_files(site)
+    if args.rewrite:
+        for page in texts:
+            if page.suffix.lower() == ".html":
+                count = rewrite_references(page, mapping, site)
+                if count:
+                    print(f"OK: {page.relative_to(site).as_posix()} -> {count} referência(s) à canônica")
+
+    if args.prune or args.link:
+        for dup, canon in sorted(mapping.items()):
+            rel = dup.relative_to(site).as_posix()
+            if args.prune and not is_referenced(dup, site, texts):
+                dup.unlink()
+                print(f"Removida: {rel}")
+            elif args.link:
+                dup.unlink()
+                dup.symlink_to(os.path.relpath(canon, dup.parent))
+                print(f"Symlink: {rel} -> {canon.relative_to(site).as_posix()}")
+            else:
+                print(f"AVISO: {rel} ainda é citada; mantida (use --rewrite antes de --prune).")
+
+
+if __name__ == "__main__":
+    main()
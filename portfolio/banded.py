@@ -0,0 +1,261 @@
+"""
+Modo em faixas (--max-memory): compõe a marca d'água faixa a faixa e grava o
+PNG de saída de forma incremental, sem nunca montar o overlay, a cópia RGBA
+ou a imagem de saída em tamanho cheio.
+
+A única área em tamanho cheio que permanece é a fonte decodificada (no modo
+nativo dela, p.ex. RGB), pois o Pillow não decodifica PNG/TIFF parcialmente.
+Os pixels gerados são os mesmos do caminho normal; o arquivo PNG em si é
+codificado por este módulo (nível do zlib e filtro por linha conforme o
+perfil de encoders.py; o padrão é zlib 9 com filtro adaptativo).
+"""
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+from encoders import get_profile
+from profiling import stage
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+try:
+    import resource
+except Exception:  # Windows
+    resource = None
+
+
+# Estimativa de bytes por pixel de uma faixa em processamento: faixa RGBA
+# montada, bytes crus e filtrados para o PNG (recortes e filtros são menores).
+BAND_BYTES_PER_PIXEL = 32
+MIN_BAND_ROWS = 16
+_IDAT_CHUNK = 1 << 16
+# Os filtros PNG são calculados em blocos de linhas para limitar os temporários do NumPy.
+_FILTER_BLOCK_BYTES = 1 << 20
+
+
+def decoded_size(im: Image.Image) -> int:
+    """Bytes ocupados pela imagem decodificada no modo nativo (Pillow guarda RGB em 4 bytes/pixel)."""
+    if im.mode in ("1", "L", "P"):
+        px = 1
+    elif im.mode.startswith("I;16"):
+        px = 2
+    else:
+        px = 4
+    return im.width * im.height * px
+
+
+def band_rows_for_budget(im: Image.Image, max_memory_mb: float, reserved: int = 0) -> int:
+    """
+    Altura da faixa que cabe no orçamento, descontando a fonte decodificada e
+    `reserved` bytes que ficam ocupados durante toda a imagem (p.ex. a célula
+    do padrão repetido). Nunca menor que MIN_BAND_ROWS (o orçamento é uma
+    meta, não um limite rígido).
+    """
+    budget = int(max_memory_mb * 1024 * 1024) - decoded_size(im) - reserved
+    rows = budget // max(1, im.width * BAND_BYTES_PER_PIXEL)
+    return int(max(MIN_BAND_ROWS, min(im.height, rows)))
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de RSS (MB) deste processo e dos filhos já encerrados; None se indisponível."""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def report_peak_rss(max_memory_mb: Optional[float] = None) -> None:
+    peak = peak_rss_mb()
+    if peak is None:
+        print("Pico de memória (RSS): n/d nesta plataforma")
+        return
+    budget = f" (orçamento por imagem: {max_memory_mb:.0f} MB)" if max_memory_mb else ""
+    print(f"Pico de memória (RSS): {peak:.1f} MB{budget}")
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def _text_chunk(key: str, value: str) -> bytes:
+    """tEXt quando o texto cabe em Latin-1; iTXt (UTF-8) caso contrário, como o PngInfo do Pillow."""
+    try:
+        return _chunk(b"tEXt", key.encode("latin-1") + b"\0" + value.encode("latin-1"))
+    except UnicodeEncodeError:
+        return _chunk(b"iTXt", key.encode("latin-1") + b"\0\0\0\0\0" + value.encode("utf-8"))
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = np.abs(p - a)
+    pb = np.abs(p - b)
+    pc = np.abs(p - c)
+    return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+
+class PngBandWriter:
+    """
+    Escritor PNG incremental: recebe faixas (Image RGBA/RGB de largura fixa)
+    de cima para baixo. Com NumPy escolhe, por linha, o filtro PNG de menor
+    soma absoluta (mesma heurística do libpng); sem NumPy usa o filtro 0.
+    Com filters="up" aplica só o filtro Up, bem mais barato (perfil fast).
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        width: int,
+        height: int,
+        mode: str = "RGBA",
+        text: Optional[Dict[str, str]] = None,
+        level: int = 9,
+        filters: str = "adaptive",
+    ):
+        if mode not in ("RGBA", "RGB"):
+            raise ValueError(f"modo não suportado no escritor em faixas: {mode}")
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.bpp = 4 if mode == "RGBA" else 3
+        self.rows_written = 0
+        self.filters = filters
+        self._prev = bytes(width * self.bpp)
+        self._z = zlib.compressobj(level)
+        self._pending = bytearray()
+        self._fh = open(self.path, "wb")
+        color_type = 6 if mode == "RGBA" else 2
+        self._fh.write(b"\x89PNG\r\n\x1a\n")
+        self._fh.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)))
+        for key, value in (text or {}).items():
+            if value:
+                self._fh.write(_text_chunk(key, value))
+
+    def _filter_block(self, cur, prev_row):
+        """Filtra um bloco de linhas (int16) dado a linha anterior; retorna bytes com o tipo de filtro por linha."""
+        rows = cur.shape[0]
+        up = np.vstack([prev_row, cur[:-1]])
+        left = np.zeros_like(cur)
+        left[:, self.bpp:] = cur[:, :-self.bpp]
+        upleft = np.zeros_like(up)
+        upleft[:, self.bpp:] = up[:, :-self.bpp]
+
+        best_cost = None
+        for ftype, pred in enumerate((None, left, up, (left + up) >> 1, _paeth(left, up, upleft))):
+            filtered = (cur if pred is None else cur - pred).astype(np.uint8)
+            # Heurística "minimum sum of absolute differences" (bytes como int8)
+            cost = np.abs(filtered.view(np.int8).astype(np.int32)).sum(axis=1)
+            if best_cost is None:
+                best_cost, best_type, chosen = cost, np.zeros(rows, np.uint8), filtered
+                continue
+            better = cost < best_cost
+            if better.any():
+                best_cost = np.where(better, cost, best_cost)
+                best_type[better] = ftype
+                chosen[better] = filtered[better]
+        return np.hstack([best_type[:, None], chosen]).tobytes()
+
+    def _filter_up(self, cur, prev_row):
+        up = np.vstack([prev_row, cur[:-1]])
+        filtered = (cur - up).astype(np.uint8)
+        return np.hstack([np.full((cur.shape[0], 1), 2, np.uint8), filtered]).tobytes()
+
+    def _filter_rows(self, raw: bytes, rows: int) -> bytes:
+        stride = self.width * self.bpp
+        if np is None:
+            out = bytearray()
+            for r in range(rows):
+                out += b"\0" + raw[r * stride:(r + 1) * stride]
+            return bytes(out)
+
+        data = np.frombuffer(raw, dtype=np.uint8).reshape(rows, stride)
+        prev_row = np.frombuffer(self._prev, dtype=np.uint8).astype(np.int16)[None, :]
+        step = max(1, _FILTER_BLOCK_BYTES // stride)
+        filter_block = self._filter_up if self.filters == "up" else self._filter_block
+        parts = []
+        for r0 in range(0, rows, step):
+            cur = data[r0:r0 + step].astype(np.int16)
+            parts.append(filter_block(cur, prev_row))
+            prev_row = cur[-1:]
+        return b"".join(parts)
+
+    def write(self, band: Image.Image) -> None:
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+        if band.width != self.width:
+            raise ValueError("faixa com largura diferente da imagem")
+        rows = band.height
+        raw = band.tobytes()
+        self._pending += self._z.compress(self._filter_rows(raw, rows))
+        stride = self.width * self.bpp
+        self._prev = raw[(rows - 1) * stride:]
+        self.rows_written += rows
+        while len(self._pending) >= _IDAT_CHUNK:
+            self._fh.write(_chunk(b"IDAT", bytes(self._pending[:_IDAT_CHUNK])))
+            del self._pending[:_IDAT_CHUNK]
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"PNG incompleto: {self.rows_written}/{self.height} linhas")
+            self._pending += self._z.flush()
+            if self._pending:
+                self._fh.write(_chunk(b"IDAT", bytes(self._pending)))
+            self._fh.write(_chunk(b"IEND", b""))
+        finally:
+            self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._fh.close()
+            self.path.unlink(missing_ok=True)
+            return False
+        self.close()
+        return False
+
+
+def composite_banded(
+    im: Image.Image,
+    out_path: Path,
+    overlay_for_box: Callable[[Tuple[int, int, int, int]], Image.Image],
+    band_rows: int,
+    text: Optional[Dict[str, str]] = None,
+    encoder: Optional[str] = None,
+) -> None:
+    """
+    Compõe overlay_for_box(box) sobre a imagem em blocos de band_rows linhas
+    (cada faixa ainda é dividida em colunas, para que a região amostrada do
+    padrão rotacionado também fique pequena) e grava cada faixa no PNG.
+    """
+    W, H = im.size
+    chunk_w = min(W, max(256, band_rows))
+    profile = get_profile(encoder)
+    with PngBandWriter(out_path, W, H, "RGBA", text, profile.zlib_level, profile.png_filter) as writer:
+        for y0 in range(0, H, band_rows):
+            y1 = min(H, y0 + band_rows)
+            band = Image.new("RGBA", (W, y1 - y0))
+            for x0 in range(0, W, chunk_w):
+                box = (x0, y0, min(W, x0 + chunk_w), y1)
+                with stage("rgba"):
+                    base = im.crop(box).convert("RGBA")
+                overlay = overlay_for_box(box)
+                with stage("composite"):
+                    band.paste(Image.alpha_composite(base, overlay), (x0, 0))
+            with stage("encode"):
+                writer.write(band)
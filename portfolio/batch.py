@@ -0,0 +1,122 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Pool mantido vivo entre lotes (modo --watch); ver persistent_pool()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass
+class FileResult:
+    """Resultado do processamento de um arquivo (retornado pelos workers)."""
+
+    ok: bool
+    message: str
+    bytes_in: int = 0
+    stats: Optional[Dict] = None  # estatísticas por estágio (profiling.file_stats)
+    outputs: Optional[List[Tuple[Path, bytes]]] = None  # saídas codificadas, ainda não gravadas (staged.py)
+    placeholders: Optional[Dict[str, Dict]] = None  # dimensões e LQIP por saída (placeholders.py)
+
+
+@dataclass
+class BatchSummary:
+    ok: int = 0
+    errors: int = 0
+    bytes_in: int = 0
+    elapsed: float = 0.0
+
+    def throughput(self) -> str:
+        secs = max(self.elapsed, 1e-9)
+        mb = self.bytes_in / (1024 * 1024)
+        return (
+            f"Resumo: {self.ok} OK, {self.errors} ERRO em {self.elapsed:.2f} s "
+            f"| {self.ok / secs:.2f} img/s | {mb / secs:.2f} MB/s"
+        )
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Normaliza --jobs: valores <= 0 significam 'todos os núcleos'."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def iter_results(items: Sequence[T], worker: Callable[[T], FileResult], jobs: int = 1) -> Iterable[FileResult]:
+    """
+    Executa worker(item) para cada item, em série ou em pool de processos.
+    Os resultados saem sempre na ordem de entrada (saída determinística).
+    O worker precisa ser uma função de módulo (picklable) quando jobs > 1.
+    """
+    jobs = resolve_jobs(jobs)
+    if jobs > 1 and len(items) > 1 and _pool is not None:
+        yield from _pool.map(worker, items)
+    elif jobs > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as ex:
+            yield from ex.map(worker, items)
+    else:
+        for item in items:
+            yield worker(item)
+
+
+@contextmanager
+def persistent_pool(jobs: int):
+    """
+    Mantém um único pool de processos para todos os lotes do bloco: os workers
+    (e os caches de fonte/overlay deles) sobrevivem entre um lote e outro.
+    """
+    global _pool
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        _pool = ex
+        try:
+            yield ex
+        finally:
+            _pool = None
+
+
+def shared_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool do persistent_pool() ativo, se houver."""
+    return _pool
+
+
+def run_batch(
+    items: Sequence[T],
+    worker: Callable[[T], FileResult],
+    jobs: int = 1,
+    on_result: Optional[Callable[[T, FileResult], None]] = None,
+) -> BatchSummary:
+    """
+    Processa o lote imprimindo OK/ERRO por arquivo e, ao final, o resumo de throughput.
+    on_result(item, resultado) roda no processo principal (p.ex. para atualizar o manifesto).
+    """
+    summary = BatchSummary()
+    start = time.perf_counter()
+    for item, res in zip(items, iter_results(items, worker, jobs)):
+        print(res.message)
+        if on_result is not None:
+            on_result(item, res)
+        if res.ok:
+            summary.ok += 1
+            summary.bytes_in += res.bytes_in
+        else:
+            summary.errors += 1
+    summary.elapsed = time.perf_counter() - start
+    print(summary.throughput())
+    return summary
+
+
+def file_size(path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
@@ -0,0 +1,301 @@
+"""
+Benchmark das ferramentas de imagem e PDF do portfólio.
+
+Gera entradas sintéticas localmente (imagens small/4k/10k em PNG RGB, PNG RGBA,
+JPEG e TIFF; PDFs com várias páginas), cronometra cada estágio numa grade de
+parâmetros e grava os resultados em JSON. Cada caso roda num processo novo,
+para que o pico de RSS medido seja só daquele caso.
+
+    python benchmark.py --out bench.json
+    python benchmark.py --out novo.json --baseline bench.json --threshold 0.15
+
+Com --baseline, casos cuja mediana piorou mais que --threshold (fração) são
+listados como regressão e o processo termina com código 1.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image, ImageDraw
+
+SIZES = {
+    "small": (800, 600),
+    "4k": (3840, 2160),
+    "10k": (10000, 10000),
+}
+FORMATS = {
+    "png-rgb": (".png", "RGB"),
+    "png-rgba": (".png", "RGBA"),
+    "jpeg": (".jpg", "RGB"),
+    "tiff": (".tif", "RGB"),
+}
+STAGES = ["tiled", "visible", "save_with_metadata", "pdf_to_png", "convert_pages"]
+CONVERT_PAGES = 3  # páginas renderizadas por repetição no estágio convert_pages
+
+# Grades de parâmetros por estágio
+GRIDS = {
+    "tiled": {"angle": [30.0, 45.0], "spacing": [1.0, 2.2]},
+    "visible": {"mode": ["diagonal", "corner"]},
+    "save_with_metadata": {"ext": [".png", ".jpg"], "encoder": ["fast", "balanced", "smallest"]},
+    "pdf_to_png": {"dpi": [150, 300]},
+    "convert_pages": {"dpi": [150, 300]},
+}
+
+
+def make_figure(size, mode: str, seed: int = 0) -> Image.Image:
+    """Figura sintética parecida com um gráfico científico: fundo liso, linhas, círculos e texto."""
+    W, H = size
+    rng = random.Random(seed)
+    bg = (255, 255, 255, 0) if mode == "RGBA" else (255, 255, 255)
+    im = Image.new(mode, size, bg)
+    d = ImageDraw.Draw(im)
+    for _ in range(max(20, (W * H) // 40000)):
+        color = tuple(rng.randrange(256) for _ in range(3)) + ((255,) if mode == "RGBA" else ())
+        x0, y0 = rng.randrange(W), rng.randrange(H)
+        if rng.random() < 0.5:
+            d.line((x0, y0, rng.randrange(W), rng.randrange(H)), fill=color, width=rng.randrange(1, 6))
+        else:
+            r = rng.randrange(3, max(4, W // 40))
+            d.ellipse((x0 - r, y0 - r, x0 + r, y0 + r), fill=color)
+    for y in range(0, H, max(1, H // 20)):
+        d.text((10, y), f"Figure row {y}", fill=(0, 0, 0, 255) if mode == "RGBA" else (0, 0, 0))
+    return im
+
+
+def make_pdf(path: Path, pages: int) -> None:
+    import fitz  # PyMuPDF
+
+    rng = random.Random(1)
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Relatório sintético - página {n + 1}", fontsize=18)
+        for _ in range(60):
+            x, y = rng.uniform(50, 500), rng.uniform(100, 750)
+            page.draw_rect(fitz.Rect(x, y, x + rng.uniform(10, 80), y + rng.uniform(5, 40)),
+                           color=(0, 0, 0), fill=(rng.random(), rng.random(), rng.random()))
+        for i in range(30):
+            page.insert_text((60, 120 + i * 20), "ACGT" * 12, fontsize=9)
+    doc.save(path.as_posix())
+    doc.close()
+
+
+def generate_inputs(work: Path, sizes: List[str], formats: List[str], pdf_pages: int) -> Dict[str, Path]:
+    inputs = {}
+    for size_name in sizes:
+        for fmt in formats:
+            ext, mode = FORMATS[fmt]
+            path = work / f"{size_name}-{fmt}{ext}"
+            if not path.exists():
+                im = make_figure(SIZES[size_name], mode)
+                if ext == ".jpg":
+                    im.save(path, quality=90)
+                else:
+                    im.save(path)
+            inputs[f"{size_name}-{fmt}"] = path
+    pdf = work / f"report-{pdf_pages}p.pdf"
+    if not pdf.exists():
+        make_pdf(pdf, pdf_pages)
+    inputs["pdf"] = pdf
+    return inputs
+
+
+def _time_stage(stage: str, src: Path, params: Dict, work: Path) -> None:
+    """Executa uma vez o estágio (importações feitas no processo do caso)."""
+    if stage == "tiled":
+        from watermark_tiled import apply_tiled_watermark
+        from tiled_overlay import OVERLAY_CACHE
+
+        OVERLAY_CACHE.clear()  # mede o custo real do overlay, não o acerto de cache
+        with Image.open(src) as im:
+            apply_tiled_watermark(im, text="© 2025 Felipe Alberto Lei | Logik Bioinfo", **params)
+    elif stage == "visible":
+        from watermark_images import add_visible_watermark
+
+        with Image.open(src) as im:
+            add_visible_watermark(im, text="© 2025 Felipe Alberto Lei | Logik Bioinfo", **params)
+    elif stage == "save_with_metadata":
+        from watermark_images import save_with_metadata
+
+        with Image.open(src) as im:
+            im.load()
+            save_with_metadata(im, work / f"bench-out{params['ext']}", "Autor", "© 2025", "https://x", "Licença", src.suffix,
+                               encoder=params["encoder"])
+    elif stage == "pdf_to_png":
+        from convert_pdfs import pdf_to_png
+
+        pdf_to_png(src, work / "bench-pdf.png", dpi=params["dpi"], all_pages=True)
+    elif stage == "convert_pages":
+        import fitz
+        from pdf_render import PageJob, render_job
+
+        # Até CONVERT_PAGES páginas, limitadas às que o PDF realmente tem (--pdf-pages pode ser menor)
+        with fitz.open(src) as doc:
+            count = min(CONVERT_PAGES, doc.page_count)
+        pages = [(i, work / f"bench-page-{i + 1}.png") for i in range(count)]
+        results = render_job(PageJob(src, pages, params["dpi"]))
+        failed = [r.message for r in results if not r.ok]
+        if failed:
+            raise RuntimeError("; ".join(failed))
+    else:
+        raise ValueError(f"estágio desconhecido: {stage}")
+
+
+def run_case(case: Dict) -> Dict:
+    """Roda um caso num processo dedicado: repetições cronometradas + pico de RSS."""
+    from banded import peak_rss_mb
+
+    src, work = Path(case["input"]), Path(case["work"])
+    times = []
+    for _ in range(case["repeat"]):
+        t0 = time.perf_counter()
+        _time_stage(case["stage"], src, case["params"], work)
+        times.append(time.perf_counter() - t0)
+    return {
+        "id": case["id"],
+        "stage": case["stage"],
+        "input": case["input_name"],
+        "params": case["params"],
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def build_cases(stages: List[str], inputs: Dict[str, Path], work: Path, repeat: int) -> List[Dict]:
+    cases = []
+    for stage in stages:
+        grid = GRIDS[stage]
+        keys = sorted(grid)
+        combos = [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+        if stage in ("pdf_to_png", "convert_pages"):
+            names = ["pdf"]
+        else:
+            names = [n for n in inputs if n != "pdf"]
+        for name in names:
+            for params in combos:
+                label = ",".join(f"{k}={params[k]}" for k in keys)
+                cases.append({
+                    "id": f"{stage}/{name}/{label}",
+                    "stage": stage,
+                    "input": str(inputs[name]),
+                    "input_name": name,
+                    "params": params,
+                    "work": str(work),
+                    "repeat": repeat,
+                })
+    return cases
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Lista de regressões (mediana acima de baseline * (1 + threshold))."""
+    base = {r["id"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        ref = base.get(r["id"])
+        if not ref:
+            continue
+        ratio = r["seconds_median"] / max(ref["seconds_median"], 1e-9)
+        if ratio > 1.0 + threshold:
+            regressions.append(f"REGRESSÃO: {r['id']} {ref['seconds_median']:.3f}s -> {r['seconds_median']:.3f}s (x{ratio:.2f})")
+    return regressions
+
+
+def environment() -> Dict:
+    import PIL
+
+    info = {
+        "python": sys.version.split()[0],
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import fitz
+
+        info["pymupdf"] = fitz.VersionBind
+    except Exception:
+        pass
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das ferramentas de marca d'água e PDF.")
+    parser.add_argument("--out", default="bench_results.json", help="Arquivo JSON de resultados.")
+    parser.add_argument("--sizes", default="small,4k", help="Tamanhos sintéticos: small,4k,10k (default: small,4k).")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Formatos: png-rgb,png-rgba,jpeg,tiff.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Estágios a medir.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por caso (default: 3).")
+    parser.add_argument("--pdf-pages", type=int, default=8, help="Páginas do PDF sintético (default: 8).")
+    parser.add_argument("--workdir", help="Diretório para entradas sintéticas (default: temporário).")
+    parser.add_argument("--baseline", help="JSON de referência para detectar regressões.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Piora tolerada sobre a baseline (0.15 = 15%%).")
+    args = parser.parse_args()
+
+    sizes = [s for s in args.sizes.split(",") if s]
+    formats = [f for f in args.formats.split(",") if f]
+    stages = [s for s in args.stages.split(",") if s]
+    for name, valid in (("tamanho", SIZES), ("formato", FORMATS), ("estágio", GRIDS)):
+        chosen = {"tamanho": sizes, "formato": formats, "estágio": stages}[name]
+        unknown = [c for c in chosen if c not in valid]
+        if unknown:
+            print(f"ERRO: {name} desconhecido: {', '.join(unknown)}")
+            sys.exit(2)
+    if args.pdf_pages < 1:
+        print("ERRO: --pdf-pages precisa ser >= 1")
+        sys.exit(2)
+
+    tmp = None
+    if args.workdir:
+        work = Path(args.workdir).resolve()
+        work.mkdir(parents=True, exist_ok=True)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="logik-bench-")
+        work = Path(tmp.name)
+
+    print(f"Gerando entradas sintéticas em {work} ...")
+    inputs = generate_inputs(work, sizes, formats, args.pdf_pages)
+    cases = build_cases(stages, inputs, work, args.repeat)
+
+    results = []
+    for case in cases:
+        # Processo novo por caso: o pico de RSS não herda o dos casos anteriores
+        with ProcessPoolExecutor(max_workers=1) as ex:
+            try:
+                res = ex.submit(run_case, case).result()
+            except Exception as e:
+                print(f"ERRO: {case['id']} -> {e}")
+                continue
+        results.append(res)
+        rss = f"{res['peak_rss_mb']:.0f} MB" if res["peak_rss_mb"] is not None else "n/d"
+        print(f"{res['id']:<60} {res['seconds_median']:8.3f} s  (min {res['seconds_min']:.3f})  RSS {rss}")
+
+    out = Path(args.out).resolve()
+    out.write_text(json.dumps({"environment": environment(), "results": results}, indent=1), encoding="utf-8")
+    print(f"Resultados: {out}")
+    if tmp is not None:
+        tmp.cleanup()
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(line)
+        if regressions:
+            sys.exit(1)
+        print(f"Sem regressões acima de {args.threshold:.0%} em relação a {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
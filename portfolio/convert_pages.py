@@ -1,7 +1,18 @@
 import argparse
 from pathlib import Path
+from typing import Optional
 import fitz  # PyMuPDF
 
+from batch import persistent_pool
+from decode import add_size_args
+from encoders import add_encoder_args
+from manifest import BuildManifest
+from pdf_render import chunk_size_for, parse_clip, render_jobs, rerun_page, split_pages
+from profiling import StatsCollector, add_profile_args, finish_report, profiling_enabled
+from render_cache import RenderCache, add_render_cache_args, cache_from_args, finish_cache
+from shard import Shard, ShardReport, add_shard_args, parse_shard, part_digest, report_path
+from watch import add_watch_args, watch
+
 def parse_pages(pages_str: str):
     # Aceita formatos como "6,12,15" ou "6-10,15"
     result = set()
@@ -17,6 +28,82 @@ def parse_pages(pages_str: str):
             result.add(int(part))
     return sorted(result)
 
+def export_pages(
+    args, pdf_path: Path, outdir: Path, pages, manifest: BuildManifest, shard: Optional[Shard] = None,
+    clip=None, cache: Optional[RenderCache] = None,
+):
+    """Exporta as páginas pedidas que estiverem desatualizadas no manifesto."""
+    with fitz.open(pdf_path) as doc:
+        total = doc.page_count
+
+    for p in pages:
+        if p < 1 or p > total:
+            print(f"AVISO: página {p} fora do intervalo (1..{total}), ignorando.")
+    pages = [p for p in pages if 1 <= p <= total]
+
+    report = None
+    if shard is not None:
+        # Unidade = página: o digest combina o conteúdo do PDF e o número da página
+        shard_params = {"tool": "convert_pages", "dpi": args.dpi, "prefix": args.prefix, "encoder": args.encoder,
+                        "max_width": args.max_width, "max_height": args.max_height, "clip": clip}
+        report = ShardReport(shard, "convert_pages", shard_params, manifest)
+        pdf_sha = manifest.source_hash(pdf_path)
+        pages = report.select(pages, key=lambda p: f"p{p}", digest=lambda p: part_digest(pdf_sha, str(p)))
+
+    todo = []  # (índice 0-based, saída, parâmetros)
+    for p in pages:
+        stem = pdf_path.stem
+        prefix = f"{args.prefix}_" if args.prefix else ""
+        outname = f"{prefix}{stem}_p{p:02d}.png"
+        outpath = outdir / outname
+        params = {"tool": "convert_pages", "page": p, "dpi": args.dpi}
+        if args.encoder:
+            params["encoder"] = args.encoder
+        if args.max_width or args.max_height:
+            params.update(max_width=args.max_width, max_height=args.max_height)
+        if clip:
+            params["clip"] = list(clip)
+        if manifest.is_fresh([outpath], pdf_path, params):
+            manifest.skipped += 1
+            if report is not None:
+                report.skipped(f"p{p}", [outpath])
+            continue
+        todo.append((p - 1, outpath, params))  # PyMuPDF usa 0-based
+
+    # Cada worker abre o próprio documento e renderiza uma faixa contígua de páginas
+    page_jobs = split_pages(
+        pdf_path, [(idx, out) for idx, out, _ in todo], args.dpi, chunk_size_for(len(todo), args.jobs),
+        profiling_enabled(args) or shard is not None, args.encoder, args.max_width, args.max_height,
+        clip, cache, manifest.source_hash(pdf_path) if cache is not None else None,
+    )
+    params_by_out = {out: params for _, out, params in todo}
+    ok_count = 0
+    collector = StatsCollector()
+    for job, results in render_jobs(page_jobs, args.jobs):
+        for (idx, outpath), res in zip(job.pages, results):
+            print(res.message)
+            collector.add(res.stats)
+            if report is not None:
+                report.record(f"p{idx + 1}", res, [outpath])
+            if res.ok:
+                manifest.record([outpath], pdf_path, params_by_out[outpath])
+                manifest.built += 1
+                ok_count += 1
+
+    manifest.save()
+    finish_cache(cache, args)
+    print(f"Concluído. {ok_count} página(s) exportada(s). Saída: {outdir}")
+    print(manifest.summary())
+    if report is not None:
+        report.save(report_path(shard, outdir, args.shard_report))
+    finish_report(
+        collector, args.profile, args.stats_json, args.profile_dump,
+        rerun=lambda name: rerun_page(
+            pdf_path, int(name.rsplit("p", 1)[1]) - 1, args.dpi, args.encoder, args.max_width, args.max_height, clip
+        ),
+        encode_report=(args.encoder or "pymupdf") if args.encode_report else None,
+    )
+
 def main():
     parser = argparse.ArgumentParser(description="Exportar páginas específicas de um PDF para PNG (1-based).")
     parser.add_argument("--pdf", required=True, help="Caminho do arquivo PDF de entrada.")
@@ -24,6 +111,19 @@ def main():
     parser.add_argument("--dpi", type=int, default=300, help="Resolução de saída (DPI). Default: 300")
     parser.add_argument("--outdir", default=".", help="Diretório de saída. Default: . (mesma pasta)")
     parser.add_argument("--prefix", default="", help="Prefixo opcional no nome do arquivo de saída.")
+    parser.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <outdir>/.build-manifest.json).")
+    parser.add_argument("--force", action="store_true", help="Reexporta todas as páginas, ignorando o manifesto.")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos paralelos para renderizar páginas (0 = todos os núcleos).")
+    parser.add_argument(
+        "--clip",
+        help="Renderiza só a região x0,y0,x1,y1 de cada página, em pontos (1/72\"), a partir do canto superior esquerdo.",
+    )
+    add_render_cache_args(parser)
+    add_size_args(parser)
+    add_encoder_args(parser, default=None, default_help="PNG do PyMuPDF")
+    add_profile_args(parser)
+    add_watch_args(parser)
+    add_shard_args(parser)
     args = parser.parse_args()
 
     pdf_path = Path(args.pdf).resolve()
@@ -39,29 +139,26 @@ def main():
         print("ERRO: lista de páginas vazia.")
         return
 
-    zoom = args.dpi / 72.0
-    mat = fitz.Matrix(zoom, zoom)
+    try:
+        shard = parse_shard(args.shard)
+        clip = parse_clip(args.clip)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        return
+    cache = cache_from_args(args)
 
-    with fitz.open(pdf_path) as doc:
-        total = doc.page_count
-        ok_count = 0
-        for p in pages:
-            if p < 1 or p > total:
-                print(f"AVISO: página {p} fora do intervalo (1..{total}), ignorando.")
-                continue
-            idx = p - 1  # PyMuPDF usa 0-based
-            page = doc.load_page(idx)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-
-            stem = pdf_path.stem
-            prefix = f"{args.prefix}_" if args.prefix else ""
-            outname = f"{prefix}{stem}_p{p:02d}.png"
-            outpath = outdir / outname
-            pix.save(outpath.as_posix())
-            print(f"OK: página {p} -> {outpath}")
-            ok_count += 1
+    manifest = BuildManifest.for_outdir(outdir, args.manifest, force=args.force)
 
-    print(f"Concluído. {ok_count} página(s) exportada(s). Saída: {outdir}")
+    with persistent_pool(args.jobs if args.watch else 1):
+        export_pages(args, pdf_path, outdir, pages, manifest, shard, clip, cache)
+        if args.watch:
+            manifest.force = False  # --force vale só para a primeira passada
+
+            def rebuild(changed):
+                manifest.built = manifest.skipped = 0
+                export_pages(args, pdf_path, outdir, pages, manifest, shard, clip, cache)
+
+            watch([pdf_path.parent], rebuild, accept=lambda p: p == pdf_path, debounce=args.debounce, polling=args.poll)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
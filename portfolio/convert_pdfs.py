@@ -1,22 +1,123 @@
 import argparse
 from pathlib import Path
+from typing import Optional
 import fitz  # PyMuPDF
 
-def pdf_to_png(pdf_path: Path, out_path: Path, dpi: int = 300, all_pages: bool = False):
-    zoom = dpi / 72.0  # 72 dpi é o baseline do PDF
-    mat = fitz.Matrix(zoom, zoom)
+from batch import FileResult, persistent_pool
+from decode import add_size_args
+from encoders import add_encoder_args
+from manifest import BuildManifest
+from pdf_render import chunk_size_for, render_jobs, rerun_page, split_pages
+from profiling import StatsCollector, add_profile_args, finish_report, profiling_enabled
+from render_cache import RenderCache, add_render_cache_args, cache_from_args, finish_cache
+from shard import Shard, ShardReport, add_shard_args, parse_shard, report_path
+from watch import add_watch_args, watch
 
+def output_paths(pdf_path: Path, out_path: Path, all_pages: bool = False):
+    """PNGs que pdf_to_png gera para este PDF (abre o documento só para contar páginas)."""
+    if not all_pages:
+        return [out_path.with_suffix(".png")]
     with fitz.open(pdf_path) as doc:
-        pages = range(len(doc)) if all_pages else range(1)  # 0 = primeira página
-        for i in pages:
-            pix = doc.load_page(i).get_pixmap(matrix=mat, alpha=False)
-            if all_pages:
-                stem = f"{pdf_path.stem}-{i+1}"
-                out_file = out_path.with_name(f"{stem}.png")
-            else:
-                out_file = out_path.with_suffix(".png")
-            out_file.parent.mkdir(parents=True, exist_ok=True)
-            pix.save(out_file.as_posix())
+        return [out_path.with_name(f"{pdf_path.stem}-{i+1}.png") for i in range(len(doc))]
+
+def pdf_to_png(pdf_path: Path, out_path: Path, dpi: int = 300, all_pages: bool = False, jobs: int = 1):
+    outputs = output_paths(pdf_path, out_path, all_pages=all_pages)  # 0 = primeira página
+    page_jobs = split_pages(pdf_path, list(enumerate(outputs)), dpi, chunk_size_for(len(outputs), jobs))
+    for _, results in render_jobs(page_jobs, jobs):
+        for res in results:
+            if not res.ok:
+                raise RuntimeError(res.message)
+
+def convert_dir(
+    args, base_dir: Path, out_dir: Path, manifest: BuildManifest, shard: Optional[Shard] = None,
+    cache: Optional[RenderCache] = None,
+):
+    """Converte os PDFs de base_dir cujas saídas estão desatualizadas no manifesto."""
+    pdfs = sorted(base_dir.glob("*.pdf"))
+    if not pdfs:
+        print(f"Nenhum PDF encontrado em: {base_dir}")
+        return
+
+    params = {"tool": "convert_pdfs", "dpi": args.dpi, "all_pages": args.all_pages}
+    if args.encoder:
+        params["encoder"] = args.encoder
+    if args.max_width or args.max_height:
+        params.update(max_width=args.max_width, max_height=args.max_height)
+
+    print(f"Convertendo {len(pdfs)} PDF(s) de {base_dir} para PNG em {out_dir} @ {args.dpi} DPI ...")
+    report = None
+    if shard is not None:
+        report = ShardReport(shard, "convert_pdfs", params, manifest)
+        pdfs = report.select(pdfs)
+
+    stale = []
+    for pdf in pdfs:
+        out_png = (out_dir / pdf.name).with_suffix(".png")
+        try:
+            outputs = output_paths(pdf, out_png, all_pages=args.all_pages)
+        except Exception as e:
+            print(f"ERRO: {pdf.name} -> {e}")
+            if report is not None:
+                report.record(pdf.name, FileResult(False, f"ERRO: {pdf.name} -> {e}"), [])
+            continue
+        if not outputs:
+            print(f"AVISO: {pdf.name} não tem páginas, ignorando.")
+            if report is not None:
+                report.skipped(pdf.name, [])
+            continue
+        if manifest.is_fresh(outputs, pdf, params):
+            manifest.skipped += 1
+            if report is not None:
+                report.skipped(pdf.name, outputs)
+        else:
+            stale.append((pdf, out_png, outputs))
+
+    # Páginas de todos os PDFs pendentes viram faixas distribuídas entre os workers
+    chunk = chunk_size_for(sum(len(outputs) for _, _, outputs in stale), args.jobs)
+    page_jobs = []
+    for pdf, _, outputs in stale:
+        page_jobs += split_pages(
+            pdf, list(enumerate(outputs)), args.dpi, chunk, profiling_enabled(args) or shard is not None, args.encoder,
+            args.max_width, args.max_height, cache=cache, source_sha256=manifest.source_hash(pdf) if cache is not None else None,
+        )
+
+    # As faixas voltam em ordem: cada PDF é relatado assim que sua última página termina
+    info = {pdf: (out_png, outputs) for pdf, out_png, outputs in stale}
+    results_by_pdf = {pdf: [] for pdf in info}
+    collector = StatsCollector()
+    for job, results in render_jobs(page_jobs, args.jobs):
+        pdf = job.pdf_path
+        for res in results:
+            collector.add(res.stats)
+        out_png, outputs = info[pdf]
+        results_by_pdf[pdf] += results
+        if len(results_by_pdf[pdf]) < len(outputs):
+            continue
+        page_results = results_by_pdf.pop(pdf)
+        errors = [r.message for r in page_results if not r.ok]
+        if errors:
+            res = FileResult(False, f"ERRO: {pdf.name} -> {errors[0]}")
+        else:
+            manifest.record(outputs, pdf, params)
+            manifest.built += 1
+            res = FileResult(True, f"OK: {pdf.name} -> {out_png.name if not args.all_pages else out_png.parent}")
+        print(res.message)
+        if report is not None:
+            res.stats = {"total": sum(r.stats["total"] for r in page_results if r.stats)}
+            report.record(pdf.name, res, outputs)
+
+    manifest.save()
+    finish_cache(cache, args)
+    print(manifest.summary())
+    if report is not None:
+        report.save(report_path(shard, out_dir, args.shard_report))
+
+    pages_by_name = {f"{job.pdf_path.name} p{idx + 1}": (job.pdf_path, idx) for job in page_jobs for idx, _ in job.pages}
+    finish_report(
+        collector, args.profile, args.stats_json, args.profile_dump,
+        rerun=lambda name: rerun_page(*pages_by_name[name], args.dpi, args.encoder, args.max_width, args.max_height),
+        encode_report=(args.encoder or "pymupdf") if args.encode_report else None,
+    )
 
 def main():
     parser = argparse.ArgumentParser(description="Converter PDFs em PNG")
@@ -24,24 +125,41 @@ def main():
     parser.add_argument("--dpi", type=int, default=300, help="Resolução de saída em DPI (default: 300)")
     parser.add_argument("--all-pages", action="store_true", help="Converter todas as páginas (gera vários PNGs)")
     parser.add_argument("--outdir", default=".", help="Diretório de saída (default: mesmo diretório)")
+    parser.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <outdir>/.build-manifest.json)")
+    parser.add_argument("--force", action="store_true", help="Reconverte tudo, ignorando o manifesto")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos paralelos para renderizar páginas (0 = todos os núcleos)")
+    add_size_args(parser)
+    add_encoder_args(parser, default=None, default_help="PNG do PyMuPDF")
+    add_profile_args(parser)
+    add_watch_args(parser)
+    add_shard_args(parser)
+    add_render_cache_args(parser)
     args = parser.parse_args()
 
     base_dir = Path(args.dir).resolve()
     out_dir = Path(args.outdir).resolve()
 
-    pdfs = sorted(base_dir.glob("*.pdf"))
-    if not pdfs:
-        print(f"Nenhum PDF encontrado em: {base_dir}")
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as e:
+        print(f"ERRO: {e}")
         return
 
-    print(f"Convertendo {len(pdfs)} PDF(s) de {base_dir} para PNG em {out_dir} @ {args.dpi} DPI ...")
-    for pdf in pdfs:
-        out_png = (out_dir / pdf.name).with_suffix(".png")
-        try:
-            pdf_to_png(pdf, out_png, dpi=args.dpi, all_pages=args.all_pages)
-            print(f"OK: {pdf.name} -> {out_png.name if not args.all_pages else out_png.parent}")
-        except Exception as e:
-            print(f"ERRO: {pdf.name} -> {e}")
+    manifest = BuildManifest.for_outdir(out_dir, args.manifest, force=args.force)
+    cache = cache_from_args(args)
+    with persistent_pool(args.jobs if args.watch else 1):
+        convert_dir(args, base_dir, out_dir, manifest, shard, cache)
+        if args.watch:
+            manifest.force = False  # --force vale só para a primeira passada
+
+            def rebuild(changed):
+                manifest.built = manifest.skipped = 0
+                convert_dir(args, base_dir, out_dir, manifest, shard, cache)
+
+            watch(
+                [base_dir], rebuild, accept=lambda p: p.suffix.lower() == ".pdf",
+                debounce=args.debounce, polling=args.poll,
+            )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Decodificação em resolução reduzida (--max-width / --max-height).
+
+Quando a saída é menor que a fonte, não há por que materializar a fonte
+inteira: JPEG é decodificado em modo draft (o libjpeg reduz por 1/2, 1/4 ou
+1/8 já na IDCT) e só o ajuste final é feito pelo Pillow. Formatos sem
+decodificação parcial (PNG, TIFF) são reduzidos logo após a leitura, antes
+da cópia RGBA, do overlay e da codificação. As páginas de PDF são
+renderizadas direto no zoom necessário (pdf_render.page_zoom).
+"""
+from typing import Optional, Tuple
+
+from PIL import Image
+
+
+def fit_size(size: Tuple[int, int], max_width: Optional[int] = None, max_height: Optional[int] = None) -> Tuple[int, int]:
+    """Maior tamanho com a mesma proporção que cabe nos limites (nunca amplia)."""
+    W, H = size
+    scale = 1.0
+    if max_width and W > max_width:
+        scale = min(scale, max_width / W)
+    if max_height and H > max_height:
+        scale = min(scale, max_height / H)
+    if scale >= 1.0:
+        return size
+    return (max(1, round(W * scale)), max(1, round(H * scale)))
+
+
+def load_scaled(im: Image.Image, max_width: Optional[int] = None, max_height: Optional[int] = None) -> Image.Image:
+    """
+    Carrega im já no tamanho de saída. Retorna a própria im (sem limites ou se
+    já couber) ou uma nova imagem reduzida.
+    """
+    target = fit_size(im.size, max_width, max_height)
+    if target == im.size:
+        im.load()
+        return im
+    if im.format == "JPEG":
+        im.draft(None, target)  # menor escala do libjpeg que ainda cobre target
+    im.load()
+    if im.size == target:
+        return im
+    return im.resize(target, Image.LANCZOS, reducing_gap=3.0)
+
+
+def add_size_args(parser) -> None:
+    parser.add_argument("--max-width", type=int, help="Largura máxima da saída (px); a fonte é decodificada já reduzida.")
+    parser.add_argument("--max-height", type=int, help="Altura máxima da saída (px).")
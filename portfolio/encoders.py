@@ -0,0 +1,108 @@
+"""
+Perfis de codificação das saídas (--encoder fast|balanced|smallest).
+
+A passada optimize=True do PNG (zlib nível 9) domina o tempo das figuras
+grandes. Os perfis trocam tamanho por tempo:
+
+    fast      PNG zlib 1; JPEG q90 sem otimização de Huffman (prévias de CI)
+    balanced  PNG zlib 6 (Z_FILTERED); JPEG q90 com Huffman otimizado
+    smallest  PNG optimize (zlib 9); JPEG q90 otimizado e progressivo (publicação)
+
+WebP/AVIF (derivadas responsivas, responsive.py) mantêm a qualidade e variam
+só o esforço do codificador (method / speed).
+
+O mesmo perfil vale para o escritor PNG em faixas (banded.py): nível do zlib e
+estratégia de filtro por linha ("adaptive" = menor soma absoluta, "up" = filtro
+fixo, bem mais barato).
+"""
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+from PIL import Image
+
+JPEG_EXTS = {".jpg", ".jpeg"}
+_FORMAT_BY_EXT = {".jpg": "jpeg", ".jpeg": "jpeg", ".webp": "webp", ".avif": "avif"}
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    name: str
+    png: Dict = field(default_factory=dict)  # argumentos do Image.save para PNG
+    jpeg: Dict = field(default_factory=dict)  # argumentos do Image.save para JPEG
+    webp: Dict = field(default_factory=dict)
+    avif: Dict = field(default_factory=dict)
+    zlib_level: int = 9  # escritor em faixas
+    png_filter: str = "adaptive"  # "adaptive" | "up"
+
+
+ENCODER_PROFILES = {
+    "fast": EncoderProfile(
+        "fast",
+        png={"compress_level": 1},
+        jpeg={"quality": 90, "subsampling": 2},
+        webp={"quality": 80, "method": 0},
+        avif={"quality": 60, "speed": 10},
+        zlib_level=1,
+        png_filter="up",
+    ),
+    "balanced": EncoderProfile(
+        "balanced",
+        png={"compress_level": 6, "compress_type": zlib.Z_FILTERED},
+        jpeg={"quality": 90, "subsampling": 2, "optimize": True},
+        webp={"quality": 80, "method": 4},
+        avif={"quality": 60, "speed": 8},
+        zlib_level=6,
+    ),
+    "smallest": EncoderProfile(
+        "smallest",
+        png={"optimize": True},
+        jpeg={"quality": 90, "subsampling": 2, "optimize": True, "progressive": True},
+        webp={"quality": 80, "method": 6},
+        avif={"quality": 60, "speed": 6},
+        zlib_level=9,
+    ),
+}
+# Compressão máxima continua sendo o padrão das ferramentas de publicação
+DEFAULT_ENCODER = "smallest"
+
+
+def get_profile(name: Optional[str]) -> EncoderProfile:
+    try:
+        return ENCODER_PROFILES[name or DEFAULT_ENCODER]
+    except KeyError:
+        raise ValueError(f"perfil de codificação desconhecido: {name}") from None
+
+
+def save_kwargs(out_path: Path, encoder: Optional[str] = None) -> Dict:
+    """Argumentos do Image.save para a extensão de out_path no perfil escolhido (PNG para as demais)."""
+    profile = get_profile(encoder)
+    return dict(getattr(profile, _FORMAT_BY_EXT.get(Path(out_path).suffix.lower(), "png")))
+
+
+def save_image(img: Image.Image, out_path: Path, encoder: Optional[str] = None, fp: Optional[BinaryIO] = None, **extra) -> None:
+    """
+    Salva PNG/JPEG com o perfil; JPEG não suporta alpha, então converte para RGB.
+    Com fp a imagem é codificada nesse buffer (modo --staged), no formato da
+    extensão de out_path.
+    """
+    suffix = Path(out_path).suffix.lower()
+    if suffix in JPEG_EXTS and img.mode != "RGB":
+        img = img.convert("RGB")
+    if fp is not None:
+        img.save(fp, format=Image.registered_extensions()[suffix], **save_kwargs(out_path, encoder), **extra)
+    else:
+        img.save(Path(out_path).as_posix(), **save_kwargs(out_path, encoder), **extra)
+
+
+def add_encoder_args(parser, default: Optional[str] = DEFAULT_ENCODER, default_help: str = "") -> None:
+    parser.add_argument(
+        "--encoder",
+        choices=sorted(ENCODER_PROFILES),
+        default=default,
+        help=f"Perfil de codificação: fast, balanced ou smallest (default: {default_help or default}).",
+    )
+    parser.add_argument(
+        "--encode-report", action="store_true", help="Mostra o tempo de codificação e o tamanho de saída por arquivo."
+    )
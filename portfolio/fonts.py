@@ -0,0 +1,163 @@
+"""
+Descoberta e cache de fontes para as ferramentas de marca d'água.
+
+- Índice das fontes TTF/OTF/TTC do sistema (varredura de diretórios no estilo
+  fontconfig), montado uma vez e guardado em disco; só é refeito quando algum
+  diretório varrido muda (mtime).
+- LRU em processo dos FreeTypeFont carregados, por (caminho, tamanho): depois
+  da primeira imagem, preparar a fonte custa uma consulta de dicionário.
+- Sem --font, tenta Arial/Calibri/Segoe e, em seguida, equivalentes métricos
+  livres (Liberation Sans, DejaVu Sans...), para que a saída seja a mesma no
+  Windows e nos hosts Linux de build.
+
+Diretórios extras podem ser passados em LOGIK_FONT_DIRS (separados por os.pathsep).
+"""
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import ImageFont
+
+FONT_EXTS = {".ttf", ".otf", ".ttc"}
+_INDEX_VERSION = 1
+
+# Ordem de preferência quando nenhuma fonte é indicada (nomes normalizados do arquivo).
+PREFERRED_FONTS = [
+    "arial",
+    "calibri",
+    "seguiemj",
+    "liberationsansregular",
+    "liberationsans",
+    "arimoregular",
+    "arimo",
+    "dejavusans",
+    "notosansregular",
+    "notosans",
+    "freesans",
+    "helvetica",
+]
+
+
+def normalize_name(name: str) -> str:
+    """'DejaVu Sans' / 'DejaVuSans.ttf' / 'dejavu-sans' -> 'dejavusans'."""
+    stem = Path(name).stem if Path(name).suffix.lower() in FONT_EXTS else name
+    return re.sub(r"[^0-9a-z]", "", stem.lower())
+
+
+def font_dirs() -> List[Path]:
+    dirs = []
+    extra = os.environ.get("LOGIK_FONT_DIRS")
+    if extra:
+        dirs += [Path(d) for d in extra.split(os.pathsep) if d]
+    home = Path.home()
+    if sys.platform.startswith("win"):
+        dirs.append(Path(os.environ.get("WINDIR", r"C:\Windows")) / "Fonts")
+        local = os.environ.get("LOCALAPPDATA")
+        if local:
+            dirs.append(Path(local) / "Microsoft" / "Windows" / "Fonts")
+    elif sys.platform == "darwin":
+        dirs += [Path("/System/Library/Fonts"), Path("/Library/Fonts"), home / "Library" / "Fonts"]
+    else:
+        data_home = Path(os.environ.get("XDG_DATA_HOME", home / ".local" / "share"))
+        dirs += [Path("/usr/share/fonts"), Path("/usr/local/share/fonts"), data_home / "fonts", home / ".fonts"]
+    return [d for d in dirs if d.is_dir()]
+
+
+def cache_path() -> Path:
+    if sys.platform.startswith("win") and os.environ.get("LOCALAPPDATA"):
+        base = Path(os.environ["LOCALAPPDATA"])
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "logik-bioinfo" / "fonts.json"
+
+
+def _scan(roots: List[Path]):
+    """Varre os diretórios; retorna (fontes por nome normalizado, mtimes dos diretórios)."""
+    fonts: Dict[str, str] = {}
+    mtimes: Dict[str, int] = {}
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            try:
+                mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            except OSError:
+                continue
+            for name in sorted(filenames):
+                if Path(name).suffix.lower() in FONT_EXTS:
+                    fonts.setdefault(normalize_name(name), os.path.join(dirpath, name))
+    return fonts, mtimes
+
+
+def _cache_valid(data: Dict, roots: List[Path]) -> bool:
+    if data.get("version") != _INDEX_VERSION:
+        return False
+    if data.get("roots") != [str(r) for r in roots]:
+        return False
+    for dirpath, mtime in data.get("dirs", {}).items():
+        try:
+            if os.stat(dirpath).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+@lru_cache(maxsize=1)
+def font_index() -> Dict[str, str]:
+    """Índice {nome normalizado: caminho}, lido do cache em disco quando ainda válido."""
+    roots = font_dirs()
+    path = cache_path()
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if _cache_valid(data, roots):
+            return data["fonts"]
+    except (OSError, ValueError):
+        pass
+
+    fonts, mtimes = _scan(roots)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": _INDEX_VERSION, "roots": [str(r) for r in roots], "dirs": mtimes, "fonts": fonts}
+        path.write_text(json.dumps(payload), encoding="utf-8")
+    except OSError:
+        pass  # cache é só otimização
+    return fonts
+
+
+@lru_cache(maxsize=64)
+def resolve_font(font: Optional[str]) -> Optional[str]:
+    """
+    Caminho da fonte a usar: arquivo existente, nome de família/arquivo presente
+    no índice ('DejaVu Sans', 'arial') ou, sem indicação, a primeira preferida disponível.
+    """
+    if font:
+        if os.path.isfile(font):
+            return font
+        found = font_index().get(normalize_name(font))
+        if found:
+            return found
+    index = font_index()
+    for name in PREFERRED_FONTS:
+        if name in index:
+            return index[name]
+    return None
+
+
+@lru_cache(maxsize=32)
+def _truetype(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
+
+
+def load_font(font_path: Optional[str], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Carrega (com cache) a fonte pedida ou a melhor disponível; por fim, a default bitmap do Pillow."""
+    for cand in (resolve_font(font_path), resolve_font(None)):
+        if cand:
+            try:
+                return _truetype(cand, size)
+            except Exception:
+                continue
+    return ImageFont.load_default()
@@ -0,0 +1,270 @@
+"""
+Marca d'água invisível no domínio da frequência e verificação em lote.
+
+A marca visível sai com um recorte. Esta grava um identificador de 64 bits
+(sha256 do texto da marca) na luminância, por espalhamento espectral: a chave
+sorteia 1 de cada 4 blocos 8x8 e, em cada um, soma ±strength a 12
+coeficientes de frequência média da DCT com sinais pseudoaleatórios também
+derivados da chave (cada bit fica em 4 blocos). A detecção é cega (não
+precisa do original): correlaciona os mesmos coeficientes dos mesmos blocos
+com os mesmos sinais.
+
+Os blocos ficam numa grade canônica de 256x256 da luminância, e não nos
+pixels da imagem: a diferença, arredondada na grade, é ampliada sem
+interpolação (NEAREST) para o tamanho da imagem, e na verificação a imagem é
+reduzida de volta para a grade. Assim a marca sobrevive a redimensionamento e
+a recompressão JPEG/WebP (que mexem pouco na faixa média), e o custo da
+inserção é quase independente do tamanho da imagem: uma DCT de 256x256
+vetorizada em NumPy e uma soma na imagem cheia.
+O custo que sobra é no PNG sem perdas: a diferença é constante em cada célula
+da grade (~10-15 px numa figura de 300 DPI), então os filtros do PNG seguem
+prevendo os pixels dentro dela, e só 1/4 dos blocos muda. Em
+CNPq_Descriptive_Flow.png e Covid_Tree.png (perfil smallest) o PNG fica 5%
+e 2% maior, e inserção mais codificação extra somam 5-12% do tempo do
+watermark_tiled.py (~0,2 s de inserção por figura); z >= 12 depois de
+redução a 1/3 + JPEG q70, de redução a 1/2 + JPEG q50 e de WebP q60.
+Recortar a imagem desalinha a grade: um recorte não apaga a marca do arquivo
+original publicado, mas a cópia recortada deixa de ser detectada.
+
+Inserção, nas ferramentas de marca (junto da visível):
+
+    python portfolio/watermark_images.py --dir in --outdir out --invisible --invisible-key "segredo"
+
+Verificação (pool de processos, uma linha por arquivo com a confiança):
+
+    python portfolio/invisible_mark.py --dir publicadas --invisible-key "segredo" --jobs 0 --json relatorio.json
+
+O texto (--text) identifica o dono; a chave define os sinais, então sem ela a
+marca não é detectada nem removida com precisão. z é a correlação normalizada
+(sem a marca, ~ N(0, 1)); a marca é dada como presente com z >= 6, e a
+confiança informada é Φ(z - 3): 50% em z = 3, 99,9% no limiar.
+"""
+import argparse
+import hashlib
+import json
+import math
+import time
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+from batch import FileResult, file_size, iter_results
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+GRID = 256  # lado da grade canônica da luminância
+BLOCK = 8
+PAYLOAD_BITS = 64
+MARK_EVERY = 4  # 1 bloco marcado a cada MARK_EVERY
+# Coeficientes de frequência média (linha, coluna) de cada bloco 8x8
+BAND = ((0, 3), (1, 2), (2, 1), (3, 0), (0, 4), (1, 3), (2, 2), (3, 1), (4, 0), (1, 4), (2, 3), (3, 2))
+DEFAULT_TEXT = "© 2025 Felipe Alberto Lei | Logik Bioinfo"
+DEFAULT_KEY = "logik-bioinfo"
+DEFAULT_STRENGTH = 12.0
+DETECT_Z = 6.0
+VERIFY_EXTS = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".webp"}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("a marca invisível precisa do NumPy (pip install numpy)")
+
+
+@lru_cache(maxsize=1)
+def _dct_matrix():
+    """Matriz da DCT-II ortonormal 8x8: coeficientes = D @ bloco @ D.T."""
+    k = np.arange(BLOCK)[:, None]
+    n = np.arange(BLOCK)[None, :]
+    d = np.cos(math.pi * (2 * n + 1) * k / (2 * BLOCK)) * math.sqrt(2 / BLOCK)
+    d[0] /= math.sqrt(2)
+    return d
+
+
+@lru_cache(maxsize=8)
+def _layout(key: str):
+    """Blocos marcados, sinais ±1 por (bloco marcado, coeficiente) e o bit de cada bloco, derivados da chave."""
+    seed = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big")
+    rng = np.random.default_rng(seed)
+    blocks = (GRID // BLOCK) ** 2
+    marked = np.sort(rng.permutation(blocks)[:blocks // MARK_EVERY])
+    bit_of_block = rng.permutation(len(marked)) % PAYLOAD_BITS
+    chips = rng.choice(np.array([-1.0, 1.0]), size=(len(marked), len(BAND)))
+    return marked, chips, bit_of_block
+
+
+def payload_bits(text: str):
+    """64 bits do sha256 do texto, como ±1."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()[:PAYLOAD_BITS // 8]
+    bits = np.unpackbits(np.frombuffer(digest, dtype=np.uint8))
+    return bits.astype(np.float64) * 2 - 1
+
+
+def _band_index():
+    rows, cols = zip(*BAND)
+    return np.array(rows), np.array(cols)
+
+
+def _grid_luma(im: Image.Image):
+    """Luminância reduzida para a grade canônica (float64, GRID x GRID)."""
+    luma = im.convert("L") if im.mode != "L" else im
+    return np.asarray(luma.resize((GRID, GRID), Image.BOX), dtype=np.float64)
+
+
+def band_coefficients(grid):
+    """DCT 8x8 de todos os blocos de uma vez; devolve (blocos, len(BAND))."""
+    d = _dct_matrix()
+    n = GRID // BLOCK
+    blocks = grid.reshape(n, BLOCK, n, BLOCK).transpose(0, 2, 1, 3)
+    coefs = d @ blocks @ d.T
+    rows, cols = _band_index()
+    return coefs[:, :, rows, cols].reshape(n * n, len(BAND))
+
+
+def mark_pattern(text: str, key: str = DEFAULT_KEY, strength: float = DEFAULT_STRENGTH):
+    """Diferença a somar à luminância, na grade canônica (inversa da DCT só da faixa marcada)."""
+    marked, chips, bit_of_block = _layout(key)
+    bits = payload_bits(text)
+    n = GRID // BLOCK
+    coefs = np.zeros((n * n, BLOCK, BLOCK))
+    rows, cols = _band_index()
+    coefs[marked[:, None], rows, cols] = strength * chips * bits[bit_of_block][:, None]
+    d = _dct_matrix()
+    spatial = d.T @ coefs @ d
+    return spatial.reshape(n, n, BLOCK, BLOCK).transpose(0, 2, 1, 3).reshape(GRID, GRID)
+
+
+def embed(im: Image.Image, text: str, key: str = DEFAULT_KEY, strength: float = DEFAULT_STRENGTH) -> Image.Image:
+    """
+    Devolve uma cópia de im com a marca invisível. A diferença é somada igualmente
+    a R, G e B, o que soma exatamente o mesmo valor à luminância.
+    """
+    _require_numpy()
+    # Diferença inteira constante por célula da grade, ampliada sem interpolação e separada
+    # em duas máscaras (positiva e negativa): a soma na imagem cheia fica com o ImageChops
+    pattern = np.rint(mark_pattern(text, key, strength))
+    pos = Image.fromarray(np.clip(pattern, 0, 255).astype(np.uint8), "L").resize(im.size, Image.NEAREST)
+    neg = Image.fromarray(np.clip(-pattern, 0, 255).astype(np.uint8), "L").resize(im.size, Image.NEAREST)
+    if im.mode not in ("RGB", "RGBA", "L"):
+        im = im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+    if im.mode == "RGBA":
+        zero = Image.new("L", im.size, 0)  # alfa intacto
+        pos, neg = Image.merge("RGBA", (pos, pos, pos, zero)), Image.merge("RGBA", (neg, neg, neg, zero))
+    elif im.mode == "RGB":
+        pos, neg = Image.merge("RGB", (pos, pos, pos)), Image.merge("RGB", (neg, neg, neg))
+    return ImageChops.subtract(ImageChops.add(im, pos), neg)
+
+
+def detect(im: Image.Image, text: str, key: str = DEFAULT_KEY) -> Dict:
+    """Correlação da imagem com a marca de text/key: z, bits conferidos e confiança."""
+    _require_numpy()
+    marked, chips, bit_of_block = _layout(key)
+    bits = payload_bits(text)
+    products = band_coefficients(_grid_luma(im))[marked] * chips
+    per_bit = np.bincount(bit_of_block, weights=products.sum(axis=1), minlength=PAYLOAD_BITS)
+    # Sem marca, cada produto tem média ~0: z = soma alinhada aos bits / desvio da soma
+    sigma = products.std() * math.sqrt(products.size)
+    z = float((per_bit * bits).sum() / sigma) if sigma > 0 else 0.0
+    matched = int((np.sign(per_bit) == bits).sum())
+    confidence = 0.5 * (1 + math.erf((z - DETECT_Z / 2) / math.sqrt(2)))
+    return {"z": round(z, 2), "bits": matched, "detected": z >= DETECT_Z, "confidence": round(confidence, 4)}
+
+
+def verify_file(path: Path, text: str, key: str) -> Tuple[FileResult, Dict]:
+    """Worker da verificação; JPEG é decodificado já reduzido (draft) perto da grade."""
+    try:
+        with Image.open(path) as im:
+            size = im.size
+            im.draft("L", (GRID, GRID))
+            result = detect(im, text, key)
+    except Exception as e:
+        return FileResult(False, f"ERRO: {path.name} -> {e}"), {}
+    result.update(file=path.name, width=size[0], height=size[1])
+    state = "marca presente" if result["detected"] else "marca ausente"
+    message = (
+        f"{'OK' if result['detected'] else 'AVISO'}: {path.name} -> {state} "
+        f"(z={result['z']:.1f}, {result['bits']}/{PAYLOAD_BITS} bits, confiança {result['confidence']:.1%})"
+    )
+    return FileResult(True, message, file_size(path)), result
+
+
+def verify_dir(in_dir: Path, text: str, key: str, jobs: int = 1, recursive: bool = False, json_path: Optional[str] = None) -> List[Dict]:
+    pattern = "**/*" if recursive else "*"
+    files = sorted(p for p in in_dir.glob(pattern) if p.is_file() and p.suffix.lower() in VERIFY_EXTS)
+    if not files:
+        print(f"Nenhuma imagem suportada encontrada em: {in_dir}")
+        return []
+    print(f"Verificando {len(files)} arquivo(s) de {in_dir}")
+    start = time.perf_counter()
+    results, errors, bytes_in = [], 0, 0
+    for res, result in iter_results(files, partial(verify_file, text=text, key=key), jobs):
+        print(res.message)
+        if not res.ok:
+            errors += 1
+            continue
+        bytes_in += res.bytes_in
+        results.append(result)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    found = sum(r["detected"] for r in results)
+    print(
+        f"Resumo: {found} de {len(results)} com a marca, {errors} ERRO em {elapsed:.2f} s "
+        f"| {len(files) / elapsed:.2f} img/s | {bytes_in / (1024 * 1024) / elapsed:.2f} MB/s"
+    )
+    if json_path:
+        Path(json_path).write_text(json.dumps(results, indent=1, ensure_ascii=False), encoding="utf-8")
+        print(f"Relatório: {json_path}")
+    return results
+
+
+def add_invisible_args(parser) -> None:
+    parser.add_argument("--invisible", action="store_true", help="Grava também a marca invisível (DCT) com o texto da marca; o PNG sai ~2-5%% maior.")
+    parser.add_argument("--invisible-key", default=DEFAULT_KEY, help="Chave secreta da marca invisível (a mesma na verificação).")
+    parser.add_argument(
+        "--invisible-strength",
+        type=float,
+        default=DEFAULT_STRENGTH,
+        help=f"Amplitude por coeficiente DCT; maior resiste mais a recompressão (default: {DEFAULT_STRENGTH}).",
+    )
+
+
+def invisible_from_args(args) -> Optional[Dict]:
+    """Parâmetros da marca invisível para o worker (None = desligada)."""
+    if not args.invisible:
+        return None
+    _require_numpy()
+    return {"key": args.invisible_key, "strength": args.invisible_strength}
+
+
+def invisible_params(invisible: Optional[Dict]) -> Optional[Dict]:
+    """Para o manifesto: a chave entra só como hash (o manifesto fica junto das saídas)."""
+    if not invisible:
+        return None
+    return {"key_sha256": hashlib.sha256(invisible["key"].encode("utf-8")).hexdigest(), "strength": invisible["strength"]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Verifica a marca d'água invisível em um diretório de imagens.")
+    ap.add_argument("--dir", required=True, help="Diretório com as imagens a verificar.")
+    ap.add_argument("--text", default=DEFAULT_TEXT, help="Texto da marca usado na inserção.")
+    ap.add_argument("--invisible-key", default=DEFAULT_KEY, help="Chave secreta usada na inserção.")
+    ap.add_argument("--recursive", action="store_true", help="Inclui subpastas.")
+    ap.add_argument("--jobs", type=int, default=1, help="Processos paralelos (1 = serial; 0 = todos os núcleos).")
+    ap.add_argument("--json", help="Grava o resultado por arquivo (z, bits, confiança) neste JSON.")
+    args = ap.parse_args()
+
+    in_dir = Path(args.dir).resolve()
+    if not in_dir.exists():
+        print(f"ERRO: diretório de entrada não existe: {in_dir}")
+        return
+    if np is None:
+        print("ERRO: a verificação precisa do NumPy (pip install numpy).")
+        return
+    verify_dir(in_dir, args.text, args.invisible_key, args.jobs, args.recursive, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Manifesto de build incremental compartilhado pelas ferramentas do portfólio.
+
+Cada saída gerada é registrada com o hash do conteúdo da fonte e o hash dos
+parâmetros efetivos (texto, opacidade, ângulo, dpi, fonte...). Numa nova
+execução a saída só é refeita se a fonte, os parâmetros ou o próprio arquivo
+de saída mudaram. Para não reler fontes grandes a cada execução, o hash fica
+associado ao (tamanho, mtime) do arquivo, como no índice do git.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+MANIFEST_NAME = ".build-manifest.json"
+_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def params_digest(params: Dict) -> str:
+    """Hash estável dos parâmetros efetivos (ordem das chaves não importa)."""
+    payload = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """
+    Manifesto em JSON. As chaves das saídas são caminhos relativos ao
+    diretório do manifesto (quando possível), para que ele possa ser
+    versionado ou movido junto com a pasta de saída.
+    """
+
+    def __init__(self, path: Path, force: bool = False):
+        self.path = Path(path)
+        self._root = self.path.parent.resolve()
+        self.force = force
+        self.built = 0
+        self.skipped = 0
+        self._outputs: Dict[str, Dict] = {}
+        self._sources: Dict[str, Dict] = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == _VERSION:
+                    self._outputs = data.get("outputs", {})
+                    self._sources = data.get("sources", {})
+            except (OSError, ValueError):
+                print(f"AVISO: manifesto ilegível, ignorando: {self.path}")
+
+    @classmethod
+    def for_outdir(cls, out_dir: Path, manifest: Optional[str] = None, force: bool = False) -> "BuildManifest":
+        """Manifesto indicado em --manifest ou, por padrão, <outdir>/.build-manifest.json."""
+        return cls(Path(manifest).resolve() if manifest else out_dir / MANIFEST_NAME, force=force)
+
+    def _key(self, path: Path) -> str:
+        path = Path(path).resolve()
+        try:
+            return path.relative_to(self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def source_hash(self, src: Path) -> str:
+        """sha256 da fonte, reaproveitado enquanto tamanho e mtime não mudarem."""
+        st = os.stat(src)
+        key = self._key(src)
+        cached = self._sources.get(key)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        digest = file_sha256(src)
+        self._sources[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        self._dirty = True
+        return digest
+
+    def is_fresh(self, outputs: Iterable[Path], src: Path, params: Dict) -> bool:
+        """True se todas as saídas existem e foram geradas desta fonte com estes parâmetros."""
+        if self.force:
+            return False
+        outputs = list(outputs)
+        if not outputs:
+            return False
+        src_hash = self.source_hash(src)
+        digest = params_digest(params)
+        for out in outputs:
+            entry = self._outputs.get(self._key(out))
+            if not entry or not Path(out).exists():
+                return False
+            if entry["source_sha256"] != src_hash or entry["params"] != digest:
+                return False
+            st = os.stat(out)
+            if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+                return False
+        return True
+
+    def record(self, outputs: Iterable[Path], src: Path, params: Dict) -> None:
+        src_hash = self.source_hash(src)
+        digest = params_digest(params)
+        for out in outputs:
+            st = os.stat(out)
+            self._outputs[self._key(out)] = {
+                "source": self._key(src),
+                "source_sha256": src_hash,
+                "params": digest,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            }
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        data = {"version": _VERSION, "outputs": self._outputs, "sources": self._sources}
+        tmp.write_text(json.dumps(data, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def summary(self) -> str:
+        return f"Build: {self.built} gerado(s), {self.skipped} ignorado(s) (inalterados)"
@@ -0,0 +1,318 @@
+"""
+Metadados sem recodificação (--metadata-only).
+
+save_with_metadata grava Copyright/Author/URL/License recodificando a imagem
+(no JPEG, mais uma geração com perdas). Aqui o contêiner é reescrito direto
+no fluxo de bytes, sem decodificar pixels:
+
+    PNG   chunks tEXt (iTXt quando o texto não cabe em Latin-1) inseridos antes
+          do primeiro IDAT; chunks de texto com as mesmas chaves são removidos.
+    JPEG  EXIF (Artist, Copyright, XPAuthor) e XMP (dc:creator, dc:rights,
+          xmpRights:WebStatement/UsageTerms) em segmentos APP1. Um EXIF
+          existente é preservado: o IFD0 é regravado no fim do bloco TIFF com
+          as tags novas e os offsets antigos continuam válidos (o IFD0 e os
+          valores que uma gravação anterior deixou no fim do bloco são
+          descartados, então repetir não faz o EXIF crescer). Num pacote XMP
+          existente só as propriedades gravadas aqui são trocadas; as demais
+          (photoshop:City, xmp:CreatorTool...) ficam.
+
+Os dados de imagem (IDAT, scan do JPEG) são copiados em blocos, então o custo
+é o de ler e gravar o arquivo. Campos None não alteram o que já existe.
+"""
+import io
+import os
+import shutil
+import struct
+import tempfile
+import xml.etree.ElementTree as ET
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_TEXT_CHUNKS = {b"tEXt", b"zTXt", b"iTXt"}
+_EXIF_HEADER = b"Exif\x00\x00"
+_XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+_COPY_BLOCK = 1 << 20
+_RDF = "{http://www.w3.org/1999/02/22-rdf-syntax-ns#}"
+
+# Tags do IFD0 (mesmas que save_with_metadata grava via piexif)
+TAG_ARTIST = 0x013B
+TAG_COPYRIGHT = 0x8298
+TAG_XP_AUTHOR = 0x9C9D
+_TYPE_BYTE, _TYPE_ASCII = 1, 2
+
+
+def metadata_fields(
+    author: Optional[str], copyright_text: Optional[str], url: Optional[str], license_text: Optional[str]
+) -> Dict[str, str]:
+    """Chaves tEXt usadas por save_with_metadata; valores vazios/None são omitidos."""
+    fields = {"Copyright": copyright_text, "Author": author, "URL": url, "License": license_text}
+    return {k: v for k, v in fields.items() if v}
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def png_text_chunk(key: str, value: str) -> bytes:
+    """tEXt quando o valor cabe em Latin-1 (como o PngInfo.add_text do Pillow), senão iTXt UTF-8."""
+    try:
+        return _png_chunk(b"tEXt", key.encode("latin-1") + b"\x00" + value.encode("latin-1"))
+    except UnicodeEncodeError:
+        return _png_chunk(b"iTXt", key.encode("latin-1") + b"\x00\x00\x00\x00\x00" + value.encode("utf-8"))
+
+
+def _copy_exact(src: BinaryIO, dst: BinaryIO, size: int) -> None:
+    while size > 0:
+        block = src.read(min(size, _COPY_BLOCK))
+        if not block:
+            raise ValueError("arquivo truncado")
+        dst.write(block)
+        size -= len(block)
+
+
+def patch_png(src: BinaryIO, dst: BinaryIO, fields: Dict[str, str]) -> None:
+    if src.read(8) != PNG_SIGNATURE:
+        raise ValueError("não é um PNG")
+    dst.write(PNG_SIGNATURE)
+    keys = {k.encode("latin-1") for k in fields}
+    inserted = False
+    while True:
+        header = src.read(8)
+        if len(header) < 8:
+            raise ValueError("PNG sem IEND")
+        length, kind = struct.unpack(">I4s", header)
+        if kind in _PNG_TEXT_CHUNKS:
+            body = src.read(length + 4)
+            if body.split(b"\x00", 1)[0] in keys:
+                continue  # substituído pelo chunk novo
+            dst.write(header + body)
+            continue
+        if kind in (b"IDAT", b"IEND") and not inserted:
+            for key, value in fields.items():
+                dst.write(png_text_chunk(key, value))
+            inserted = True
+        dst.write(header)
+        _copy_exact(src, dst, length + 4)  # dados + CRC, sem decodificar
+        if kind == b"IEND":
+            return
+
+
+def _read_jpeg_segments(src: BinaryIO) -> List[Tuple[int, Optional[bytes]]]:
+    """
+    Segmentos (marcador, payload; None nos marcadores sem tamanho) entre o SOI
+    e o SOS; o arquivo fica posicionado no SOS.
+    """
+    if src.read(2) != b"\xff\xd8":
+        raise ValueError("não é um JPEG")
+    segments = []
+    while True:
+        byte = src.read(1)
+        if not byte:
+            raise ValueError("JPEG sem SOS")
+        if byte != b"\xff":
+            raise ValueError("marcador JPEG inválido")
+        marker = src.read(1)[0]
+        while marker == 0xFF:  # bytes de preenchimento
+            marker = src.read(1)[0]
+        if marker == 0xDA:
+            src.seek(-2, os.SEEK_CUR)
+            return segments
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            segments.append((marker, None))
+            continue
+        (length,) = struct.unpack(">H", src.read(2))
+        segments.append((marker, src.read(length - 2)))
+
+
+def _segment(marker: int, payload: Optional[bytes]) -> bytes:
+    if payload is None:
+        return bytes((0xFF, marker))
+    if len(payload) + 2 > 0xFFFF:
+        raise ValueError(f"segmento APP{marker - 0xE0} maior que 64 KB")
+    return bytes((0xFF, marker)) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _exif_entries(fields: Dict[str, str]) -> Dict[int, Tuple[int, bytes]]:
+    entries = {}
+    if "Author" in fields:
+        entries[TAG_ARTIST] = (_TYPE_ASCII, fields["Author"].encode("utf-8", "ignore") + b"\x00")
+        entries[TAG_XP_AUTHOR] = (_TYPE_BYTE, fields["Author"].encode("utf-16le") + b"\x00\x00")
+    if "Copyright" in fields:
+        entries[TAG_COPYRIGHT] = (_TYPE_ASCII, fields["Copyright"].encode("utf-8", "ignore") + b"\x00")
+    return entries
+
+
+def patch_exif(tiff: Optional[bytes], fields: Dict[str, str]) -> Optional[bytes]:
+    """
+    Bloco TIFF do EXIF com as tags de fields no IFD0. O resto do bloco fica
+    intacto; um IFD0 novo (entradas antigas + novas) é anexado ao fim e o
+    cabeçalho passa a apontar para ele.
+    """
+    new = _exif_entries(fields)
+    if not new:
+        return tiff
+    if not tiff:
+        tiff = b"II*\x00" + struct.pack("<I", 8) + struct.pack("<HI", 0, 0)
+    bo = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if bo is None:
+        raise ValueError("EXIF com ordem de bytes desconhecida")
+    (ifd0,) = struct.unpack(bo + "I", tiff[4:8])
+    (count,) = struct.unpack(bo + "H", tiff[ifd0:ifd0 + 2])
+    raw = {}
+    for i in range(count):
+        entry = tiff[ifd0 + 2 + 12 * i:ifd0 + 14 + 12 * i]
+        raw[struct.unpack(bo + "H", entry[:2])[0]] = entry
+    (next_ifd,) = struct.unpack(bo + "I", tiff[ifd0 + 2 + 12 * count:ifd0 + 6 + 12 * count])
+
+    # O IFD0 antigo e os valores das tags trocadas só são referenciados pelo IFD0
+    # antigo: se estão no fim do bloco (gravação anterior daqui), são descartados
+    spans = [(ifd0, ifd0 + 6 + 12 * count)]
+    for tag in new:
+        if tag in raw:
+            kind, size = struct.unpack(bo + "HI", raw[tag][2:8])
+            if kind in (_TYPE_BYTE, _TYPE_ASCII, 7) and size > 4:  # 7 = UNDEFINED (1 byte)
+                (offset,) = struct.unpack(bo + "I", raw[tag][8:12])
+                spans.append((offset, offset + size))
+    end = len(tiff)
+    for start, stop in sorted(spans, reverse=True):
+        if start >= 8 and stop <= end <= stop + 1:  # +1: byte de alinhamento
+            end = start
+    out = bytearray(tiff[:end])
+    if len(out) % 2:
+        out += b"\x00"
+    for tag, (kind, value) in new.items():
+        if len(value) <= 4:
+            field = value.ljust(4, b"\x00")
+        else:
+            field = struct.pack(bo + "I", len(out))
+            out += value + (b"\x00" if len(value) % 2 else b"")
+        raw[tag] = struct.pack(bo + "HHI", tag, kind, len(value)) + field
+
+    new_ifd0 = len(out)
+    out += struct.pack(bo + "H", len(raw))
+    for tag in sorted(raw):  # o TIFF exige as entradas em ordem crescente de tag
+        out += raw[tag]
+    out += struct.pack(bo + "I", next_ifd)
+    out[4:8] = struct.pack(bo + "I", new_ifd0)
+    return bytes(out)
+
+
+def xmp_packet(fields: Dict[str, str]) -> bytes:
+    props = []
+    if "Author" in fields:
+        props.append(f"<dc:creator><rdf:Seq><rdf:li>{escape(fields['Author'])}</rdf:li></rdf:Seq></dc:creator>")
+    if "Copyright" in fields:
+        props.append(f'<dc:rights><rdf:Alt><rdf:li xml:lang="x-default">{escape(fields["Copyright"])}</rdf:li></rdf:Alt></dc:rights>')
+    if "URL" in fields:
+        props.append(f"<xmpRights:WebStatement>{escape(fields['URL'])}</xmpRights:WebStatement>")
+    if "License" in fields:
+        props.append(
+            f'<xmpRights:UsageTerms><rdf:Alt><rdf:li xml:lang="x-default">{escape(fields["License"])}</rdf:li></rdf:Alt></xmpRights:UsageTerms>'
+        )
+    body = "\n   ".join(props)
+    return (
+        '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
+        '<x:xmpmeta xmlns:x="adobe:ns:meta/">\n'
+        ' <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">\n'
+        '  <rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        ' xmlns:xmpRights="http://ns.adobe.com/xap/1.0/rights/">\n'
+        f"   {body}\n"
+        "  </rdf:Description>\n"
+        " </rdf:RDF>\n"
+        "</x:xmpmeta>\n"
+        '<?xpacket end="w"?>'
+    ).encode("utf-8")
+
+
+def merge_xmp(packet: Optional[bytes], fields: Dict[str, str]) -> bytes:
+    """
+    Pacote XMP com as propriedades de fields sobre as de packet: só as mesmas
+    propriedades (em elemento ou atributo) são removidas do pacote existente.
+    Sem pacote, ou com um pacote ilegível, devolve um pacote novo.
+    """
+    fresh = xmp_packet(fields)
+    if not packet:
+        return fresh
+    try:
+        for _, (prefix, uri) in ET.iterparse(io.BytesIO(packet), events=("start-ns",)):
+            try:
+                ET.register_namespace(prefix, uri)  # mantém os prefixos originais na saída
+            except ValueError:
+                pass  # prefixo reservado (ns0...): o ElementTree escolhe outro
+        root = ET.fromstring(packet)
+    except ET.ParseError:
+        return fresh
+    rdf = root if root.tag == _RDF + "RDF" else root.find(_RDF + "RDF")
+    if rdf is None:
+        return fresh
+    props = list(ET.fromstring(fresh).iter(_RDF + "Description"))[0]
+    descriptions = rdf.findall(_RDF + "Description")
+    if not descriptions:
+        descriptions = [ET.SubElement(rdf, _RDF + "Description", {_RDF + "about": ""})]
+    for desc in descriptions:
+        for prop in props:
+            desc.attrib.pop(prop.tag, None)
+            for old in desc.findall(prop.tag):
+                desc.remove(old)
+    descriptions[0].extend(props)
+    return (
+        '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>\n'
+        + ET.tostring(root, encoding="unicode")
+        + '\n<?xpacket end="w"?>'
+    ).encode("utf-8")
+
+
+def patch_jpeg(src: BinaryIO, dst: BinaryIO, fields: Dict[str, str]) -> None:
+    segments = _read_jpeg_segments(src)
+    tiff = xmp = None
+    kept = []
+    for marker, payload in segments:
+        if marker == 0xE1 and tiff is None and payload.startswith(_EXIF_HEADER):
+            tiff = payload[len(_EXIF_HEADER):]
+        elif marker == 0xE1 and payload.startswith(_XMP_HEADER):
+            xmp = xmp or payload[len(_XMP_HEADER):]  # mesclado com os campos novos
+        else:
+            kept.append((marker, payload))
+
+    # APP0 (JFIF) precisa continuar logo após o SOI; EXIF e XMP vêm em seguida
+    lead = 0
+    while lead < len(kept) and kept[lead][0] == 0xE0:
+        lead += 1
+    dst.write(b"\xff\xd8")
+    for marker, payload in kept[:lead]:
+        dst.write(_segment(marker, payload))
+    tiff = patch_exif(tiff, fields)
+    if tiff:
+        dst.write(_segment(0xE1, _EXIF_HEADER + tiff))
+    dst.write(_segment(0xE1, _XMP_HEADER + merge_xmp(xmp, fields)))
+    for marker, payload in kept[lead:]:
+        dst.write(_segment(marker, payload))
+    shutil.copyfileobj(src, dst, _COPY_BLOCK)  # SOS + dados entrópicos + EOI, intactos
+
+
+def patch_file(src: Path, dst: Path, fields: Dict[str, str]) -> None:
+    """
+    Grava em dst a cópia de src com os metadados de fields. O formato vem da
+    assinatura do arquivo; dst pode ser o próprio src (troca atômica via
+    arquivo temporário na mesma pasta).
+    """
+    src, dst = Path(src), Path(dst)
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp")
+    try:
+        with open(src, "rb") as fin, os.fdopen(fd, "wb") as fout:
+            head = fin.read(8)
+            fin.seek(0)
+            if head.startswith(PNG_SIGNATURE):
+                patch_png(fin, fout, fields)
+            elif head.startswith(b"\xff\xd8"):
+                patch_jpeg(fin, fout, fields)
+            else:
+                raise ValueError("formato sem suporte (apenas PNG e JPEG)")
+        shutil.copymode(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,211 @@
+"""
+Renderização de páginas de PDF em paralelo (usado por convert_pdfs.py e convert_pages.py).
+
+As páginas são divididas em faixas contíguas; cada worker abre o seu próprio
+documento (objetos do PyMuPDF não podem ser compartilhados entre threads ou
+processos), renderiza a faixa e grava os PNGs. Os resultados voltam na ordem
+das páginas, então o progresso impresso é o mesmo do modo serial.
+
+Sem perfil de codificação o PNG é gravado pelo próprio PyMuPDF (pix.save);
+com --encoder a página passa ao Pillow sem cópia e é salva com o perfil.
+
+Com --max-width/--max-height o zoom de cada página é reduzido para caber nos
+limites: a página é rasterizada já no tamanho final, sem renderizar no dpi
+cheio para reduzir depois.
+
+Com --clip só a região pedida da página é rasterizada (o custo cai com a área);
+com um RenderCache (render_cache.py) cada página já renderizada com os mesmos
+parâmetros é copiada do cache em vez de renderizada.
+"""
+import math
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from batch import FileResult, file_size, iter_results, resolve_jobs
+from encoders import save_image
+from profiling import file_stats, record_file, stage
+from render_cache import RenderCache
+
+Clip = Tuple[float, float, float, float]  # x0, y0, x1, y1 em pontos (1/72"), origem no canto superior esquerdo
+
+
+@dataclass
+class PageJob:
+    pdf_path: Path
+    pages: List[Tuple[int, Path]]  # (índice 0-based, PNG de saída)
+    dpi: int
+    profile: bool = False  # devolve estatísticas por página (profiling.py)
+    encoder: Optional[str] = None  # perfil de encoders.py; None = pix.save do PyMuPDF
+    max_width: Optional[int] = None  # limites da saída em px (decode.py)
+    max_height: Optional[int] = None
+    clip: Optional[Clip] = None  # região da página; None = página inteira
+    cache: Optional[RenderCache] = None
+    source_sha256: Optional[str] = None  # sha256 do PDF (chave do cache)
+
+
+def pixmap_to_image(pix: "fitz.Pixmap") -> Image.Image:
+    """
+    Envolve as amostras do pixmap numa Image do Pillow sem copiar (samples_mv).
+    A imagem aponta para a memória do pixmap: mantenha o pixmap vivo enquanto usá-la.
+    """
+    mode = "RGBA" if pix.alpha else ("L" if pix.n == 1 else "RGB")
+    samples = getattr(pix, "samples_mv", None)
+    if samples is None:  # PyMuPDF antigo: cópia em bytes
+        samples = pix.samples
+    return Image.frombuffer(mode, (pix.width, pix.height), samples, "raw", mode, pix.stride, 1)
+
+
+def parse_clip(spec: Optional[str]) -> Optional[Clip]:
+    """'x0,y0,x1,y1' (pontos) -> tupla; None -> None. Levanta ValueError se inválido."""
+    if not spec:
+        return None
+    try:
+        x0, y0, x1, y1 = (float(v) for v in spec.split(","))
+    except ValueError:
+        raise ValueError(f"--clip deve ser x0,y0,x1,y1 em pontos (ex.: 36,120,560,480), recebido: {spec}") from None
+    if x1 <= x0 or y1 <= y0:
+        raise ValueError(f"--clip vazio: {spec} (x1 > x0 e y1 > y0)")
+    return (x0, y0, x1, y1)
+
+
+def clip_rect(page: "fitz.Page", clip: Optional[Clip] = None) -> "fitz.Rect":
+    """Área a rasterizar: o recorte limitado à página, ou a página inteira."""
+    if clip is None:
+        return page.rect
+    rect = fitz.Rect(clip) & page.rect
+    if rect.is_empty:
+        raise ValueError(f"recorte {tuple(clip)} fora da página ({page.rect.width:.0f}x{page.rect.height:.0f} pt)")
+    return rect
+
+
+def page_zoom(
+    page: "fitz.Page", dpi: int, max_width: Optional[int] = None, max_height: Optional[int] = None, clip: Optional[Clip] = None
+) -> float:
+    """Zoom do dpi pedido (72 dpi é o baseline do PDF), reduzido para a página (ou o recorte) caber nos limites."""
+    rect = clip_rect(page, clip)
+    zoom = dpi / 72.0
+    if max_width and rect.width * zoom > max_width:
+        zoom = max_width / rect.width
+    if max_height and rect.height * zoom > max_height:
+        zoom = max_height / rect.height
+    return zoom
+
+
+def get_pixmap(
+    page: "fitz.Page", dpi: int, max_width: Optional[int] = None, max_height: Optional[int] = None, clip: Optional[Clip] = None
+) -> "fitz.Pixmap":
+    zoom = page_zoom(page, dpi, max_width, max_height, clip)
+    area = clip_rect(page, clip) if clip is not None else None
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False, clip=area)
+
+
+def render_page_image(
+    doc: "fitz.Document",
+    idx: int,
+    dpi: int,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    clip: Optional[Clip] = None,
+):
+    """Renderiza a página idx (0-based) e retorna (imagem Pillow, pixmap que a sustenta)."""
+    pix = get_pixmap(doc.load_page(idx), dpi, max_width, max_height, clip)
+    return pixmap_to_image(pix), pix
+
+
+def render_job(job: PageJob) -> List[FileResult]:
+    """Renderiza uma faixa de páginas de um PDF; um FileResult por página."""
+    results = []
+    try:
+        doc = fitz.open(job.pdf_path)
+    except Exception as e:
+        return [FileResult(False, f"ERRO: página {i + 1} -> {e}") for i, _ in job.pages]
+
+    with doc:
+        for idx, out_file in job.pages:
+            with record_file(job.profile) as timer:
+                try:
+                    name = f"{job.pdf_path.name} p{idx + 1}"
+                    out_file.parent.mkdir(parents=True, exist_ok=True)
+                    key = None
+                    if job.cache is not None and job.source_sha256:
+                        key = job.cache.key(
+                            job.source_sha256, idx, job.dpi, job.clip, job.max_width, job.max_height, job.encoder
+                        )
+                        with stage("cache"):
+                            hit = job.cache.get(key, out_file)
+                        if hit:
+                            stats = file_stats(name, timer, 0, file_size(out_file), 0)
+                            results.append(FileResult(True, f"OK: página {idx + 1} -> {out_file} (cache)", stats=stats))
+                            continue
+                    with stage("render"):
+                        pix = get_pixmap(doc.load_page(idx), job.dpi, job.max_width, job.max_height, job.clip)
+                    with stage("encode"):
+                        if job.encoder:
+                            save_image(pixmap_to_image(pix), out_file, job.encoder)
+                        else:
+                            pix.save(out_file.as_posix())
+                    if key is not None:
+                        with stage("cache"):
+                            job.cache.put(key, out_file)
+                    stats = file_stats(name, timer, 0, file_size(out_file), pix.width * pix.height)
+                    results.append(FileResult(True, f"OK: página {idx + 1} -> {out_file}", stats=stats))
+                except Exception as e:
+                    results.append(FileResult(False, f"ERRO: página {idx + 1} -> {e}"))
+    return results
+
+
+def split_pages(
+    pdf_path: Path,
+    pages: Sequence[Tuple[int, Path]],
+    dpi: int,
+    chunk_size: int,
+    profile: bool = False,
+    encoder: Optional[str] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    clip: Optional[Clip] = None,
+    cache: Optional[RenderCache] = None,
+    source_sha256: Optional[str] = None,
+) -> List[PageJob]:
+    """Divide as páginas de um PDF em faixas contíguas de até chunk_size páginas."""
+    chunk_size = max(1, chunk_size)
+    return [
+        PageJob(pdf_path, list(pages[i:i + chunk_size]), dpi, profile, encoder, max_width, max_height, clip, cache, source_sha256)
+        for i in range(0, len(pages), chunk_size)
+    ]
+
+
+def chunk_size_for(total_pages: int, jobs: int) -> int:
+    """Serial: uma faixa por PDF. Paralelo: ~4 faixas por worker, para balancear páginas pesadas."""
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1:
+        return max(1, total_pages)
+    return max(1, math.ceil(total_pages / (jobs * 4)))
+
+
+def rerun_page(
+    pdf_path: Path,
+    idx: int,
+    dpi: int,
+    encoder: Optional[str] = None,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    clip: Optional[Clip] = None,
+) -> None:
+    """Renderiza de novo uma página numa pasta temporária (usado pelo --profile-dump; sem cache)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        page_job = PageJob(
+            pdf_path, [(idx, Path(tmp) / "page.png")], dpi, encoder=encoder, max_width=max_width, max_height=max_height,
+            clip=clip,
+        )
+        render_job(page_job)
+
+
+def render_jobs(page_jobs: Sequence[PageJob], jobs: int = 1) -> Iterator[Tuple[PageJob, List[FileResult]]]:
+    """Executa as faixas (em pool quando jobs > 1) e devolve (faixa, resultados) na ordem de entrada."""
+    return zip(page_jobs, iter_results(page_jobs, render_job, jobs))
@@ -0,0 +1,264 @@
+"""
+Pipeline PDF -> marca d'água -> publicação, em memória.
+
+Substitui a sequência convert_pages.py (grava PNG 300 DPI) + watermark_*.py
+(relê e decodifica o PNG, grava outro PNG): o pixmap do PyMuPDF é entregue ao
+Pillow sem cópia, a marca é aplicada e a imagem é codificada uma única vez.
+
+O arquivo de pipeline (JSON) descreve quais PDFs/páginas passam por quais
+estágios; caminhos relativos são resolvidos a partir da pasta do arquivo:
+
+    {
+      "outdir": "publicar",
+      "dpi": 300,
+      "format": "png",
+      "encoder": "smallest",
+      "watermark": {"type": "tiled", "text": "© 2025 Felipe Alberto Lei | Logik Bioinfo", "opacity": 0.22},
+      "metadata": {"author": "Felipe Alberto Lei", "url": "https://felipeleii.github.io/LogikBioinfo/"},
+      "items": [
+        {"pdf": "CNPq_Descriptive_Flow.pdf", "pages": "6,12,15", "prefix": "CNPq"},
+        {"pdf": "Relatorio.pdf", "pages": "all", "watermark": {"type": "visible", "mode": "corner"}},
+        {"pdf": "Rascunho.pdf", "pages": "1", "watermark": null}
+      ]
+    }
+
+Chaves do item sobrepõem as globais ("watermark"/"metadata" são mescladas; null
+desliga o estágio). "type" escolhe apply_tiled_watermark ("tiled") ou
+add_visible_watermark ("visible"); as demais chaves são os argumentos da função.
+"encoder" escolhe o perfil de codificação (fast/balanced/smallest, ver
+encoders.py); --encoder na linha de comando sobrepõe o do arquivo.
+"max_width"/"max_height" (px) limitam a saída: a página é renderizada já no
+zoom reduzido (pdf_render.page_zoom). "clip": [x0, y0, x1, y1] (pontos)
+renderiza só essa região de cada página.
+Saídas: {prefix}_{stem}_pNN[_wm].{png|jpg}, como em convert_pages.py.
+"""
+import argparse
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+from batch import FileResult, file_size, iter_results
+from convert_pages import parse_pages
+from encoders import DEFAULT_ENCODER, ENCODER_PROFILES, add_encoder_args, save_image
+from manifest import BuildManifest
+from pdf_render import PageJob, chunk_size_for, parse_clip, render_page_image, split_pages
+from profiling import StatsCollector, file_stats, finish_report, record_file, stage
+from watermark_images import add_visible_watermark, save_with_metadata
+from watermark_tiled import apply_tiled_watermark
+
+STAGE_KEYS = ("watermark", "metadata")
+
+
+@dataclass
+class PipelineTask:
+    job: PageJob
+    fmt: str
+    watermark: Optional[Dict]
+    metadata: Optional[Dict]
+    encoder: str = DEFAULT_ENCODER
+    report: bool = False  # devolve tempo/tamanho de codificação por página
+
+
+def apply_watermark_stage(img, watermark: Optional[Dict]):
+    if not watermark:
+        return img
+    kwargs = dict(watermark)
+    kind = kwargs.pop("type", "tiled")
+    if kind == "tiled":
+        return apply_tiled_watermark(img, **kwargs)
+    if kind == "visible":
+        return add_visible_watermark(img, **kwargs)
+    raise ValueError(f"tipo de marca d'água desconhecido: {kind}")
+
+
+def encode_stage(
+    img, out_path: Path, watermark: Optional[Dict], metadata: Optional[Dict], encoder: str = DEFAULT_ENCODER
+) -> None:
+    """Codifica uma única vez; com metadados usa save_with_metadata (tEXt/EXIF)."""
+    if metadata is not None:
+        copyright_text = metadata.get("copyright") or (watermark or {}).get("text")
+        save_with_metadata(
+            img,
+            out_path,
+            author=metadata.get("author"),
+            copyright_text=copyright_text,
+            url=metadata.get("url"),
+            license_text=metadata.get("license"),
+            source_ext=".pdf",
+            encoder=encoder,
+        )
+    else:
+        with stage("encode"):
+            save_image(img, out_path, encoder)
+
+
+def run_task(task: PipelineTask) -> List[FileResult]:
+    """Worker: abre o PDF uma vez e leva cada página da faixa por todos os estágios."""
+    job = task.job
+    try:
+        doc = fitz.open(job.pdf_path)
+    except Exception as e:
+        return [FileResult(False, f"ERRO: {job.pdf_path.name} p{i + 1} -> {e}") for i, _ in job.pages]
+
+    results = []
+    with doc:
+        for idx, out_path in job.pages:
+            name = f"{job.pdf_path.name} p{idx + 1}"
+            with record_file(task.report) as timer:
+                try:
+                    with stage("render"):
+                        img, pix = render_page_image(doc, idx, job.dpi, job.max_width, job.max_height, job.clip)
+                    out_im = apply_watermark_stage(img, task.watermark)
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    encode_stage(out_im, out_path, task.watermark, task.metadata, task.encoder)
+                    stats = file_stats(name, timer, 0, file_size(out_path), pix.width * pix.height)
+                    del img, out_im, pix
+                    results.append(FileResult(True, f"OK: {name} -> {out_path.name}", stats=stats))
+                except Exception as e:
+                    results.append(FileResult(False, f"ERRO: {name} -> {e}"))
+    return results
+
+
+def merge_item(defaults: Dict, item: Dict) -> Dict:
+    """Chaves do item sobrepõem as globais; dicionários de estágio são mesclados, null desliga."""
+    merged = {k: v for k, v in defaults.items() if k != "items"}
+    for key, value in item.items():
+        if key in STAGE_KEYS and isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def output_name(stem: str, page: int, prefix: str, watermarked: bool, fmt: str) -> str:
+    prefix = f"{prefix}_" if prefix else ""
+    suffix = "_wm" if watermarked else ""
+    ext = "jpg" if fmt.lower() in {"jpg", "jpeg"} else "png"
+    return f"{prefix}{stem}_p{page:02d}{suffix}.{ext}"
+
+
+def load_pipeline(path: Path) -> Dict:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def run_pipeline(
+    config_path: Path,
+    jobs: int = 1,
+    force: bool = False,
+    manifest_path: Optional[str] = None,
+    encoder: Optional[str] = None,
+    encode_report: bool = False,
+) -> None:
+    config = load_pipeline(config_path)
+    base = config_path.parent
+    out_dir = (base / config.get("outdir", ".")).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = BuildManifest.for_outdir(out_dir, manifest_path, force=force)
+
+    tasks = []
+    params_by_out = {}
+    pdf_by_out = {}
+    for item in config.get("items", []):
+        cfg = merge_item(config, item)
+        pdf_path = (base / cfg["pdf"]).resolve()
+        if not pdf_path.exists():
+            print(f"ERRO: PDF não encontrado: {pdf_path}")
+            continue
+        try:
+            with fitz.open(pdf_path) as doc:
+                total = doc.page_count
+        except Exception as e:
+            print(f"ERRO: {pdf_path.name}: não foi possível abrir o PDF -> {e}")
+            continue
+        pages_spec = str(cfg.get("pages", "1"))
+        pages = list(range(1, total + 1)) if pages_spec == "all" else parse_pages(pages_spec)
+
+        dpi = int(cfg.get("dpi", 300))
+        fmt = cfg.get("format", "png")
+        item_encoder = encoder or cfg.get("encoder", DEFAULT_ENCODER)
+        if item_encoder not in ENCODER_PROFILES:
+            print(f"ERRO: {pdf_path.name}: perfil de codificação desconhecido: {item_encoder}")
+            continue
+        max_width, max_height = cfg.get("max_width"), cfg.get("max_height")
+        clip = cfg.get("clip")
+        try:
+            clip = parse_clip(",".join(map(str, clip)) if isinstance(clip, list) else clip)
+        except ValueError as e:
+            print(f"ERRO: {pdf_path.name}: {e}")
+            continue
+        watermark = cfg.get("watermark")
+        metadata = cfg.get("metadata")
+        todo = []
+        for p in pages:
+            if p < 1 or p > total:
+                print(f"AVISO: {pdf_path.name}: página {p} fora do intervalo (1..{total}), ignorando.")
+                continue
+            out_path = out_dir / output_name(pdf_path.stem, p, cfg.get("prefix", ""), bool(watermark), fmt)
+            params = {"tool": "pipeline", "page": p, "dpi": dpi, "format": fmt,
+                      "watermark": watermark, "metadata": metadata, "encoder": item_encoder}
+            if max_width or max_height:
+                params.update(max_width=max_width, max_height=max_height)
+            if clip:
+                params["clip"] = list(clip)
+            if manifest.is_fresh([out_path], pdf_path, params):
+                manifest.skipped += 1
+                continue
+            todo.append((p - 1, out_path))
+            params_by_out[out_path] = params
+            pdf_by_out[out_path] = pdf_path
+
+        for job in split_pages(
+            pdf_path, todo, dpi, chunk_size_for(len(todo), jobs), max_width=max_width, max_height=max_height, clip=clip
+        ):
+            tasks.append(PipelineTask(job, fmt, watermark, metadata, item_encoder, encode_report))
+
+    ok = errors = 0
+    collector = StatsCollector()
+    for task, results in zip(tasks, iter_results(tasks, run_task, jobs)):
+        for (_, out_path), res in zip(task.job.pages, results):
+            print(res.message)
+            collector.add(res.stats)
+            if res.ok:
+                ok += 1
+                manifest.record([out_path], pdf_by_out[out_path], params_by_out[out_path])
+                manifest.built += 1
+            else:
+                errors += 1
+
+    manifest.save()
+    print(f"Concluído. {ok} página(s) publicada(s), {errors} erro(s). Saída: {out_dir}")
+    print(manifest.summary())
+    if encode_report:
+        encoders = sorted({task.encoder for task in tasks}) or [encoder or DEFAULT_ENCODER]
+        finish_report(collector, False, None, None, encode_report="/".join(encoders))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline PDF -> marca d'água -> publicação, sem PNG intermediário.")
+    parser.add_argument("config", help="Arquivo de pipeline (JSON).")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos paralelos (1 = serial; 0 = todos os núcleos).")
+    parser.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <outdir>/.build-manifest.json).")
+    parser.add_argument("--force", action="store_true", help="Reprocessa tudo, ignorando o manifesto.")
+    add_encoder_args(parser, default=None, default_help='"encoder" do arquivo de pipeline ou smallest')
+    args = parser.parse_args()
+
+    config_path = Path(args.config).resolve()
+    if not config_path.exists():
+        print(f"ERRO: arquivo de pipeline não encontrado: {config_path}")
+        return
+    run_pipeline(
+        config_path,
+        jobs=args.jobs,
+        force=args.force,
+        manifest_path=args.manifest,
+        encoder=args.encoder,
+        encode_report=args.encode_report,
+    )
+
+
+if __name__ == "__main__":
+    main()
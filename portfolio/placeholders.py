@@ -0,0 +1,278 @@
+"""
+Placeholders (LQIP) e dimensões intrínsecas das figuras do site.
+
+As figuras do portfolio.html e dos posts carregavam sem width/height nem
+placeholder: a página pulava quando cada PNG chegava e a área ficava em branco
+até lá. Para cada imagem este módulo calcula largura, altura e uma miniatura
+borrada de poucos pixels (WebP em data URI, ~200-400 bytes) e as injeta nas
+tags <img> das páginas:
+
+    <img src="..." width="2400" height="1350" style="background:url(data:image/webp;base64,...) center/cover no-repeat" data-lqip>
+
+Com width/height o navegador reserva o espaço certo antes do download (o
+preflight do Tailwind já dá height:auto e max-width:100% às imagens); a
+miniatura ocupa esse espaço até a imagem chegar. Imagens com transparência só
+recebem as dimensões (o fundo apareceria através delas).
+
+Os resultados ficam em cache pelo sha256 do conteúdo
+(~/.cache/logik-bioinfo/placeholders.json, ou --cache): a mesma imagem em
+outro caminho, ou de novo na próxima execução, não é decodificada outra vez.
+As ferramentas de marca d'água (--placeholders) preenchem o cache das saídas
+com a imagem que já têm em memória, sem segunda decodificação.
+
+    python portfolio/placeholders.py                  # todas as páginas do site
+    python portfolio/placeholders.py --pages portfolio.html --jobs 0
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from PIL import Image, ImageFilter
+
+from assets import IMAGE_EXTS, SITE_ROOT, resolve_ref, site_text_files
+from batch import FileResult, file_size, iter_results
+from fonts import cache_path
+from manifest import file_sha256
+
+LQIP_SIZE = 16  # lado maior da miniatura (px)
+_VERSION = 1
+
+_IMG_RE = re.compile(r"<img\b[^>]*>", re.I | re.S)
+_ATTR_RE = r'\s{name}\s*=\s*(?:"([^"]*)"|\'([^\']*)\')'
+
+
+def has_alpha(im: Image.Image) -> bool:
+    if im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info):
+        alpha = im.convert("RGBA").getchannel("A")
+        return alpha.getextrema()[0] < 255
+    return False
+
+
+def placeholder_info(im: Image.Image, size: int = LQIP_SIZE) -> Dict:
+    """Dimensões e LQIP de uma imagem já decodificada (a imagem não é alterada)."""
+    info = {"width": im.width, "height": im.height, "lqip": None}
+    if has_alpha(im):
+        return info
+    # reduce() faz a média por blocos (um único passe, sem reamostrar a imagem cheia)
+    factor = max(1, max(im.width, im.height) // (size * 2))
+    small = im.convert("RGB").reduce(factor) if factor > 1 else im.convert("RGB")
+    small.thumbnail((size, size), Image.BICUBIC)
+    small = small.filter(ImageFilter.GaussianBlur(0.8))
+    buf = io.BytesIO()
+    small.save(buf, "WEBP", quality=40, method=6)
+    info["lqip"] = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+    return info
+
+
+def placeholder_file(path: Path, size: int = LQIP_SIZE) -> FileResult:
+    """Worker: decodifica (JPEG em escala reduzida via draft) e calcula o placeholder."""
+    try:
+        with Image.open(path) as im:
+            width, height = im.size
+            im.draft("RGB", (size * 8, size * 8))  # só afeta JPEG: decodifica a 1/2..1/8
+            info = placeholder_info(im, size)
+        info.update(width=width, height=height)
+        return FileResult(True, f"OK: {path.name} ({width}x{height})", file_size(path), placeholders={path.as_posix(): info})
+    except Exception as e:
+        return FileResult(False, f"ERRO: {path.name} -> {e}")
+
+
+class PlaceholderCache:
+    """
+    JSON com os placeholders indexados pelo sha256 do conteúdo. O hash de cada
+    caminho fica associado a (tamanho, mtime), como no manifesto de build.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._entries: Dict[str, Dict] = {}
+        self._files: Dict[str, Dict] = {}
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == _VERSION:
+                self._entries = data.get("entries", {})
+                self._files = data.get("files", {})
+        except (OSError, ValueError):
+            pass  # cache é só otimização
+
+    def digest(self, path: Path) -> str:
+        st = os.stat(path)
+        key = Path(path).resolve().as_posix()
+        cached = self._files.get(key)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            return cached["sha256"]
+        digest = file_sha256(path)
+        self._files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        self._dirty = True
+        return digest
+
+    def get(self, path: Path) -> Optional[Dict]:
+        return self._entries.get(self.digest(path))
+
+    def put(self, path: Path, info: Dict) -> None:
+        self._entries[self.digest(path)] = info
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            data = {"version": _VERSION, "entries": self._entries, "files": self._files}
+            tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # cache é só otimização
+        self._dirty = False
+
+
+def default_cache() -> Path:
+    return cache_path().parent / "placeholders.json"
+
+
+def add_placeholder_args(parser) -> None:
+    parser.add_argument(
+        "--placeholders",
+        action="store_true",
+        help="Calcula dimensões e LQIP de cada saída (na mesma passada) para o placeholders.py injetar nas páginas.",
+    )
+    parser.add_argument("--placeholder-cache", help="Cache dos placeholders (default: ~/.cache/logik-bioinfo/placeholders.json).")
+
+
+def placeholders_from_args(args) -> Optional[PlaceholderCache]:
+    if not args.placeholders:
+        return None
+    return PlaceholderCache(Path(args.placeholder_cache).resolve() if args.placeholder_cache else default_cache())
+
+
+def record_placeholders(cache: Optional[PlaceholderCache], res: FileResult) -> None:
+    """Guarda os placeholders devolvidos pelo worker (chave = caminho da saída já gravada)."""
+    if cache is None or not res.ok or not res.placeholders:
+        return
+    for out, info in res.placeholders.items():
+        if Path(out).exists():
+            cache.put(Path(out), info)
+
+
+def ensure_placeholders(paths: Sequence[Path], cache: PlaceholderCache, jobs: int = 1) -> Dict[Path, Dict]:
+    """Placeholders das imagens pedidas: do cache ou calculados em pool."""
+    found, missing = {}, []
+    for path in paths:
+        info = cache.get(path)
+        if info is None:
+            missing.append(path)
+        else:
+            found[path] = info
+    if missing:
+        print(f"Calculando {len(missing)} placeholder(s)...")
+    for path, res in zip(missing, iter_results(missing, placeholder_file, jobs)):
+        print(res.message)
+        if res.ok:
+            info = res.placeholders[path.as_posix()]
+            cache.put(path, info)
+            found[path] = info
+    return found
+
+
+def _attr(tag: str, name: str) -> Optional[str]:
+    m = re.search(_ATTR_RE.format(name=re.escape(name)), tag, re.I)
+    if not m:
+        return None
+    return m.group(1) if m.group(1) is not None else m.group(2)
+
+
+def _set_attr(tag: str, name: str, value: Optional[str]) -> str:
+    """Define (ou, com None, remove) um atributo da tag."""
+    tag = re.sub(_ATTR_RE.format(name=re.escape(name)) + r"|\s" + re.escape(name) + r"(?=[\s/>])", "", tag, flags=re.I)
+    if value is None:
+        return tag
+    end = len(tag) - (2 if tag.endswith("/>") else 1)
+    return f'{tag[:end].rstrip()} {name}="{value}"{tag[end:]}'
+
+
+def _strip_lqip(style: Optional[str]) -> str:
+    return re.sub(r"background:url\(data:[^)]*\) center/cover no-repeat;?", "", style or "").strip()
+
+
+def img_sources(text: str, page: Path, site: Path) -> List[Path]:
+    paths = []
+    for tag in _IMG_RE.findall(text):
+        path, _ = resolve_ref(_attr(tag, "src") or "", page, site)
+        if path is not None and path.suffix.lower() in IMAGE_EXTS and path.is_file():
+            paths.append(path)
+    return paths
+
+
+def inject(text: str, page: Path, site: Path, placeholders: Dict[Path, Dict]) -> str:
+    """Adiciona width/height (quando ausentes) e o LQIP às <img> com placeholder conhecido."""
+
+    def replace(m: re.Match) -> str:
+        tag = m.group(0)
+        path, _ = resolve_ref(_attr(tag, "src") or "", page, site)
+        info = placeholders.get(path)
+        if info is None:
+            return tag
+        # Dimensões escritas à mão são mantidas; as que este módulo pôs são atualizadas
+        ours = _attr(tag, "data-lqip") is not None
+        if ours or _attr(tag, "width") is None and _attr(tag, "height") is None:
+            tag = _set_attr(tag, "width", str(info["width"]))
+            tag = _set_attr(tag, "height", str(info["height"]))
+        style = _strip_lqip(_attr(tag, "style"))
+        if info["lqip"]:
+            style = f"background:url({info['lqip']}) center/cover no-repeat" + (f";{style}" if style else "")
+        tag = _set_attr(tag, "style", style or None)
+        return _set_attr(tag, "data-lqip", "")
+
+    return _IMG_RE.sub(replace, text)
+
+
+def process_pages(site: Path, pages: Iterable[Path], cache: PlaceholderCache, jobs: int = 1, dry_run: bool = False) -> None:
+    pages = list(pages)
+    texts = {page: page.read_text(encoding="utf-8") for page in pages}
+    sources = sorted({path for page, text in texts.items() for path in img_sources(text, page, site)})
+    print(f"Processando {len(sources)} imagem(ns) em {len(pages)} página(s)...")
+    placeholders = ensure_placeholders(sources, cache, jobs)
+    changed = 0
+    for page, text in texts.items():
+        new_text = inject(text, page, site, placeholders)
+        if new_text == text:
+            continue
+        changed += 1
+        print(f"OK: {page.relative_to(site).as_posix()}")
+        if not dry_run:
+            page.write_text(new_text, encoding="utf-8")
+    cache.save()
+    lqip = sum(len(info["lqip"] or "") for info in placeholders.values())
+    print(f"Concluído. {changed} página(s) {'a alterar' if dry_run else 'alterada(s)'}; LQIP médio: {lqip // max(1, len(placeholders))} bytes.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Injeta width/height e placeholders borrados (LQIP) nas <img> do site.")
+    ap.add_argument("--site", default=str(SITE_ROOT), help="Raiz do site (default: pasta acima de portfolio/).")
+    ap.add_argument("--pages", nargs="*", help="Páginas a processar, relativas ao site (default: todas as .html).")
+    ap.add_argument("--cache", help="Cache dos placeholders (default: ~/.cache/logik-bioinfo/placeholders.json).")
+    ap.add_argument("--jobs", type=int, default=1, help="Processos paralelos para calcular placeholders (0 = todos os núcleos).")
+    ap.add_argument("--dry-run", action="store_true", help="Só mostra as páginas que seriam alteradas.")
+    args = ap.parse_args()
+
+    site = Path(args.site).resolve()
+    if args.pages:
+        pages = [site / rel for rel in args.pages if (site / rel).is_file()]
+        for rel in args.pages:
+            if not (site / rel).is_file():
+                print(f"AVISO: página não encontrada: {rel}")
+    else:
+        pages = [p for p in site_text_files(site) if p.suffix.lower() == ".html"]
+    cache = PlaceholderCache(Path(args.cache).resolve() if args.cache else default_cache())
+    process_pages(site, pages, cache, args.jobs, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Instrumentação por estágio (--profile / --stats-json / --profile-dump).
+
+Os estágios são marcados no código com `with stage("encode"): ...`; fora de
+um record_file() ativo isso não faz nada. Cada arquivo processado gera um
+dicionário de estatísticas (tempo por estágio, bytes de entrada/saída,
+pixels) que volta ao processo principal dentro do FileResult e é agregado
+pelo StatsCollector.
+"""
+import cProfile
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Cronômetro ativo neste processo (cada worker do --jobs tem o seu)
+_active: Optional["StageTimer"] = None
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.t0 = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """Soma o tempo do bloco ao estágio `name` do arquivo em andamento (se houver)."""
+    timer = _active
+    if timer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - t0)
+
+
+@contextmanager
+def record_file(enabled: bool = True):
+    """Ativa um cronômetro para um arquivo; produz None quando a instrumentação está desligada."""
+    global _active
+    if not enabled:
+        yield None
+        return
+    previous, timer = _active, StageTimer()
+    _active = timer
+    try:
+        yield timer
+    finally:
+        _active = previous
+
+
+def file_stats(name: str, timer: Optional[StageTimer], bytes_in: int = 0, bytes_out: int = 0, pixels: int = 0) -> Optional[Dict]:
+    if timer is None:
+        return None
+    return {
+        "file": name,
+        "total": timer.elapsed(),
+        "stages": dict(timer.stages),
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "pixels": pixels,
+    }
+
+
+class StatsCollector:
+    """Agrega as estatísticas por arquivo no processo principal."""
+
+    def __init__(self):
+        self.files: List[Dict] = []
+
+    def add(self, stats: Optional[Dict]) -> None:
+        if stats:
+            self.files.append(stats)
+
+    def totals(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for f in self.files:
+            for name, secs in f["stages"].items():
+                out[name] = out.get(name, 0.0) + secs
+        return out
+
+    def slowest(self) -> Optional[Dict]:
+        return max(self.files, key=lambda f: f["total"], default=None)
+
+    def print_report(self) -> None:
+        if not self.files:
+            return
+        print("Perfil por arquivo (s):")
+        for f in self.files:
+            parts = " ".join(f"{k}={v:.3f}" for k, v in f["stages"].items())
+            mpx = f["pixels"] / 1e6
+            print(f"  {f['file']}: total={f['total']:.3f} [{parts}] {mpx:.1f} Mpx "
+                  f"in={f['bytes_in'] / 1e6:.2f} MB out={f['bytes_out'] / 1e6:.2f} MB")
+        totals = self.totals()
+        grand = sum(totals.values()) or 1e-9
+        print("Perfil agregado por estágio:")
+        for name, secs in sorted(totals.items(), key=lambda kv: -kv[1]):
+            print(f"  {name:<12} {secs:8.3f} s  ({secs / grand:5.1%})")
+
+    def print_encode_report(self, encoder: str) -> None:
+        if not self.files:
+            return
+        print(f"Codificação (perfil {encoder}):")
+        for f in self.files:
+            print(f"  {f['file']}: {f['stages'].get('encode', 0.0):.3f} s, {f['bytes_out'] / 1e6:.2f} MB")
+        secs = sum(f["stages"].get("encode", 0.0) for f in self.files)
+        size = sum(f["bytes_out"] for f in self.files)
+        print(f"  total: {secs:.3f} s, {size / 1e6:.2f} MB em {len(self.files)} arquivo(s)")
+
+    def write_json(self, path: Path) -> None:
+        payload = {"files": self.files, "totals": self.totals()}
+        Path(path).write_text(json.dumps(payload, indent=1, ensure_ascii=False), encoding="utf-8")
+        print(f"Estatísticas: {path}")
+
+
+def profile_call(dump_path: Path, func, *args, **kwargs):
+    """Executa func sob cProfile e grava o dump (abrir com pstats ou snakeviz)."""
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(func, *args, **kwargs)
+    finally:
+        prof.dump_stats(str(dump_path))
+        print(f"cProfile: {dump_path}")
+
+
+def finish_report(
+    collector: StatsCollector,
+    profile: bool,
+    stats_json: Optional[str],
+    profile_dump: Optional[str],
+    rerun: Optional[Callable[[str], object]] = None,
+    encode_report: Optional[str] = None,
+) -> None:
+    """
+    Saída comum das ferramentas: relatório (--profile), JSON (--stats-json),
+    tempo/tamanho de codificação (--encode-report, com o nome do perfil) e,
+    com --profile-dump, o arquivo mais lento é reprocessado sob cProfile via
+    rerun(nome do arquivo).
+    """
+    if profile:
+        collector.print_report()
+    if encode_report:
+        collector.print_encode_report(encode_report)
+    if stats_json:
+        collector.write_json(Path(stats_json))
+    slowest = collector.slowest()
+    if profile_dump and slowest and rerun is not None:
+        print(f"Reprocessando o arquivo mais lento sob cProfile: {slowest['file']}")
+        profile_call(Path(profile_dump), rerun, slowest["file"])
+
+
+def add_profile_args(parser) -> None:
+    parser.add_argument("--profile", action="store_true", help="Mostra o tempo por estágio de cada arquivo e o agregado.")
+    parser.add_argument("--stats-json", help="Grava as estatísticas por arquivo/estágio neste JSON.")
+    parser.add_argument("--profile-dump", help="Grava um dump cProfile do arquivo mais lento (.prof).")
+
+
+def profiling_enabled(args) -> bool:
+    return bool(args.profile or args.stats_json or args.profile_dump or getattr(args, "encode_report", False))
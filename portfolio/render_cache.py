@@ -0,0 +1,119 @@
+"""
+Cache persistente de páginas renderizadas (convert_pages.py / convert_pdfs.py).
+
+O manifesto só evita refazer uma saída que ainda está no outdir. Este cache
+guarda o arquivo de cada renderização fora dele, indexado pelo conteúdo:
+sha256 do PDF, página, dpi, recorte (--clip) e o que mais muda os bytes
+(limites de tamanho e encoder). Pedir de novo a mesma página, noutra pasta,
+com outro prefixo, depois de apagar a saída ou com o PDF renomeado, vira uma
+cópia de arquivo.
+
+Fica em ~/.cache/logik-bioinfo/renders (%LOCALAPPDATA% no Windows), ou em
+--render-cache DIR; --no-render-cache desliga. Ao fim de cada execução os
+arquivos usados há mais tempo são removidos até o cache caber em
+--render-cache-mb.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+from fonts import cache_path
+
+DEFAULT_MAX_MB = 2048
+_VERSION = 1
+
+
+@dataclass(frozen=True)
+class RenderCache:
+    root: Path
+
+    @staticmethod
+    def key(
+        pdf_sha256: str,
+        idx: int,
+        dpi: int,
+        clip: Optional[Sequence[float]] = None,
+        max_width: Optional[int] = None,
+        max_height: Optional[int] = None,
+        encoder: Optional[str] = None,
+    ) -> str:
+        payload = [_VERSION, pdf_sha256, idx, dpi, list(clip) if clip else None, max_width, max_height, encoder]
+        return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+
+    def path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix.lower()}"
+
+    def get(self, key: str, out_file: Path) -> bool:
+        """Copia a renderização guardada para out_file; False se não houver."""
+        cached = self.path(key, out_file.suffix)
+        try:
+            shutil.copyfile(cached, out_file)
+            os.utime(cached)  # marca o uso recente (ordem de remoção do prune)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def put(self, key: str, out_file: Path) -> None:
+        cached = self.path(key, out_file.suffix)
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            # Temporário + os.replace: workers que renderizam a mesma página não se atropelam
+            fd, tmp = tempfile.mkstemp(dir=cached.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as dst, open(out_file, "rb") as src:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, cached)
+        except OSError:
+            pass  # cache é só otimização
+
+    def prune(self, max_bytes: int) -> int:
+        """Remove os arquivos usados há mais tempo até o cache caber em max_bytes; retorna quantos."""
+        entries = []
+        for path in self.root.glob("*/*"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+def default_root() -> Path:
+    return cache_path().parent / "renders"
+
+
+def add_render_cache_args(parser) -> None:
+    parser.add_argument("--render-cache", help="Pasta do cache de páginas renderizadas (default: ~/.cache/logik-bioinfo/renders).")
+    parser.add_argument("--no-render-cache", action="store_true", help="Não lê nem grava o cache de páginas renderizadas.")
+    parser.add_argument(
+        "--render-cache-mb",
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help=f"Tamanho máximo do cache (MB); os itens usados há mais tempo saem primeiro (default: {DEFAULT_MAX_MB}).",
+    )
+
+
+def cache_from_args(args) -> Optional[RenderCache]:
+    if args.no_render_cache:
+        return None
+    return RenderCache(Path(args.render_cache).resolve() if args.render_cache else default_root())
+
+
+def finish_cache(cache: Optional[RenderCache], args) -> None:
+    if cache is not None:
+        cache.prune(int(args.render_cache_mb * 1024 * 1024))
@@ -0,0 +1,327 @@
+"""
+Derivadas responsivas das figuras do portfólio + reescrita do HTML.
+
+As páginas do portfólio (PT/EN/ES) embutem os PNGs originais, de vários MB,
+direto do raw.githubusercontent.com. Este estágio gera, para cada figura
+referenciada, versões com marca d'água em várias larguras (WebP, AVIF e PNG
+como fallback) e troca cada <img> por um <picture> com srcset, width/height e
+loading="lazy":
+
+    python portfolio/responsive.py
+    python portfolio/responsive.py --widths 480,960,1600 --formats avif,webp --jobs 0
+
+A fonte é decodificada uma vez por figura; cada largura é reduzida a partir
+dela e recebe a marca já no tamanho final (o texto acompanha a largura). As
+derivadas entram no manifesto de build, então figuras inalteradas não são
+refeitas; figuras com o mesmo conteúdo (sha256) sob nomes diferentes geram
+um único conjunto de derivadas. A reescrita do HTML é idempotente (o <picture>
+gerado guarda a figura de origem em data-responsive e a URL original em
+data-full).
+"""
+import argparse
+import html
+import os
+import re
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, features
+
+from assets import AssetStore
+from batch import FileResult, run_batch
+from encoders import DEFAULT_ENCODER, add_encoder_args, save_image
+from manifest import BuildManifest
+from pipeline import apply_watermark_stage
+
+SITE_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PAGES = ["portfolio.html", "en/portfolio.html", "es/portfolio.html"]
+DEFAULT_WIDTHS = [480, 960, 1600]
+# Ordem dos <source>: o navegador usa o primeiro formato que suporta
+FORMATS = ["avif", "webp"]
+MIME = {"avif": "image/avif", "webp": "image/webp"}
+# Cards em grade de 1/2/3 colunas (sm/md do Tailwind)
+DEFAULT_SIZES = "(min-width: 768px) 33vw, (min-width: 640px) 50vw, 100vw"
+SUPPORTED_EXTS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+_TAG_RE = re.compile(r'<picture data-responsive="[^"]*">.*?</picture>|<img\b[^>]*>', re.S)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*"([^"]*)"')
+
+
+def available_formats(formats: Sequence[str]) -> List[str]:
+    """Formatos pedidos que o Pillow instalado consegue gravar (AVIF exige Pillow >= 11.3)."""
+    out = []
+    for fmt in formats:
+        if features.check(fmt):
+            out.append(fmt)
+        else:
+            print(f"AVISO: este Pillow não grava {fmt.upper()}, ignorando.")
+    return out
+
+
+def plan_widths(size: Tuple[int, int], widths: Sequence[int]) -> List[Tuple[int, int]]:
+    """(largura, altura) das derivadas: só reduções; figura menor que todas fica no tamanho original."""
+    W, H = size
+    out = [(w, max(1, round(H * w / W))) for w in sorted(set(widths)) if w < W]
+    return out or [(W, H)]
+
+
+def derivative_path(out_dir: Path, src: Path, width: int, fmt: str) -> Path:
+    return out_dir / f"{src.stem}-{width}.{fmt}"
+
+
+def derivative_outputs(src: Path, out_dir: Path, plan, formats: Sequence[str]) -> List[Path]:
+    return [derivative_path(out_dir, src, w, fmt) for w, _ in plan for fmt in list(formats) + ["png"]]
+
+
+def derive_file(
+    src: Path,
+    out_dir: Path,
+    plans: Dict[str, List[Tuple[int, int]]],
+    formats: Sequence[str],
+    watermark: Optional[Dict],
+    encoder: str = DEFAULT_ENCODER,
+) -> FileResult:
+    """Worker: decodifica a figura uma vez e grava todas as larguras/formatos do plano dela."""
+    try:
+        with Image.open(src) as im:
+            im.load()
+            if im.mode not in ("RGB", "RGBA"):
+                im = im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+            count = 0
+            for w, h in plans[src.name]:
+                resized = im if (w, h) == im.size else im.resize((w, h), Image.LANCZOS, reducing_gap=3.0)
+                marked = apply_watermark_stage(resized, watermark)
+                for fmt in list(formats) + ["png"]:
+                    save_image(marked, derivative_path(out_dir, src, w, fmt), encoder)
+                    count += 1
+        return FileResult(True, f"OK: {src.name} -> {count} derivada(s)", src.stat().st_size)
+    except Exception as e:
+        return FileResult(False, f"ERRO: {src.name} -> {e}")
+
+
+def _url(path: Path, page: Path) -> str:
+    return Path(os.path.relpath(path, page.parent)).as_posix()
+
+
+def _srcset(src: Path, out_dir: Path, plan, fmt: str, page: Path) -> str:
+    return ", ".join(f"{_url(derivative_path(out_dir, src, w, fmt), page)} {w}w" for w, _ in plan)
+
+
+def picture_markup(
+    attrs: Dict[str, str],
+    full_url: str,
+    src: Path,
+    out_dir: Path,
+    plan,
+    formats: Sequence[str],
+    page: Path,
+    sizes: str,
+    indent: str,
+) -> str:
+    """<picture> com um <source> por formato e o <img> PNG de fallback (largura do meio)."""
+    fw, fh = plan[len(plan) // 2]
+    lines = [f'<picture data-responsive="{html.escape(src.name)}">']
+    for fmt in formats:
+        lines.append(
+            f'    <source type="{MIME[fmt]}" srcset="{_srcset(src, out_dir, plan, fmt, page)}" sizes="{sizes}">'
+        )
+    img_attrs = {
+        "src": _url(derivative_path(out_dir, src, fw, "png"), page),
+        "srcset": _srcset(src, out_dir, plan, "png", page),
+        "sizes": sizes,
+        "width": str(fw),
+        "height": str(fh),
+        "loading": "lazy",
+        "decoding": "async",
+    }
+    # Demais atributos do <img> original (alt, class...) são preservados
+    for key, value in attrs.items():
+        if key not in img_attrs and key != "data-full":
+            img_attrs[key] = value
+    img_attrs["data-full"] = full_url
+    rendered = " ".join(f'{k}="{html.escape(v, quote=True)}"' for k, v in img_attrs.items())
+    lines.append(f"    <img {rendered}>")
+    lines.append("</picture>")
+    return ("\n" + indent).join(lines)
+
+
+def rewrite_page(
+    page: Path,
+    sources: Dict[str, Path],
+    plans: Dict[str, List[Tuple[int, int]]],
+    out_dir: Path,
+    formats: Sequence[str],
+    sizes: str,
+) -> int:
+    """Troca os <img> de figuras conhecidas por <picture>; retorna quantas foram reescritas."""
+    text = page.read_text(encoding="utf-8")
+    count = 0
+
+    def replace(m: re.Match) -> str:
+        nonlocal count
+        tag = m.group(0)
+        if tag.startswith("<picture"):
+            inner = re.search(r"<img\b[^>]*>", tag)
+            attrs = dict(_ATTR_RE.findall(inner.group(0))) if inner else {}
+            full_url = html.unescape(attrs.get("data-full", ""))
+        else:
+            attrs = dict(_ATTR_RE.findall(tag))
+            full_url = html.unescape(attrs.get("src", ""))
+        name = full_url.rsplit("/", 1)[-1]
+        if name not in plans:
+            return tag
+        attrs = {k: html.unescape(v) for k, v in attrs.items()}
+        line_start = text.rfind("\n", 0, m.start()) + 1
+        indent = text[line_start:m.start()]
+        if indent.strip():
+            indent = ""
+        count += 1
+        return picture_markup(attrs, full_url, sources[name], out_dir, plans[name], formats, page, sizes, indent)
+
+    new_text = _TAG_RE.sub(replace, text)
+    if new_text != text:
+        page.write_text(new_text, encoding="utf-8")
+    return count
+
+
+def referenced_images(pages: Sequence[Path]) -> List[str]:
+    """Nomes de arquivo das figuras usadas nos <img> (ou em <picture> já gerados) das páginas."""
+    names = []
+    for page in pages:
+        for m in _TAG_RE.finditer(page.read_text(encoding="utf-8")):
+            attrs = dict(_ATTR_RE.findall(m.group(0)))
+            url = attrs.get("data-full") or attrs.get("src", "")
+            name = html.unescape(url).rsplit("/", 1)[-1]
+            if name and name not in names:
+                names.append(name)
+    return names
+
+
+def build_responsive(
+    pages: Sequence[Path],
+    images_dir: Path,
+    out_dir: Path,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    watermark: Optional[Dict],
+    sizes: str = DEFAULT_SIZES,
+    jobs: int = 1,
+    encoder: str = DEFAULT_ENCODER,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    formats = available_formats(formats)
+
+    sources: Dict[str, Path] = {}
+    plans: Dict[str, List[Tuple[int, int]]] = {}
+    store = AssetStore(manifest)
+    first: Dict[str, str] = {}  # sha256 -> primeiro nome com esse conteúdo
+    for name in referenced_images(pages):
+        src = images_dir / name
+        if src.suffix.lower() not in SUPPORTED_EXTS:
+            continue
+        if not src.is_file():
+            print(f"AVISO: figura não encontrada em {images_dir}, <img> mantido: {name}")
+            continue
+        digest = store.add(src)
+        if digest in first:
+            # Mesma figura com outro nome: aponta para as derivadas da primeira
+            sources[name], plans[name] = sources[first[digest]], plans[first[digest]]
+            continue
+        if digest is not None:
+            first[digest] = name
+        with Image.open(src) as im:  # só o cabeçalho
+            plans[name] = plan_widths(im.size, widths)
+        sources[name] = src
+
+    print(f"Gerando derivadas de {len(first)} figura(s) em {out_dir} ...")
+    params = {"tool": "responsive", "formats": list(formats), "watermark": watermark, "encoder": encoder}
+    todo = []
+    for name, src in sources.items():
+        if src.name != name:
+            continue  # duplicata: usa as derivadas da fonte de mesmo conteúdo
+        outputs = derivative_outputs(src, out_dir, plans[name], formats)
+        if manifest is not None and manifest.is_fresh(outputs, src, dict(params, plan=plans[name])):
+            manifest.skipped += 1
+        else:
+            todo.append(src)
+
+    failed = set()
+
+    def record(src: Path, res: FileResult):
+        if not res.ok:
+            failed.add(src.name)
+        elif manifest is not None:
+            plan = plans[src.name]
+            manifest.record(derivative_outputs(src, out_dir, plan, formats), src, dict(params, plan=plan))
+            manifest.built += 1
+
+    worker = partial(derive_file, out_dir=out_dir, plans=plans, formats=formats, watermark=watermark, encoder=encoder)
+    run_batch(todo, worker, jobs=jobs, on_result=record)
+    if manifest is not None:
+        manifest.save()
+        print(manifest.summary())
+
+    # Figuras com erro mantêm o <img> original
+    usable = {n: p for n, p in plans.items() if sources[n].name not in failed}
+    for page in pages:
+        count = rewrite_page(page, sources, usable, out_dir, formats, sizes)
+        print(f"OK: {page.name} ({page.parent.name}) -> {count} figura(s) em <picture>")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Derivadas responsivas (WebP/AVIF/PNG em várias larguras) e <picture>/srcset no HTML.")
+    ap.add_argument("--pages", nargs="*", default=DEFAULT_PAGES, help="Páginas HTML a reescrever (relativas ao site).")
+    ap.add_argument("--site", default=str(SITE_ROOT), help="Raiz do site (default: pasta acima de portfolio/).")
+    ap.add_argument("--images", help="Pasta das figuras originais (default: <site>/portfolio).")
+    ap.add_argument("--outdir", help="Pasta das derivadas (default: <site>/img/responsive).")
+    ap.add_argument("--widths", default=",".join(map(str, DEFAULT_WIDTHS)), help="Larguras em px (default: 480,960,1600).")
+    ap.add_argument("--formats", default=",".join(FORMATS), help="Formatos além do PNG de fallback (default: avif,webp).")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="Atributo sizes dos srcset.")
+    ap.add_argument("--watermark", choices=["tiled", "visible", "none"], default="tiled", help="Marca d'água aplicada às derivadas.")
+    ap.add_argument("--text", default="© 2025 Felipe Alberto Lei | Logik Bioinfo", help="Texto da marca d'água.")
+    ap.add_argument("--opacity", type=float, help="Opacidade da marca (default da ferramenta correspondente).")
+    ap.add_argument("--font", help="Fonte .ttf (opcional).")
+    ap.add_argument("--jobs", type=int, default=1, help="Processos paralelos (1 = serial; 0 = todos os núcleos).")
+    ap.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <outdir>/.build-manifest.json).")
+    ap.add_argument("--force", action="store_true", help="Refaz todas as derivadas, ignorando o manifesto.")
+    add_encoder_args(ap)
+    args = ap.parse_args()
+
+    site = Path(args.site).resolve()
+    images_dir = Path(args.images).resolve() if args.images else site / "portfolio"
+    out_dir = Path(args.outdir).resolve() if args.outdir else site / "img" / "responsive"
+    pages = []
+    for rel in args.pages:
+        page = (site / rel).resolve()
+        if page.is_file():
+            pages.append(page)
+        else:
+            print(f"AVISO: página não encontrada, ignorando: {page}")
+    if not pages:
+        print("ERRO: nenhuma página HTML para processar.")
+        return
+
+    watermark = None
+    if args.watermark != "none":
+        watermark = {"type": args.watermark, "text": args.text, "font_path": args.font}
+        if args.opacity is not None:
+            watermark["opacity"] = args.opacity
+
+    build_responsive(
+        pages,
+        images_dir,
+        out_dir,
+        widths=[int(w) for w in args.widths.split(",") if w.strip()],
+        formats=[f.strip().lower() for f in args.formats.split(",") if f.strip()],
+        watermark=watermark,
+        sizes=args.sizes,
+        jobs=args.jobs,
+        encoder=args.encoder,
+        manifest=BuildManifest.for_outdir(out_dir, args.manifest, force=args.force),
+    )
+
+
+if __name__ == "__main__":
+    main()
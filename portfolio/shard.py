@@ -0,0 +1,216 @@
+"""
+Execução particionada entre máquinas (--shard i/N) e junção dos relatórios.
+
+Cada unidade de trabalho (uma imagem, um PDF ou uma página) pertence ao shard
+int(sha256[:16]) % N + 1, calculado sobre o conteúdo da fonte: a partição é a
+mesma em qualquer máquina, não depende da ordem de listagem e um arquivo
+renomeado continua no mesmo shard. Cada execução grava um relatório
+(shard-i-of-N.json) com o conjunto de entrada inteiro, as unidades do shard,
+saídas com sha256, tempos e erros. O subcomando merge junta os N relatórios e
+verifica se o trabalho está completo:
+
+    python watermark_tiled.py --dir figs --outdir out --shard 1/3   # nó 1
+    python watermark_tiled.py --dir figs --outdir out --shard 2/3   # nó 2
+    python watermark_tiled.py --dir figs --outdir out --shard 3/3   # nó 3
+    python shard.py merge out1/shard-1-of-3.json out2/shard-2-of-3.json out3/shard-3-of-3.json --out merged.json
+
+O merge falha (código 1) se faltar algum shard, se os relatórios vierem de
+entradas ou parâmetros diferentes, ou se alguma unidade não tiver resultado OK.
+"""
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+from batch import FileResult
+from manifest import BuildManifest, file_sha256, params_digest
+
+T = TypeVar("T")
+
+_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int  # 1-based
+    count: int
+
+    def owns(self, digest: str) -> bool:
+        return int(digest[:16], 16) % self.count == self.index - 1
+
+    @property
+    def name(self) -> str:
+        return f"shard-{self.index}-of-{self.count}"
+
+
+def parse_shard(spec: Optional[str]) -> Optional[Shard]:
+    """'2/4' -> Shard(2, 4); None -> None. Levanta ValueError se inválido."""
+    if not spec:
+        return None
+    try:
+        index, count = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"--shard deve ser i/N (ex.: 2/4), recebido: {spec}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"--shard fora do intervalo: {spec} (1 <= i <= N)")
+    return Shard(index, count)
+
+
+def part_digest(source_sha256: str, part: str) -> str:
+    """Digest de uma parte de uma fonte (ex.: página de um PDF)."""
+    return hashlib.sha256(f"{source_sha256}:{part}".encode("utf-8")).hexdigest()
+
+
+class ShardReport:
+    """Resultado de um shard: conjunto de entrada, unidades do shard, saídas e erros."""
+
+    def __init__(self, shard: Shard, tool: str, params: Dict, manifest: Optional[BuildManifest] = None):
+        self.shard = shard
+        self.tool = tool
+        self.params = params_digest(params)
+        self.manifest = manifest
+        self.inputs: Dict[str, str] = {}  # unidade -> digest (todas, antes da partição)
+        self.results: Dict[str, Dict] = {}
+
+    def source_digest(self, src: Path) -> str:
+        # O manifesto guarda o hash por (tamanho, mtime): reexecuções não releem as fontes
+        return self.manifest.source_hash(src) if self.manifest is not None else file_sha256(src)
+
+    def select(
+        self,
+        items: Iterable[T],
+        key: Callable[[T], str] = lambda p: Path(p).name,
+        digest: Optional[Callable[[T], str]] = None,
+    ) -> List[T]:
+        """Registra todas as unidades e devolve só as deste shard."""
+        digest = digest or self.source_digest
+        mine = []
+        for item in items:
+            k, d = key(item), digest(item)
+            self.inputs[k] = d
+            if self.shard.owns(d):
+                mine.append(item)
+        print(f"Shard {self.shard.index}/{self.shard.count}: {len(mine)} de {len(self.inputs)} unidade(s).")
+        return mine
+
+    def skipped(self, key: str, outputs: Sequence[Path]) -> None:
+        """Unidade já atualizada segundo o manifesto (conta como concluída)."""
+        self.results[key] = {"status": "skipped", "outputs": self._outputs(outputs)}
+
+    def record(self, key: str, res: FileResult, outputs: Sequence[Path]) -> None:
+        entry = {"status": "ok" if res.ok else "error", "message": res.message}
+        if res.ok:
+            entry["outputs"] = self._outputs(outputs)
+        if res.stats:
+            entry["seconds"] = round(res.stats["total"], 4)
+        self.results[key] = entry
+
+    @staticmethod
+    def _outputs(outputs: Sequence[Path]) -> Dict[str, str]:
+        return {Path(p).name: file_sha256(p) for p in outputs if Path(p).exists()}
+
+    def save(self, path: Path) -> None:
+        payload = {
+            "version": _VERSION,
+            "tool": self.tool,
+            "params": self.params,
+            "shard": [self.shard.index, self.shard.count],
+            "inputs": self.inputs,
+            "results": self.results,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+        errors = sum(1 for r in self.results.values() if r["status"] == "error")
+        print(f"Relatório do shard: {path} ({len(self.results)} unidade(s), {errors} erro(s))")
+
+
+def report_path(shard: Shard, out_dir: Path, explicit: Optional[str] = None) -> Path:
+    return Path(explicit).resolve() if explicit else out_dir / f"{shard.name}.json"
+
+
+def merge_reports(paths: Sequence[Path]) -> Dict:
+    """
+    Junta os relatórios e verifica a completude. Devolve o relatório combinado
+    com a lista de problemas em "problems" (vazia = completo).
+    """
+    reports = [json.loads(Path(p).read_text(encoding="utf-8")) for p in paths]
+    problems: List[str] = []
+    if not reports:
+        return {"complete": False, "problems": ["nenhum relatório"]}
+
+    first = reports[0]
+    count = first["shard"][1]
+    for path, rep in zip(paths, reports):
+        for field in ("version", "tool", "params", "inputs"):
+            if rep.get(field) != first.get(field):
+                problems.append(f"{path}: '{field}' diferente de {paths[0]} (entradas ou parâmetros divergentes)")
+        if rep["shard"][1] != count:
+            problems.append(f"{path}: shard {rep['shard'][0]}/{rep['shard'][1]} com N diferente de {count}")
+
+    by_index: Dict[int, Dict] = {}
+    for path, rep in zip(paths, reports):
+        index = rep["shard"][0]
+        if index in by_index:
+            problems.append(f"{path}: shard {index}/{count} repetido")
+        by_index[index] = rep
+    missing = sorted(set(range(1, count + 1)) - set(by_index))
+    if missing:
+        problems.append(f"shard(s) ausente(s): {', '.join(f'{i}/{count}' for i in missing)}")
+
+    units = {}
+    for key, digest in sorted(first["inputs"].items()):
+        owner = int(digest[:16], 16) % count + 1
+        rep = by_index.get(owner)
+        if rep is None:
+            continue  # já contado como shard ausente
+        result = rep["results"].get(key)
+        if result is None:
+            problems.append(f"{key}: sem resultado no shard {owner}/{count}")
+            continue
+        if result["status"] == "error":
+            problems.append(f"{key}: {result.get('message', 'erro')}")
+        units[key] = dict(result, shard=owner)
+
+    seconds = sum(u.get("seconds", 0.0) for u in units.values())
+    return {
+        "version": _VERSION,
+        "tool": first.get("tool"),
+        "params": first.get("params"),
+        "shards": count,
+        "units": units,
+        "seconds": round(seconds, 4),
+        "complete": not problems,
+        "problems": problems,
+    }
+
+
+def add_shard_args(parser) -> None:
+    parser.add_argument("--shard", help="Processa só a fração i/N das entradas (partição por hash do conteúdo).")
+    parser.add_argument("--shard-report", help="Relatório do shard (default: <outdir>/shard-i-of-N.json).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Junta relatórios de shards (--shard i/N) e verifica a completude.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    merge = sub.add_parser("merge", help="Junta os relatórios shard-i-of-N.json.")
+    merge.add_argument("reports", nargs="+", help="Relatórios dos N shards.")
+    merge.add_argument("--out", help="Grava o relatório combinado neste JSON.")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.reports]
+    merged = merge_reports(paths)
+    if args.out:
+        Path(args.out).write_text(json.dumps(merged, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+        print(f"Relatório combinado: {args.out}")
+    for problem in merged["problems"]:
+        print(f"ERRO: {problem}")
+    if not merged["complete"]:
+        sys.exit(1)
+    print(f"OK: {len(merged['units'])} unidade(s) em {merged['shards']} shard(s), {merged['seconds']:.2f} s de processamento.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Auditoria offline do peso das páginas do site, com orçamentos.
+
+Lê todas as páginas HTML (raiz, en/ e es/) em paralelo, resolve as
+referências locais e as URLs do próprio repositório (raw.githubusercontent /
+github.com/.../raw/main) de imagens, scripts, folhas de estilo, ícones,
+pôsteres e url() do CSS, e soma o peso de transferência de cada página: o
+HTML mais cada arquivo referenciado (uma vez por página). Recursos de outros
+domínios (CDNs) não podem ser medidos offline: são listados e contados.
+
+Cada página é comparada com os orçamentos (--budgets JSON ou os defaults):
+
+    {"page_kb": 2048, "asset_kb": 500, "external": 5,
+     "pages": {"portfolio.html": {"page_kb": 30000}, "*/posts/*": {"asset_kb": 800}}}
+
+e, com --baseline (um relatório JSON anterior), com o peso que tinha: crescer
+mais que --threshold é regressão. Arquivos ausentes, orçamentos estourados e
+regressões saem no relatório (--json / --markdown) e fazem o comando terminar
+com código 1, para falhar o build.
+
+    python portfolio/site_audit.py --jobs 0 --json audit.json --markdown audit.md
+    python portfolio/site_audit.py --baseline audit.json
+
+Em <img> com srcset o peso contado é o do src (o que um navegador sem srcset
+baixa); os candidatos do srcset são conferidos só quanto à existência.
+Imagens com loading="lazy" entram no total e também em lazy_bytes.
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from fnmatch import fnmatch
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from assets import SITE_ROOT, resolve_ref
+from batch import FileResult, iter_results
+from site_css import site_pages
+
+DEFAULT_BUDGETS = {"page_kb": 2048, "asset_kb": 500, "external": 5}
+DEFAULT_LANG = "pt"
+
+_TAG_RE = re.compile(r"<(img|script|link|source|video|audio|input)\b([^>]*)>", re.I | re.S)
+_ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.S)
+_STYLE_RE = re.compile(r"<style\b[^>]*>(.*?)</style>|\sstyle\s*=\s*\"([^\"]*)\"", re.I | re.S)
+_URL_RE = re.compile(r"""url\(\s*['"]?([^'")]+?)['"]?\s*\)""", re.I)
+_LANG_RE = re.compile(r"<html\b[^>]*\blang\s*=\s*[\"']([\w-]+)", re.I)
+_LINK_RELS = {"stylesheet", "icon", "shortcut", "apple-touch-icon", "preload", "modulepreload", "manifest"}
+
+
+def _attrs(text: str) -> Dict[str, str]:
+    return {m.group(1).lower(): m.group(2) if m.group(2) is not None else m.group(3) for m in _ATTR_RE.finditer(text)}
+
+
+def page_refs(text: str) -> List[Dict]:
+    """Referências que o navegador baixa ao abrir a página: (ref, tipo, conta no peso, lazy)."""
+    refs = []
+    for m in _TAG_RE.finditer(text):
+        tag, attrs = m.group(1).lower(), _attrs(m.group(2))
+        lazy = attrs.get("loading", "").lower() == "lazy"
+        if tag == "link":
+            rels = set(attrs.get("rel", "").lower().split())
+            if rels & _LINK_RELS and attrs.get("href"):
+                kind = "style" if "stylesheet" in rels else "link"
+                refs.append({"ref": attrs["href"], "kind": kind, "weight": True, "lazy": False})
+            continue
+        if tag == "input" and attrs.get("type", "").lower() != "image":
+            continue
+        kind = {"script": "script", "video": "media", "audio": "media"}.get(tag, "image")
+        if attrs.get("src"):
+            refs.append({"ref": attrs["src"], "kind": kind, "weight": True, "lazy": lazy})
+        if attrs.get("poster"):
+            refs.append({"ref": attrs["poster"], "kind": "image", "weight": True, "lazy": False})
+        candidates = [c.strip().split(" ")[0] for c in attrs.get("srcset", "").split(",") if c.strip()]
+        for i, url in enumerate(candidates):
+            # Sem src (<source> de <picture>), o primeiro candidato representa o peso
+            refs.append({"ref": url, "kind": "image", "weight": i == 0 and not attrs.get("src"), "lazy": lazy})
+    for m in _STYLE_RE.finditer(text):
+        for url in _URL_RE.findall(m.group(1) or m.group(2) or ""):
+            refs.append({"ref": url, "kind": "image", "weight": True, "lazy": False})
+    return refs
+
+
+def css_refs(css_path: Path, site: Path) -> List[Path]:
+    """url() de uma folha local (fontes, fundos), relativas à própria folha."""
+    try:
+        text = css_path.read_text(encoding="utf-8", errors="ignore")
+    except OSError:
+        return []
+    paths = []
+    for url in _URL_RE.findall(text):
+        path, _ = resolve_ref(url, css_path, site)
+        if path is not None:
+            paths.append(path)
+    return paths
+
+
+def page_lang(text: str, rel: str) -> str:
+    m = _LANG_RE.search(text)
+    if m:
+        return m.group(1).split("-")[0].lower()
+    top = rel.split("/", 1)[0]
+    return top if top in ("en", "es") else DEFAULT_LANG
+
+
+def audit_page(page: Path, site: Path) -> Tuple[FileResult, Dict]:
+    """Worker: mede uma página (HTML + recursos locais únicos) e lista ausentes e externos."""
+    rel = page.relative_to(site).as_posix()
+    try:
+        raw = page.read_bytes()
+    except OSError as e:
+        return FileResult(False, f"ERRO: {rel} -> {e}"), {}
+    text = raw.decode("utf-8", errors="ignore")
+    result = {
+        "page": rel, "lang": page_lang(text, rel), "html_bytes": len(raw),
+        "assets": [], "missing": [], "external": [], "total_bytes": len(raw), "lazy_bytes": 0,
+    }
+    seen = set()
+
+    def add(path: Path, ref: str, kind: str, weight: bool, lazy: bool) -> None:
+        if not path.is_file():
+            if ref not in result["missing"]:
+                result["missing"].append(ref)
+            return
+        if not weight or path in seen:
+            return
+        seen.add(path)
+        size = path.stat().st_size
+        try:
+            local = path.relative_to(site).as_posix()
+        except ValueError:
+            local = path.as_posix()
+        result["assets"].append({"path": local, "kind": kind, "bytes": size, "lazy": lazy})
+        result["total_bytes"] += size
+        if lazy:
+            result["lazy_bytes"] += size
+        if kind == "style":
+            for sub in css_refs(path, site):
+                add(sub, sub.name, "style-asset", True, False)
+
+    for r in page_refs(text):
+        ref = r["ref"].strip()
+        if not ref or ref.startswith(("data:", "#", "javascript:", "mailto:", "tel:")):
+            continue
+        path, _ = resolve_ref(ref, page, site)
+        if path is None:
+            url = ("https:" + ref) if ref.startswith("//") else ref
+            if url not in result["external"]:
+                result["external"].append(url)
+            continue
+        add(path, ref, r["kind"], r["weight"], r["lazy"])
+
+    message = f"OK: {rel} {result['total_bytes'] / 1024:.1f} KB ({len(result['assets'])} recurso(s), {len(result['external'])} externo(s))"
+    return FileResult(True, message, len(raw)), result
+
+
+def load_budgets(path: Optional[str]) -> Dict:
+    budgets = dict(DEFAULT_BUDGETS, pages={})
+    if path:
+        budgets.update(json.loads(Path(path).read_text(encoding="utf-8")))
+    return budgets
+
+
+def page_budget(budgets: Dict, rel: str) -> Dict:
+    """Orçamento da página: defaults sobrescritos pelos padrões (fnmatch) que casam, na ordem do arquivo."""
+    budget = {k: budgets[k] for k in DEFAULT_BUDGETS}
+    for pattern, override in budgets.get("pages", {}).items():
+        if fnmatch(rel, pattern):
+            budget.update(override)
+    return budget
+
+
+def check_page(result: Dict, budget: Dict, baseline: Optional[Dict], threshold: float) -> List[str]:
+    problems = [f"{result['page']}: arquivo ausente: {ref}" for ref in result["missing"]]
+    if result["total_bytes"] > budget["page_kb"] * 1024:
+        problems.append(f"{result['page']}: {_fmt(result['total_bytes'])} acima do orçamento da página ({_fmt(budget['page_kb'] * 1024)})")
+    for asset in result["assets"]:
+        if asset["bytes"] > budget["asset_kb"] * 1024:
+            problems.append(f"{result['page']}: {asset['path']} com {_fmt(asset['bytes'])} (orçamento por recurso: {_fmt(budget['asset_kb'] * 1024)})")
+    if len(result["external"]) > budget["external"]:
+        problems.append(f"{result['page']}: {len(result['external'])} recursos externos (orçamento: {budget['external']})")
+    if baseline is not None and result["total_bytes"] > baseline["total_bytes"] * (1 + threshold):
+        growth = result["total_bytes"] / max(1, baseline["total_bytes"]) - 1
+        problems.append(
+            f"{result['page']}: regressão de {growth:.0%} ({_fmt(baseline['total_bytes'])} -> {_fmt(result['total_bytes'])})"
+        )
+    return problems
+
+
+def _fmt(size: float) -> str:
+    return f"{size / (1024 * 1024):.2f} MB" if size >= 1024 * 1024 else f"{size / 1024:.1f} KB"
+
+
+def language_totals(results: List[Dict]) -> Dict[str, Dict]:
+    totals: Dict[str, Dict] = {}
+    for r in results:
+        t = totals.setdefault(r["lang"], {"pages": 0, "total_bytes": 0, "max_page": None, "max_bytes": 0})
+        t["pages"] += 1
+        t["total_bytes"] += r["total_bytes"]
+        if r["total_bytes"] > t["max_bytes"]:
+            t["max_page"], t["max_bytes"] = r["page"], r["total_bytes"]
+    return dict(sorted(totals.items()))
+
+
+def external_hosts(results: List[Dict]) -> Dict[str, int]:
+    """Domínio -> número de páginas que dependem dele."""
+    hosts: Dict[str, int] = {}
+    for r in results:
+        for host in {urlparse(url).netloc for url in r["external"]}:
+            hosts[host] = hosts.get(host, 0) + 1
+    return dict(sorted(hosts.items(), key=lambda kv: (-kv[1], kv[0])))
+
+
+def markdown_report(report: Dict) -> str:
+    lines = ["# Auditoria de peso das páginas", ""]
+    problems = report["problems"]
+    lines.append(f"{len(report['pages'])} página(s), {len(problems)} problema(s).")
+    lines += ["", "## Por idioma", "", "| Idioma | Páginas | Total | Média | Mais pesada |", "|---|---:|---:|---:|---|"]
+    for lang, t in report["languages"].items():
+        lines.append(
+            f"| {lang} | {t['pages']} | {_fmt(t['total_bytes'])} | {_fmt(t['total_bytes'] / t['pages'])} "
+            f"| {t['max_page']} ({_fmt(t['max_bytes'])}) |"
+        )
+    lines += ["", "## Páginas", "", "| Página | Idioma | HTML | Total | Lazy | Recursos | Externos | Ausentes |",
+              "|---|---|---:|---:|---:|---:|---:|---:|"]
+    for r in sorted(report["pages"], key=lambda r: -r["total_bytes"]):
+        lines.append(
+            f"| {r['page']} | {r['lang']} | {_fmt(r['html_bytes'])} | {_fmt(r['total_bytes'])} | {_fmt(r['lazy_bytes'])} "
+            f"| {len(r['assets'])} | {len(r['external'])} | {len(r['missing'])} |"
+        )
+    if report["external_hosts"]:
+        lines += ["", "## Domínios externos", "", "| Domínio | Páginas |", "|---|---:|"]
+        lines += [f"| {host} | {count} |" for host, count in report["external_hosts"].items()]
+    if problems:
+        lines += ["", "## Problemas", ""] + [f"- {p}" for p in problems]
+    return "\n".join(lines) + "\n"
+
+
+def audit_site(
+    site: Path,
+    budgets: Dict,
+    jobs: int = 1,
+    baseline: Optional[Dict] = None,
+    threshold: float = 0.05,
+) -> Dict:
+    pages = site_pages(site)
+    print(f"Auditando {len(pages)} página(s) de {site}")
+    start = time.perf_counter()
+    base_pages = {r["page"]: r for r in (baseline or {}).get("pages", [])}
+    results, problems = [], []
+    for res, result in iter_results(pages, partial(audit_page, site=site), jobs):
+        print(res.message)
+        if not res.ok:
+            problems.append(res.message)
+            continue
+        results.append(result)
+        found = check_page(result, page_budget(budgets, result["page"]), base_pages.get(result["page"]), threshold)
+        for problem in found:
+            print(f"ERRO: {problem}")
+        problems += found
+    print(f"Concluído em {time.perf_counter() - start:.2f} s.")
+    return {
+        "budgets": budgets,
+        "threshold": threshold,
+        "pages": results,
+        "languages": language_totals(results),
+        "external_hosts": external_hosts(results),
+        "problems": problems,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Audita o peso das páginas do site e os orçamentos de página e de recurso.")
+    ap.add_argument("--site", default=str(SITE_ROOT), help="Raiz do site (default: pasta acima de portfolio/).")
+    ap.add_argument("--budgets", help="JSON com os orçamentos (page_kb, asset_kb, external e overrides por página).")
+    ap.add_argument("--json", help="Grava o relatório completo neste JSON (serve de --baseline depois).")
+    ap.add_argument("--markdown", help="Grava o relatório em Markdown neste arquivo.")
+    ap.add_argument("--baseline", help="Relatório JSON anterior: páginas que cresceram além do --threshold falham.")
+    ap.add_argument("--threshold", type=float, default=0.05, help="Crescimento tolerado sobre a baseline (0.05 = 5%%).")
+    ap.add_argument("--jobs", type=int, default=1, help="Processos paralelos (1 = serial; 0 = todos os núcleos).")
+    args = ap.parse_args()
+
+    site = Path(args.site).resolve()
+    try:
+        budgets = load_budgets(args.budgets)
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")) if args.baseline else None
+    except (OSError, ValueError) as e:
+        print(f"ERRO: {e}")
+        sys.exit(2)
+
+    report = audit_site(site, budgets, args.jobs, baseline, args.threshold)
+    for lang, t in report["languages"].items():
+        print(f"{lang}: {t['pages']} página(s), {_fmt(t['total_bytes'])} no total; mais pesada: {t['max_page']} ({_fmt(t['max_bytes'])})")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=1, ensure_ascii=False), encoding="utf-8")
+        print(f"Relatório: {args.json}")
+    if args.markdown:
+        Path(args.markdown).write_text(markdown_report(report), encoding="utf-8")
+        print(f"Relatório: {args.markdown}")
+    if report["problems"]:
+        print(f"{len(report['problems'])} problema(s) encontrado(s).")
+        sys.exit(1)
+    print("Sem problemas: todas as páginas dentro dos orçamentos.")
+
+
+if __name__ == "__main__":
+    main()
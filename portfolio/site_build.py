@@ -0,0 +1,374 @@
+"""
+Build do site multilíngue a partir de uma única fonte.
+
+As páginas em PT (raiz), /en/ e /es/ eram cópias editadas à mão: cada post
+existia três vezes e o menu e o seletor de idioma se repetiam em todo arquivo.
+Aqui cada página é descrita uma vez e renderizada para todos os idiomas a
+partir de templates compartilhados e de tabelas de strings por idioma:
+
+    site_src/
+        site.json                   {"languages": {"pt": "", "en": "en/", "es": "es/"}, "default": "pt"}
+        strings/pt.json             {"nav": {"home": "Início", ...}, ...} (chaves aninhadas viram nav.home)
+        templates/blog.html         {% include "partials/nav.html" %} ... {% list "partials/post-card.html" blog %}
+        templates/partials/         menu, seletor de idioma, cabeçalho e card dos posts
+        templates/pages/pt/...      páginas de conteúdo traduzido à mão, uma por idioma
+        pages/post-acinetobacter.json
+
+A fonte gera o blog, os posts e as páginas do menu nos três idiomas. Nas
+páginas de conteúdo (início, serviços, ...) o texto continua traduzido à mão
+num template por idioma, mas o menu e o seletor de idioma vêm dos partials.
+
+Uma página:
+
+    {"template": "posts/acinetobacter.html",       (ou {"pt": "pages/pt/sobre.html", "en": ...})
+     "path": "posts/post-acinetobacter.html",       (ou {"pt": "obrigado.html", "en": "en/thank-you.html", ...})
+     "tags": ["blog"],
+     "vars": {"date": "2025-10-10", "card.image": "https://.../Infographic_Acinetobacter.png"},
+     "strings": {"pt": {"post.title": "..."}, "en": {...}, "es": {...}}}
+
+O caminho simples ganha o prefixo do idioma (en/posts/...). Nos templates:
+
+    {{ chave }}              string da página, vars da página ou tabela do idioma (HTML permitido)
+    {{ lang }} / {{ root }}  código do idioma / caminho relativo até a raiz do site ("../../")
+    {{ url:pagina }}         link relativo para outra página, no mesmo idioma
+    {{ path:arquivo.html }}  link relativo para um arquivo da pasta do idioma (fora de site_src)
+    {{ href }}               link relativo para a própria página (ou para o item, dentro de {% list %})
+    {{ lang:en }}            link relativo para esta página em outro idioma (seletor)
+    {% include "x.html" %}   outro template
+    {% list "card.html" blog %}  o template para cada página com a tag, da data mais nova para a mais antiga
+
+Build incremental: cada saída guarda o que leu ao ser renderizada (templates,
+chaves das tabelas, páginas citadas e listas por tag) em .site-graph.json; o
+manifesto de build (manifest.py) compara o hash desses valores, então mudar
+uma string re-renderiza só as páginas que a usam, e um post novo só refaz as
+listagens da tag dele. As páginas desatualizadas são renderizadas em paralelo
+(--jobs) e só são regravadas se o HTML mudou; a saída mantém o fim de linha
+(CRLF/LF) do arquivo que substitui.
+
+    python portfolio/site_build.py                 # site_src/ -> raiz do site
+    python portfolio/site_build.py --jobs 0 --force
+"""
+import argparse
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from batch import FileResult, iter_results, resolve_jobs
+from manifest import BuildManifest, params_digest
+
+SITE_ROOT = Path(__file__).resolve().parent.parent
+GRAPH_NAME = ".site-graph.json"
+_VERSION = 1
+
+_TAG_RE = re.compile(r'\{%\s*(include|list)\s+"([^"]+)"\s*([\w-]*)\s*%\}|\{\{\s*([^{}]*?)\s*\}\}')
+
+
+def flatten(table: Dict, prefix: str = "") -> Dict[str, str]:
+    """{"nav": {"home": "Início"}} -> {"nav.home": "Início"}."""
+    flat = {}
+    for key, value in table.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _load_json(path: Path) -> Dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise ValueError(f"{path}: JSON inválido ({e})") from None
+
+
+@dataclass
+class Site:
+    """Fonte do site carregada: idiomas, tabelas de strings e páginas."""
+
+    src: Path
+    languages: Dict[str, str]  # idioma -> prefixo da saída ("" ou "en/")
+    default: str
+    strings: Dict[str, Dict[str, str]]
+    pages: Dict[str, Dict]
+    page_files: Dict[str, Path]
+    _digests: Dict[str, str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, src: Path) -> "Site":
+        config = _load_json(src / "site.json")
+        languages = config["languages"]
+        strings = {}
+        for lang in languages:
+            table = src / "strings" / f"{lang}.json"
+            strings[lang] = flatten(_load_json(table)) if table.exists() else {}
+        pages, page_files = {}, {}
+        for path in sorted((src / "pages").glob("*.json")):
+            pages[path.stem] = _load_json(path)
+            page_files[path.stem] = path
+        return cls(src, languages, config.get("default", next(iter(languages))), strings, pages, page_files)
+
+    def page_languages(self, page_id: str) -> List[str]:
+        page = self.pages[page_id]
+        return [lang for lang in self.languages if lang in page.get("languages", self.languages)]
+
+    def template_name(self, page_id: str, lang: str) -> str:
+        """Template da página no idioma (um só, ou um por idioma quando o conteúdo é traduzido à mão)."""
+        template = self.pages[page_id]["template"]
+        return template[lang] if isinstance(template, dict) else template
+
+    def output(self, page_id: str, lang: str) -> str:
+        """Caminho da página no idioma, relativo à raiz do site."""
+        path = self.pages[page_id]["path"]
+        if isinstance(path, dict):
+            return path[lang]
+        return self.languages[lang] + path
+
+    def tagged(self, tag: str, lang: str) -> List[str]:
+        """Páginas com a tag no idioma, da data mais nova para a mais antiga."""
+        ids = [pid for pid, page in self.pages.items() if tag in page.get("tags", ()) and lang in self.page_languages(pid)]
+        return sorted(ids, key=lambda pid: (str(self.pages[pid].get("vars", {}).get("date", "")), pid), reverse=True)
+
+    def page_digest(self, page_id: str) -> Optional[str]:
+        if page_id not in self.pages:
+            return None
+        if page_id not in self._digests:
+            self._digests[page_id] = params_digest(self.pages[page_id])
+        return self._digests[page_id]
+
+
+@dataclass
+class Deps:
+    """O que uma renderização leu: a aresta template/strings/páginas -> saída do grafo."""
+
+    templates: Set[str] = field(default_factory=set)
+    keys: Set[str] = field(default_factory=set)
+    pages: Set[str] = field(default_factory=set)
+    tags: Set[str] = field(default_factory=set)
+
+    def to_json(self) -> Dict:
+        return {name: sorted(getattr(self, name)) for name in ("templates", "keys", "pages", "tags")}
+
+
+def _rel(target: str, current: str) -> str:
+    return os.path.relpath(target, os.path.dirname(current) or ".").replace(os.sep, "/")
+
+
+class Renderer:
+    def __init__(self, site: Site, lang: str):
+        self.site = site
+        self.lang = lang
+        self.deps = Deps()
+        self._templates: Dict[str, str] = {}
+
+    def template(self, name: str) -> str:
+        if name not in self._templates:
+            self.deps.templates.add(name)
+            path = self.site.src / "templates" / name
+            try:
+                self._templates[name] = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                raise ValueError(f"template não encontrado: {name}") from None
+        return self._templates[name]
+
+    def lookup(self, key: str, page_id: str) -> str:
+        page = self.site.pages[page_id]
+        own = page.get("strings", {}).get(self.lang, {})
+        if key in own:
+            return str(own[key])
+        if key in page.get("vars", {}):
+            return str(page["vars"][key])
+        self.deps.keys.add(key)
+        table = self.site.strings[self.lang]
+        if key not in table:
+            raise ValueError(f"string '{key}' ausente em strings/{self.lang}.json")
+        return str(table[key])
+
+    def expression(self, expr: str, page_id: str, out: str) -> str:
+        if expr == "lang":
+            return self.lang
+        if expr == "root":
+            root = _rel(".", out)
+            return "" if root == "." else root + "/"
+        if expr == "href" or expr.startswith("url:"):
+            target = page_id if expr == "href" else expr[4:].strip()
+            self.deps.pages.add(target)
+            if target not in self.site.pages or self.lang not in self.site.page_languages(target):
+                raise ValueError(f"página '{target}' não existe em {self.lang} (url:{target})")
+            return _rel(self.site.output(target, self.lang), out)
+        if expr.startswith("path:"):
+            return _rel(self.site.languages[self.lang] + expr[5:].strip(), out)
+        if expr.startswith("lang:"):
+            lang = expr[5:].strip()
+            if lang not in self.site.languages:
+                raise ValueError(f"idioma desconhecido: {lang}")
+            # Página sem esse idioma: o seletor leva à página inicial dele
+            target = page_id if lang in self.site.page_languages(page_id) else "index"
+            self.deps.pages.add(target)
+            if target not in self.site.pages:
+                raise ValueError(f"'{page_id}' não existe em {lang} e não há página 'index'")
+            return _rel(self.site.output(target, lang), out)
+        return self.lookup(expr, page_id)
+
+    def render(self, name: str, page_id: str, out: str, stack: Tuple[str, ...] = ()) -> str:
+        if name in stack:
+            raise ValueError(f"include circular: {' -> '.join(stack + (name,))}")
+
+        def replace(m):
+            kind, target, tag, expr = m.groups()
+            if kind == "include":
+                return self.render(target, page_id, out, stack + (name,))
+            if kind == "list":
+                self.deps.tags.add(tag)
+                items = self.site.tagged(tag, self.lang)
+                self.deps.pages.update(items)
+                # Cada item é renderizado no contexto da página listada; {{ url:... }} continua relativo a esta saída
+                return "".join(self.render(target, item, out, stack + (name,)) for item in items)
+            return self.expression(expr, page_id, out)
+
+        return _TAG_RE.sub(replace, self.template(name))
+
+
+def render_output(site: Site, item: Tuple[str, str]) -> Tuple[FileResult, Dict]:
+    """Worker: renderiza uma página num idioma; devolve o HTML em FileResult.outputs e as dependências lidas."""
+    page_id, lang = item
+    out = site.output(page_id, lang)
+    renderer = Renderer(site, lang)
+    try:
+        html = renderer.render(site.template_name(page_id, lang), page_id, out)
+    except (KeyError, ValueError) as e:
+        return FileResult(False, f"ERRO: {out} ({page_id}, {lang}) -> {e}"), {}
+    return FileResult(True, f"OK: {out}", outputs=[(Path(out), html.encode("utf-8"))]), renderer.deps.to_json()
+
+
+def render_chunk(site: Site, items: List[Tuple[str, str]]) -> List[Tuple[FileResult, Dict]]:
+    return [render_output(site, item) for item in items]
+
+
+def keep_newlines(html: bytes, current: Optional[bytes]) -> bytes:
+    """Mantém o fim de linha (CRLF ou LF) da saída existente, para que migrar uma página não reescreva todas as linhas."""
+    if current is None or not current.split(b"\n", 1)[0].endswith(b"\r"):
+        return html
+    return html.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+
+
+def split_outputs(todo: List[Tuple[str, str]], jobs: int) -> List[List[Tuple[str, str]]]:
+    """Faixas de saídas por tarefa: o Site vai serializado para o worker uma vez por faixa, não por página."""
+    jobs = resolve_jobs(jobs)
+    size = len(todo) if jobs <= 1 else max(1, -(-len(todo) // (jobs * 4)))
+    return [todo[i:i + size] for i in range(0, len(todo), max(1, size))]
+
+
+def fingerprint(site: Site, page_id: str, lang: str, deps: Dict, template_hash) -> Dict:
+    """Valores atuais de tudo que a saída leu da última vez (parâmetros do manifesto)."""
+    table = site.strings[lang]
+    return {
+        "tool": "site_build",
+        "version": _VERSION,
+        "lang": lang,
+        "languages": site.languages,
+        "out": site.output(page_id, lang),
+        "templates": {name: template_hash(name) for name in deps.get("templates", [])},
+        "keys": {key: table.get(key) for key in deps.get("keys", [])},
+        "pages": {pid: site.page_digest(pid) for pid in deps.get("pages", [])},
+        "tags": {tag: site.tagged(tag, lang) for tag in deps.get("tags", [])},
+    }
+
+
+def build_site(src: Path, out_dir: Path, jobs: int = 1, force: bool = False, manifest_path: Optional[str] = None) -> int:
+    """Renderiza as saídas desatualizadas; retorna o número de erros."""
+    start = time.perf_counter()
+    site = Site.load(src)
+    manifest = BuildManifest.for_outdir(out_dir, manifest_path, force=force)
+    graph_path = out_dir / GRAPH_NAME
+    try:
+        graph = _load_json(graph_path).get("outputs", {}) if graph_path.exists() else {}
+    except ValueError as e:
+        print(f"AVISO: {e}; refazendo tudo.")
+        graph = {}
+
+    hashes: Dict[str, Optional[str]] = {}
+
+    def template_hash(name: str) -> Optional[str]:
+        if name not in hashes:
+            path = src / "templates" / name
+            hashes[name] = manifest.source_hash(path) if path.exists() else None
+        return hashes[name]
+
+    todo = []
+    wanted = set()
+    for page_id in site.pages:
+        for lang in site.page_languages(page_id):
+            rel = site.output(page_id, lang)
+            wanted.add(rel)
+            entry = graph.get(rel)
+            if entry and entry["page"] == page_id and entry["lang"] == lang:
+                params = fingerprint(site, page_id, lang, entry["deps"], template_hash)
+                if manifest.is_fresh([out_dir / rel], site.page_files[page_id], params):
+                    manifest.skipped += 1
+                    continue
+            todo.append((page_id, lang))
+
+    errors = 0
+    chunks = split_outputs(todo, jobs)
+    results = (r for chunk in iter_results(chunks, partial(render_chunk, site), jobs) for r in chunk)
+    for (page_id, lang), (res, deps) in zip(todo, results):
+        if not res.ok:
+            print(res.message)
+            errors += 1
+            continue
+        (rel, html), = res.outputs
+        out = out_dir / rel
+        current = out.read_bytes() if out.exists() else None
+        html = keep_newlines(html, current)
+        changed = current != html
+        if changed:
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_bytes(html)
+        print(res.message if changed else f"{res.message} (inalterado)")
+        graph[rel.as_posix()] = {"page": page_id, "lang": lang, "deps": deps}
+        manifest.record([out], site.page_files[page_id], fingerprint(site, page_id, lang, deps, template_hash))
+        manifest.built += 1
+
+    # Saídas de páginas removidas da fonte (só as que este build gerou; o resto do site não é tocado)
+    for rel in sorted(set(graph) - wanted):
+        try:
+            (out_dir / rel).unlink()
+            print(f"Removida: {rel}")
+        except FileNotFoundError:
+            pass
+        del graph[rel]
+
+    manifest.save()
+    graph_path.write_text(json.dumps({"version": _VERSION, "outputs": graph}, indent=1, sort_keys=True), encoding="utf-8")
+    elapsed = time.perf_counter() - start
+    print(f"Concluído em {elapsed:.2f} s. {len(wanted)} saída(s), {len(site.pages)} página(s) em {len(site.languages)} idioma(s).")
+    print(manifest.summary())
+    return errors
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Renderiza o site em todos os idiomas a partir de templates e tabelas de strings.")
+    ap.add_argument("--src", default=str(SITE_ROOT / "site_src"), help="Pasta da fonte do site (default: site_src/ na raiz).")
+    ap.add_argument("--out", default=str(SITE_ROOT), help="Raiz do site gerado (default: pasta acima de portfolio/).")
+    ap.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <out>/.build-manifest.json).")
+    ap.add_argument("--force", action="store_true", help="Renderiza todas as páginas, ignorando o manifesto.")
+    ap.add_argument("--jobs", type=int, default=1, help="Processos paralelos para renderizar (0 = todos os núcleos).")
+    args = ap.parse_args()
+
+    src = Path(args.src).resolve()
+    if not (src / "site.json").exists():
+        print(f"ERRO: {src / 'site.json'} não encontrado.")
+        return
+    try:
+        build_site(src, Path(args.out).resolve(), args.jobs, args.force, args.manifest)
+    except (KeyError, ValueError) as e:
+        print(f"ERRO: {e}")
+
+
+if __name__ == "__main__":
+    main()
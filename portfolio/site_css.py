@@ -0,0 +1,211 @@
+"""
+CSS estático do site no lugar do compilador do Tailwind no navegador.
+
+Toda página carregava cdn.tailwindcss.com: o navegador baixava o compilador e
+gerava o CSS a cada carregamento antes de pintar a página. Este estágio varre
+as páginas (e os scripts em js/), gera só as regras das classes usadas
+(tailwind.py) e grava uma folha minificada com o hash do conteúdo no nome
+(css/site.<hash>.css, cacheável para sempre), a mesma em todas as páginas:
+quem abre a segunda página já tem o CSS em cache. As páginas passam a
+referenciá-la com um <link>:
+
+    python portfolio/site_css.py            # gera o CSS e reescreve as páginas
+    python portfolio/site_css.py --dry-run  # só mostra o que seria gerado
+
+Os blocos <style> das páginas diferem entre os layouts do site (o body dos
+posts, por exemplo, tem outra fonte e outro fundo). As regras iguais em todas
+as páginas entram na folha compartilhada; as demais vão para folhas pequenas
+por layout (css/layout.<hash>.css, uma por conjunto de regras), ligadas antes
+da compartilhada. A ordem do CDN é mantida: o CSS das páginas vem antes do
+Tailwind, que vence empates como antes.
+
+Os blocos <style> saem das páginas e ficam guardados em css/site-css.json,
+então rodar de novo (depois de editar classes ou adicionar um <style>) refaz as
+folhas a partir do mesmo conteúdo; folhas antigas geradas aqui são removidas.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from assets import SKIP_DIRS
+from tailwind import classes_used, extract_candidates, generate
+
+SITE_ROOT = Path(__file__).resolve().parent.parent
+CSS_DIR = "css"
+STATE_NAME = "site-css.json"
+
+_CDN_RE = re.compile(r'[ \t]*<script\b[^>]*\bsrc="https://cdn\.tailwindcss\.com[^"]*"[^>]*>\s*</script>[ \t]*\n?')
+_LINK_RE = re.compile(r'[ \t]*<link\b[^>]*\bdata-site-css\b[^>]*>[ \t]*\n?')
+_STYLE_RE = re.compile(r"[ \t]*<style\b[^>]*>(.*?)</style>[ \t]*\n?", re.S)
+_CONFIG_RE = re.compile(r"\btailwind\.config\s*=")
+
+
+def minify_css(css: str) -> str:
+    """Minificação conservadora: comentários, espaços e o último ';' de cada bloco."""
+    parts = re.split(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""", css)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2:  # string entre aspas: intacta
+            out.append(part)
+            continue
+        part = re.sub(r"/\*.*?\*/", "", part, flags=re.S)
+        part = re.sub(r"\s+", " ", part)
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        part = re.sub(r":\s+", ":", part)
+        part = part.replace(";}", "}")
+        out.append(part)
+    return "".join(out).strip()
+
+
+def site_pages(site: Path) -> List[Path]:
+    pages = []
+    for dirpath, dirnames, filenames in os.walk(site):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        pages += [Path(dirpath) / n for n in sorted(filenames) if n.lower().endswith(".html")]
+    return pages
+
+
+def script_candidates(site: Path) -> set:
+    """Classes podem aparecer só em JS (classList.add('hidden')): os scripts de js/ valem para todas as páginas."""
+    candidates = set()
+    for script in sorted((site / "js").glob("*.js")):
+        candidates |= extract_candidates(script.read_text(encoding="utf-8", errors="ignore"))
+    return candidates
+
+
+def split_rules(css: str) -> List[str]:
+    """Regras de nível superior de um CSS minificado (um @media inteiro conta como uma regra)."""
+    rules, depth, start = [], 0, 0
+    for i, ch in enumerate(css):
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:i + 1])
+                start = i + 1
+    return rules
+
+
+def rewrite_page(text: str, hrefs: Sequence[str]) -> str:
+    """Troca o script do CDN (ou os <link> de um build anterior) pelos <link> novos e remove os <style>."""
+    m = _LINK_RE.search(text) or _CDN_RE.search(text)
+    indent = re.match(r"[ \t]*", m.group(0)).group(0)
+    links = "".join(f'{indent}<link rel="stylesheet" href="{href}" data-site-css>\n' for href in hrefs)
+    return _STYLE_RE.sub("", text[:m.start()]) + links + _STYLE_RE.sub("", _LINK_RE.sub("", text[m.end():]))
+
+
+def _write_sheet(css_dir: Path, prefix: str, css: str, dry_run: bool) -> Path:
+    out = css_dir / f"{prefix}.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+    if not dry_run and not out.exists():
+        css_dir.mkdir(parents=True, exist_ok=True)
+        out.write_text(css, encoding="utf-8")
+    return out
+
+
+def build_site_css(site: Path, pages: Sequence[Path], dry_run: bool = False, prune: bool = True) -> None:
+    """
+    Gera as folhas e reescreve as páginas; prune=False (subconjunto de páginas)
+    mantém as folhas antigas. As classes vêm sempre do site inteiro, para que a
+    folha compartilhada seja a mesma com ou sem subconjunto.
+    """
+    css_dir = site / CSS_DIR
+    state_path = css_dir / STATE_NAME
+    try:
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = {"pages": {}, "files": []}
+
+    candidates = script_candidates(site)
+    local: Dict[Path, List[str]] = {}  # regras dos <style> de cada página (minificadas)
+    texts: Dict[Path, str] = {}
+    targets = set(pages)
+    for page in list(pages) + [p for p in site_pages(site) if p not in targets]:
+        text = page.read_text(encoding="utf-8")
+        rel = page.relative_to(site).as_posix()
+        if not (_CDN_RE.search(text) or _LINK_RE.search(text)):
+            continue
+        if _CONFIG_RE.search(text):
+            if page in targets:
+                print(f"AVISO: {rel} define tailwind.config (não suportado); mantida com o CDN.")
+            continue
+        inline = state["pages"].get(rel, []) + [m.group(1) for m in _STYLE_RE.finditer(text)]
+        # Sem os <style> e o <link>: o conteúdo deles não é marcação, e a 2ª execução vê as mesmas classes
+        candidates |= extract_candidates(_LINK_RE.sub("", _CDN_RE.sub("", _STYLE_RE.sub("", text))))
+        local[page] = split_rules(minify_css("\n".join(inline)))
+        if page in targets:
+            state["pages"][rel] = inline
+            texts[page] = text
+
+    if not texts:
+        print("Nenhuma página com o Tailwind do CDN encontrada.")
+        return
+
+    # Regras presentes em todas as páginas vão para a folha compartilhada, antes do Tailwind
+    common = set.intersection(*(set(rules) for rules in local.values()))
+    shared_rules = [r for r in next(iter(local.values())) if r in common]
+    css = "".join(shared_rules) + generate(sorted(candidates))
+    shared = _write_sheet(css_dir, "site", css, dry_run)
+    files = [shared.name]
+    print(f"OK: {CSS_DIR}/{shared.name} ({len(css) / 1024:.1f} KB, {len(classes_used(sorted(candidates)))} classe(s)) "
+          f"<- {len(texts)} página(s)")
+
+    layouts: Dict[str, List[Path]] = {}  # regras próprias do layout -> páginas
+    for page in texts:
+        layouts.setdefault("".join(r for r in local[page] if r not in common), []).append(page)
+    for layout_css, group in layouts.items():
+        sheets = [shared]
+        if layout_css:
+            out = _write_sheet(css_dir, "layout", layout_css, dry_run)
+            files.append(out.name)
+            sheets.insert(0, out)
+            print(f"OK: {CSS_DIR}/{out.name} ({len(layout_css) / 1024:.1f} KB) <- {len(group)} página(s)")
+        if dry_run:
+            continue
+        for page in group:
+            hrefs = [os.path.relpath(sheet, page.parent).replace(os.sep, "/") for sheet in sheets]
+            new_text = rewrite_page(texts[page], hrefs)
+            if new_text != texts[page]:
+                page.write_text(new_text, encoding="utf-8")
+
+    if dry_run:
+        return
+    # Remove as folhas de builds anteriores que nenhuma página usa mais
+    for old in set(state.get("files", [])) - set(files) if prune else ():
+        try:
+            (css_dir / old).unlink()
+            print(f"Removida: {CSS_DIR}/{old}")
+        except FileNotFoundError:
+            pass
+    state["files"] = sorted(set(files) if prune else set(files) | set(state.get("files", [])))
+    state_path.write_text(json.dumps(state, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+    print(f"Concluído. {len(texts)} página(s): 1 folha compartilhada e {len(files) - 1} de layout.")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera o CSS do Tailwind no build e remove o compilador do CDN das páginas.")
+    ap.add_argument("--site", default=str(SITE_ROOT), help="Raiz do site (default: pasta acima de portfolio/).")
+    ap.add_argument("--pages", nargs="*", help="Páginas a processar, relativas ao site (default: todas as .html).")
+    ap.add_argument("--dry-run", action="store_true", help="Mostra as folhas que seriam geradas sem gravar nada.")
+    args = ap.parse_args()
+
+    site = Path(args.site).resolve()
+    if args.pages:
+        pages = []
+        for rel in args.pages:
+            page = (site / rel).resolve()
+            if page.is_file():
+                pages.append(page)
+            else:
+                print(f"AVISO: página não encontrada: {rel}")
+    else:
+        pages = site_pages(site)
+    build_site_css(site, pages, dry_run=args.dry_run, prune=not args.pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Execução em estágios (--staged): leitura -> decodificação/marca/codificação -> escrita.
+
+No run_batch cada arquivo alterna disco e CPU: lê, decodifica, compõe,
+codifica e grava antes de passar ao próximo. Aqui a leitura roda numa thread
+que lê os arquivos adiante, o trabalho de pixels roda nos processos do pool
+(recebe os bytes da fonte e devolve os bytes codificados, em
+FileResult.outputs) e a escrita roda no processo principal, na ordem de
+entrada. Uma fila limitada (--queue-depth) entre os estágios segura a leitura
+quando os workers estão atrasados, então a memória fica em
+~queue_depth arquivos de entrada + saídas em voo.
+
+No fim é impresso quanto tempo cada estágio ficou ocupado e a ocupação da
+fila (média/máxima e quantas vezes a leitura esperou por espaço).
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Sequence, TypeVar
+
+from batch import BatchSummary, FileResult, resolve_jobs, shared_pool
+
+T = TypeVar("T")
+
+MIN_QUEUE_DEPTH = 4
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    wall: float = 0.0
+    read: float = 0.0  # thread de leitura ocupada
+    work: float = 0.0  # soma do tempo de CPU dos workers
+    write: float = 0.0  # escrita no processo principal
+    wait: float = 0.0  # escrita esperando o próximo resultado
+    stalls: int = 0  # leituras que encontraram a fila cheia
+    stalled: float = 0.0
+    depth_sum: int = 0
+    depth_max: int = 0
+    samples: int = 0
+
+    def sample(self, depth: int) -> None:
+        self.depth_sum += depth
+        self.depth_max = max(self.depth_max, depth)
+        self.samples += 1
+
+    def print_report(self, workers: int, queue_depth: int) -> None:
+        wall = max(self.wall, 1e-9)
+        mean = self.depth_sum / max(1, self.samples)
+        print("Estágios:")
+        print(f"  leitura   {self.read:8.3f} s  ({self.read / wall:5.1%} do tempo)")
+        print(f"  workers   {self.work:8.3f} s  ({self.work / (wall * workers):5.1%} de {workers} processo(s))")
+        print(f"  escrita   {self.write:8.3f} s  ({self.write / wall:5.1%} do tempo)")
+        print(f"  espera    {self.wait:8.3f} s  (escrita aguardando os workers)")
+        print(f"Fila: média {mean:.1f}, máx {self.depth_max} de {queue_depth}; "
+              f"leitura bloqueada {self.stalls}x ({self.stalled:.3f} s)")
+
+
+def _timed(worker: Callable[..., FileResult], item, data: bytes):
+    t0 = time.perf_counter()
+    res = worker(item, data=data)
+    return time.perf_counter() - t0, res
+
+
+def write_outputs(res: FileResult) -> None:
+    """Grava as saídas codificadas pelo worker e as descarta do resultado."""
+    for path, blob in res.outputs or ():
+        Path(path).write_bytes(blob)
+    res.outputs = None
+
+
+def run_staged(
+    items: Sequence[T],
+    worker: Callable[..., FileResult],
+    jobs: int = 1,
+    queue_depth: Optional[int] = None,
+    on_result: Optional[Callable[[T, FileResult], None]] = None,
+) -> BatchSummary:
+    """
+    Como batch.run_batch, em estágios. worker(item, data=bytes da fonte) roda
+    no pool e devolve as saídas em FileResult.outputs; o item precisa ser um
+    caminho (é o que a thread de leitura abre). Sem queue_depth, a fila
+    comporta dois arquivos por worker (mínimo 4).
+    """
+    shared = shared_pool()
+    workers = resolve_jobs(jobs) if shared is not None else min(resolve_jobs(jobs), max(1, len(items)))
+    queue_depth = max(1, queue_depth or max(MIN_QUEUE_DEPTH, 2 * workers))
+    stats = StageStats()
+    summary = BatchSummary()
+    pending: "queue.Queue" = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    start = time.perf_counter()
+
+    def reader(pool):
+        for item in items:
+            if stop.is_set():
+                break
+            t0 = time.perf_counter()
+            try:
+                job = pool.submit(_timed, worker, item, Path(item).read_bytes())
+            except Exception as e:
+                job = e
+            stats.read += time.perf_counter() - t0
+            if pending.full():
+                stats.stalls += 1
+                t0 = time.perf_counter()
+                pending.put((item, job))
+                stats.stalled += time.perf_counter() - t0
+            else:
+                pending.put((item, job))
+        pending.put(_DONE)
+
+    pool = shared if shared is not None else ProcessPoolExecutor(max_workers=workers)
+    thread = threading.Thread(target=reader, args=(pool,), name="staged-reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            t0 = time.perf_counter()
+            entry = pending.get()
+            if entry is _DONE:
+                break
+            stats.sample(pending.qsize() + 1)
+            item, job = entry
+            if isinstance(job, Exception):
+                res = FileResult(False, f"ERRO: {Path(item).name} -> {job}")
+            else:
+                try:
+                    secs, res = job.result()
+                    stats.work += secs
+                except Exception as e:
+                    res = FileResult(False, f"ERRO: {Path(item).name} -> {e}")
+            stats.wait += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            if res.ok:
+                try:
+                    write_outputs(res)
+                except OSError as e:
+                    res = FileResult(False, f"ERRO: {Path(item).name} -> {e}")
+            stats.write += time.perf_counter() - t0
+
+            print(res.message)
+            if on_result is not None:
+                on_result(item, res)
+            if res.ok:
+                summary.ok += 1
+                summary.bytes_in += res.bytes_in
+            else:
+                summary.errors += 1
+    finally:
+        stop.set()
+        while thread.is_alive():  # libera a leitura caso esteja bloqueada na fila
+            try:
+                pending.get_nowait()
+            except queue.Empty:
+                thread.join(0.05)
+        if shared is None:
+            pool.shutdown(cancel_futures=True)
+
+    summary.elapsed = stats.wall = time.perf_counter() - start
+    print(summary.throughput())
+    stats.print_report(workers, queue_depth)
+    return summary
+
+
+def add_staged_args(parser) -> None:
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Sobrepõe leitura, processamento (pool de processos) e escrita, ligados por filas limitadas.",
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        help="Arquivos em voo entre a leitura e a escrita no modo --staged (default: 2 por worker, mínimo 4).",
+    )
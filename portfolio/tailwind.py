@@ -0,0 +1,744 @@
+"""
+Gerador de CSS para as classes utilitárias do Tailwind (v3) usadas no site.
+
+As páginas carregavam cdn.tailwindcss.com, que baixa o compilador JIT e gera o
+CSS no navegador a cada carregamento. Aqui a mesma geração roda no build: o
+texto das páginas é varrido atrás de candidatos (como o extrator do Tailwind:
+qualquer token que seja uma classe válida, inclusive em strings de JS), e só
+as regras desses candidatos são emitidas, já minificadas, depois do preflight
+(o reset base do Tailwind).
+
+Cobre o tema padrão do Tailwind (cores, espaçamento, tipografia, sombras,
+breakpoints), valores arbitrários (bg-[#00A6FB], max-w-[200px]), modificador de
+opacidade (bg-gray-900/80), valores negativos (-mt-4) e as variantes
+sm/md/lg/xl/2xl, dark, print, hover/focus/active/disabled/..., group-hover,
+file: e placeholder:. Classes desconhecidas são ignoradas, como no Tailwind.
+Configuração própria (tailwind.config) não é suportada.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+SCREENS = {"sm": 640, "md": 768, "lg": 1024, "xl": 1280, "2xl": 1536}
+PSEUDO_ELEMENTS = {
+    "file": "::file-selector-button",
+    "placeholder": "::placeholder",
+    "marker": "::marker",
+    "selection": "::selection",
+}
+PSEUDO_CLASSES = {
+    "first": ":first-child",
+    "last": ":last-child",
+    "odd": ":nth-child(odd)",
+    "even": ":nth-child(even)",
+    "visited": ":visited",
+    "checked": ":checked",
+    "focus-within": ":focus-within",
+    "hover": ":hover",
+    "focus": ":focus",
+    "focus-visible": ":focus-visible",
+    "active": ":active",
+    "enabled": ":enabled",
+    "disabled": ":disabled",
+}
+GROUP_VARIANTS = {"group-hover": ".group:hover ", "group-focus": ".group:focus "}
+MEDIA_VARIANTS = {"dark": "(prefers-color-scheme: dark)", "print": "print"}
+MEDIA_VARIANTS.update({name: f"(min-width: {px}px)" for name, px in SCREENS.items()})
+# Ordem de registro das variantes no Tailwind: define a ordem das regras no CSS
+VARIANT_ORDER = [*PSEUDO_ELEMENTS, *PSEUDO_CLASSES, *GROUP_VARIANTS, *MEDIA_VARIANTS]
+
+_SHADES = ["50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950"]
+_PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "zinc": "fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b",
+    "neutral": "fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a",
+    "stone": "fafaf9 f5f5f4 e7e5e4 d6d3d1 a8a29e 78716c 57534e 44403c 292524 1c1917 0c0a09",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "lime": "f7fee7 ecfccb d9f99d bef264 a3e635 84cc16 65a30d 4d7c0f 3f6212 365314 1a2e05",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "teal": "f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e",
+    "cyan": "ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344",
+    "sky": "f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+    "violet": "f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764",
+    "fuchsia": "fdf4ff fae8ff f5d0fe f0abfc e879f9 d946ef c026d3 a21caf 86198f 701a75 4a044e",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+    "rose": "fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519",
+}
+COLORS: Dict[str, str] = {"black": "000000", "white": "ffffff"}
+for _name, _hexes in _PALETTE.items():
+    COLORS.update({f"{_name}-{shade}": h for shade, h in zip(_SHADES, _hexes.split())})
+COLOR_KEYWORDS = {"transparent": "transparent", "current": "currentColor", "inherit": "inherit"}
+
+SPACING = {"0": "0px", "px": "1px"}
+for _n in [0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20, 24, 28, 32, 36, 40, 44, 48, 52, 56, 60, 64, 72, 80, 96]:
+    SPACING[f"{_n:g}"] = f"{_n / 4:g}rem"
+
+FONT_SIZES = {
+    "xs": ("0.75rem", "1rem"), "sm": ("0.875rem", "1.25rem"), "base": ("1rem", "1.5rem"),
+    "lg": ("1.125rem", "1.75rem"), "xl": ("1.25rem", "1.75rem"), "2xl": ("1.5rem", "2rem"),
+    "3xl": ("1.875rem", "2.25rem"), "4xl": ("2.25rem", "2.5rem"), "5xl": ("3rem", "1"),
+    "6xl": ("3.75rem", "1"), "7xl": ("4.5rem", "1"), "8xl": ("6rem", "1"), "9xl": ("8rem", "1"),
+}
+FONT_WEIGHTS = {
+    "thin": "100", "extralight": "200", "light": "300", "normal": "400", "medium": "500",
+    "semibold": "600", "bold": "700", "extrabold": "800", "black": "900",
+}
+FONT_FAMILIES = {
+    "sans": 'ui-sans-serif, system-ui, sans-serif, "Apple Color Emoji", "Segoe UI Emoji", "Segoe UI Symbol", "Noto Color Emoji"',
+    "serif": 'ui-serif, Georgia, Cambria, "Times New Roman", Times, serif',
+    "mono": 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace',
+}
+LINE_HEIGHTS = {"none": "1", "tight": "1.25", "snug": "1.375", "normal": "1.5", "relaxed": "1.625", "loose": "2"}
+LINE_HEIGHTS.update({str(n): f"{n / 4:g}rem" for n in range(3, 11)})
+TRACKING = {"tighter": "-0.05em", "tight": "-0.025em", "normal": "0em", "wide": "0.025em", "wider": "0.05em", "widest": "0.1em"}
+RADII = {"none": "0px", "sm": "0.125rem", "DEFAULT": "0.25rem", "md": "0.375rem", "lg": "0.5rem",
+         "xl": "0.75rem", "2xl": "1rem", "3xl": "1.5rem", "full": "9999px"}
+BORDER_WIDTHS = {"DEFAULT": "1px", "0": "0px", "2": "2px", "4": "4px", "8": "8px"}
+RING_WIDTHS = {"DEFAULT": "3px", "0": "0px", "1": "1px", "2": "2px", "4": "4px", "8": "8px"}
+SHADOWS = {
+    "sm": "0 1px 2px 0 rgb(0 0 0 / 0.05)",
+    "DEFAULT": "0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)",
+    "md": "0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0 / 0.25)",
+    "inner": "inset 0 2px 4px 0 rgb(0 0 0 / 0.05)",
+    "none": "0 0 #0000",
+}
+BLURS = {"none": "", "sm": "4px", "DEFAULT": "8px", "md": "12px", "lg": "16px", "xl": "24px", "2xl": "40px", "3xl": "64px"}
+MAX_WIDTHS = {
+    "0": "0rem", "none": "none", "xs": "20rem", "sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem",
+    "2xl": "42rem", "3xl": "48rem", "4xl": "56rem", "5xl": "64rem", "6xl": "72rem", "7xl": "80rem",
+    "full": "100%", "min": "min-content", "max": "max-content", "fit": "fit-content", "prose": "65ch",
+}
+MAX_WIDTHS.update({f"screen-{k}": f"{v}px" for k, v in SCREENS.items()})
+Z_INDEX = {"0": "0", "10": "10", "20": "20", "30": "30", "40": "40", "50": "50", "auto": "auto"}
+OPACITIES = {str(n): f"{n / 100:g}" for n in range(0, 101, 5)}
+SCALES = {str(n): f"{n / 100:g}" for n in (0, 50, 75, 90, 95, 100, 105, 110, 125, 150)}
+ROTATES = {str(n): f"{n}deg" for n in (0, 1, 2, 3, 6, 12, 45, 90, 180)}
+DURATIONS = {str(n): f"{n}ms" for n in (0, 75, 100, 150, 200, 300, 500, 700, 1000)}
+EASINGS = {"linear": "linear", "in": "cubic-bezier(0.4, 0, 1, 1)", "out": "cubic-bezier(0, 0, 0.2, 1)", "in-out": "cubic-bezier(0.4, 0, 0.2, 1)"}
+TRANSITIONS = {
+    "DEFAULT": "color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter",
+    "none": "none",
+    "all": "all",
+    "colors": "color, background-color, border-color, text-decoration-color, fill, stroke",
+    "opacity": "opacity",
+    "shadow": "box-shadow",
+    "transform": "transform",
+}
+
+_TRANSFORM = ("translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) "
+              "skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))")
+_FILTER = ("var(--tw-blur) var(--tw-brightness) var(--tw-contrast) var(--tw-grayscale) var(--tw-hue-rotate) "
+           "var(--tw-invert) var(--tw-saturate) var(--tw-sepia) var(--tw-drop-shadow)")
+_BACKDROP = ("var(--tw-backdrop-blur) var(--tw-backdrop-brightness) var(--tw-backdrop-contrast) "
+             "var(--tw-backdrop-grayscale) var(--tw-backdrop-hue-rotate) var(--tw-backdrop-invert) "
+             "var(--tw-backdrop-opacity) var(--tw-backdrop-saturate) var(--tw-backdrop-sepia)")
+_SHADOW = "box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)"
+
+_VARS = (
+    "--tw-border-spacing-x:0;--tw-border-spacing-y:0;--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;"
+    "--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-ring-inset: ;--tw-ring-offset-width:0px;"
+    "--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;"
+    "--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000;--tw-blur: ;"
+    "--tw-brightness: ;--tw-contrast: ;--tw-grayscale: ;--tw-hue-rotate: ;--tw-invert: ;--tw-saturate: ;"
+    "--tw-sepia: ;--tw-drop-shadow: ;--tw-backdrop-blur: ;--tw-backdrop-brightness: ;--tw-backdrop-contrast: ;"
+    "--tw-backdrop-grayscale: ;--tw-backdrop-hue-rotate: ;--tw-backdrop-invert: ;--tw-backdrop-opacity: ;"
+    "--tw-backdrop-saturate: ;--tw-backdrop-sepia: "
+)
+# Preflight do Tailwind v3 (reset base que o CDN injeta em toda página)
+PREFLIGHT = (
+    f"*,::before,::after{{{_VARS}}}::backdrop{{{_VARS}}}"
+    "*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}"
+    "::before,::after{--tw-content:''}"
+    "html,:host{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;"
+    f"font-family:{FONT_FAMILIES['sans']};font-feature-settings:normal;font-variation-settings:normal;"
+    "-webkit-tap-highlight-color:transparent}"
+    "body{margin:0;line-height:inherit}"
+    "hr{height:0;color:inherit;border-top-width:1px}"
+    "abbr:where([title]){-webkit-text-decoration:underline dotted;text-decoration:underline dotted}"
+    "h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}"
+    "a{color:inherit;text-decoration:inherit}"
+    "b,strong{font-weight:bolder}"
+    f"code,kbd,samp,pre{{font-family:{FONT_FAMILIES['mono']};font-feature-settings:normal;"
+    "font-variation-settings:normal;font-size:1em}"
+    "small{font-size:80%}"
+    "sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}"
+    "sub{bottom:-0.25em}sup{top:-0.5em}"
+    "table{text-indent:0;border-color:inherit;border-collapse:collapse}"
+    "button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;"
+    "font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;"
+    "letter-spacing:inherit;color:inherit;margin:0;padding:0}"
+    "button,select{text-transform:none}"
+    "button,input:where([type='button']),input:where([type='reset']),input:where([type='submit'])"
+    "{-webkit-appearance:button;background-color:transparent;background-image:none}"
+    ":-moz-focusring{outline:auto}:-moz-ui-invalid{box-shadow:none}"
+    "progress{vertical-align:baseline}"
+    "::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}"
+    "[type='search']{-webkit-appearance:textfield;outline-offset:-2px}"
+    "::-webkit-search-decoration{-webkit-appearance:none}"
+    "::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}"
+    "summary{display:list-item}"
+    "blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}"
+    "fieldset{margin:0;padding:0}legend{padding:0}"
+    "ol,ul,menu{list-style:none;margin:0;padding:0}"
+    "dialog{padding:0}"
+    "textarea{resize:vertical}"
+    "input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}"
+    'button,[role="button"]{cursor:pointer}'
+    ":disabled{cursor:default}"
+    "img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}"
+    "img,video{max-width:100%;height:auto}"
+    '[hidden]:where(:not([hidden="until-found"])){display:none}'
+)
+
+# Ordem dos plugins do Tailwind: regras de plugins posteriores vencem no cascade
+PLUGINS = [
+    "srOnly", "pointerEvents", "visibility", "position", "inset", "insetX", "insetSide", "zIndex", "order",
+    "gridColumn", "float", "clear", "margin", "marginX", "marginSide", "boxSizing", "display", "aspectRatio",
+    "height", "maxHeight", "minHeight", "width", "minWidth", "maxWidth", "flex", "flexShrink", "flexGrow",
+    "flexBasis", "translate", "rotate", "scale", "transform", "cursor", "userSelect", "listStylePosition",
+    "listStyleType", "gridTemplateColumns", "gridTemplateRows", "flexDirection", "flexWrap", "alignContent",
+    "alignItems", "justifyContent", "gap", "gapX", "space", "alignSelf", "overflow", "overflowX",
+    "scrollBehavior", "truncate", "whitespace", "wordBreak", "borderRadius", "borderRadiusSide",
+    "borderRadiusCorner", "borderWidth", "borderWidthX", "borderWidthSide", "borderStyle", "borderColor",
+    "borderColorSide", "borderOpacity", "backgroundColor", "backgroundOpacity", "objectFit", "objectPosition",
+    "padding", "paddingX", "paddingSide", "textAlign", "verticalAlign", "fontFamily", "fontSize", "fontWeight",
+    "textTransform", "fontStyle", "lineHeight", "letterSpacing", "textColor", "textOpacity", "textDecoration",
+    "placeholderColor", "opacity", "boxShadow", "outline", "ringWidth", "ringColor", "ringOpacity", "blur",
+    "filter", "backdropBlur", "backdropFilter", "transitionProperty", "transitionDuration",
+    "transitionTimingFunction",
+]
+_PLUGIN_INDEX = {name: i for i, name in enumerate(PLUGINS)}
+
+_STATIC: Dict[str, Tuple[str, List[str]]] = {}
+
+
+def _static(plugin: str, table: Dict[str, str]) -> None:
+    for name, decls in table.items():
+        _STATIC[name] = (plugin, decls.split(";"))
+
+
+_static("srOnly", {
+    "sr-only": "position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;"
+               "clip:rect(0, 0, 0, 0);white-space:nowrap;border-width:0",
+})
+_static("pointerEvents", {"pointer-events-none": "pointer-events:none", "pointer-events-auto": "pointer-events:auto"})
+_static("visibility", {"visible": "visibility:visible", "invisible": "visibility:hidden", "collapse": "visibility:collapse"})
+_static("position", {p: f"position:{p}" for p in ("static", "fixed", "absolute", "relative", "sticky")})
+_static("float", {"float-right": "float:right", "float-left": "float:left", "float-none": "float:none"})
+_static("clear", {"clear-both": "clear:both", "clear-none": "clear:none"})
+_static("boxSizing", {"box-border": "box-sizing:border-box", "box-content": "box-sizing:content-box"})
+_static("display", {
+    "block": "display:block", "inline-block": "display:inline-block", "inline": "display:inline",
+    "flex": "display:flex", "inline-flex": "display:inline-flex", "table": "display:table",
+    "table-row": "display:table-row", "table-cell": "display:table-cell", "flow-root": "display:flow-root",
+    "grid": "display:grid", "inline-grid": "display:inline-grid", "contents": "display:contents",
+    "list-item": "display:list-item", "hidden": "display:none",
+})
+_static("aspectRatio", {"aspect-auto": "aspect-ratio:auto", "aspect-square": "aspect-ratio:1 / 1", "aspect-video": "aspect-ratio:16 / 9"})
+_static("flex", {"flex-1": "flex:1 1 0%", "flex-auto": "flex:1 1 auto", "flex-initial": "flex:0 1 auto", "flex-none": "flex:none"})
+_static("flexShrink", {"flex-shrink": "flex-shrink:1", "flex-shrink-0": "flex-shrink:0", "shrink": "flex-shrink:1", "shrink-0": "flex-shrink:0"})
+_static("flexGrow", {"flex-grow": "flex-grow:1", "flex-grow-0": "flex-grow:0", "grow": "flex-grow:1", "grow-0": "flex-grow:0"})
+_static("transform", {"transform": f"transform:{_TRANSFORM}", "transform-gpu": "transform:translate3d(var(--tw-translate-x), var(--tw-translate-y), 0) rotate(var(--tw-rotate)) skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))", "transform-none": "transform:none"})
+_static("cursor", {f"cursor-{c}": f"cursor:{c}" for c in ("auto", "default", "pointer", "wait", "text", "move", "help", "not-allowed", "none", "grab")})
+_static("userSelect", {"select-none": "user-select:none", "select-text": "user-select:text", "select-all": "user-select:all", "select-auto": "user-select:auto"})
+_static("listStylePosition", {"list-inside": "list-style-position:inside", "list-outside": "list-style-position:outside"})
+_static("listStyleType", {"list-none": "list-style-type:none", "list-disc": "list-style-type:disc", "list-decimal": "list-style-type:decimal"})
+_static("flexDirection", {
+    "flex-row": "flex-direction:row", "flex-row-reverse": "flex-direction:row-reverse",
+    "flex-col": "flex-direction:column", "flex-col-reverse": "flex-direction:column-reverse",
+})
+_static("flexWrap", {"flex-wrap": "flex-wrap:wrap", "flex-wrap-reverse": "flex-wrap:wrap-reverse", "flex-nowrap": "flex-wrap:nowrap"})
+_static("alignContent", {
+    "content-center": "align-content:center", "content-start": "align-content:flex-start",
+    "content-end": "align-content:flex-end", "content-between": "align-content:space-between",
+})
+_static("alignItems", {
+    "items-start": "align-items:flex-start", "items-end": "align-items:flex-end", "items-center": "align-items:center",
+    "items-baseline": "align-items:baseline", "items-stretch": "align-items:stretch",
+})
+_static("justifyContent", {
+    "justify-normal": "justify-content:normal", "justify-start": "justify-content:flex-start",
+    "justify-end": "justify-content:flex-end", "justify-center": "justify-content:center",
+    "justify-between": "justify-content:space-between", "justify-around": "justify-content:space-around",
+    "justify-evenly": "justify-content:space-evenly", "justify-stretch": "justify-content:stretch",
+})
+_static("alignSelf", {
+    "self-auto": "align-self:auto", "self-start": "align-self:flex-start", "self-end": "align-self:flex-end",
+    "self-center": "align-self:center", "self-stretch": "align-self:stretch",
+})
+_static("overflow", {f"overflow-{v}": f"overflow:{v}" for v in ("auto", "hidden", "clip", "visible", "scroll")})
+_static("overflowX", {f"overflow-{a}-{v}": f"overflow-{a}:{v}" for a in "xy" for v in ("auto", "hidden", "clip", "visible", "scroll")})
+_static("scrollBehavior", {"scroll-auto": "scroll-behavior:auto", "scroll-smooth": "scroll-behavior:smooth"})
+_static("truncate", {"truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap"})
+_static("whitespace", {f"whitespace-{v}": f"white-space:{v}" for v in ("normal", "nowrap", "pre", "pre-line", "pre-wrap", "break-spaces")})
+_static("wordBreak", {"break-normal": "overflow-wrap:normal;word-break:normal", "break-words": "overflow-wrap:break-word", "break-all": "word-break:break-all"})
+_static("borderStyle", {f"border-{s}": f"border-style:{s}" for s in ("solid", "dashed", "dotted", "double", "hidden", "none")})
+_static("objectFit", {f"object-{v}": f"object-fit:{v}" for v in ("contain", "cover", "fill", "none", "scale-down")})
+_static("objectPosition", {f"object-{v}": f"object-position:{v}" for v in ("bottom", "center", "left", "right", "top")})
+_static("textAlign", {f"text-{v}": f"text-align:{v}" for v in ("left", "center", "right", "justify", "start", "end")})
+_static("verticalAlign", {f"align-{v}": f"vertical-align:{v}" for v in ("baseline", "top", "middle", "bottom", "text-top", "text-bottom")})
+_static("textTransform", {"uppercase": "text-transform:uppercase", "lowercase": "text-transform:lowercase", "capitalize": "text-transform:capitalize", "normal-case": "text-transform:none"})
+_static("fontStyle", {"italic": "font-style:italic", "not-italic": "font-style:normal"})
+_static("textDecoration", {
+    "underline": "text-decoration-line:underline", "overline": "text-decoration-line:overline",
+    "line-through": "text-decoration-line:line-through", "no-underline": "text-decoration-line:none",
+})
+_static("outline", {"outline-none": "outline:2px solid transparent;outline-offset:2px", "outline": "outline-style:solid"})
+_static("filter", {"filter": f"filter:{_FILTER}", "filter-none": "filter:none"})
+_static("backdropFilter", {"backdrop-filter": f"-webkit-backdrop-filter:{_BACKDROP};backdrop-filter:{_BACKDROP}", "backdrop-filter-none": "-webkit-backdrop-filter:none;backdrop-filter:none"})
+
+
+def _arbitrary(value: str) -> Optional[str]:
+    if len(value) > 2 and value[0] == "[" and value[-1] == "]":
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def _fraction(value: str) -> Optional[str]:
+    m = re.fullmatch(r"(\d+)/(\d+)", value)
+    if m and int(m.group(2)):
+        return f"{int(m.group(1)) / int(m.group(2)) * 100:g}%"
+    return None
+
+
+def _negate(value: str) -> str:
+    if value in ("0px", "0"):
+        return value
+    return f"calc({value} * -1)" if value.startswith(("calc", "var")) else f"-{value}"
+
+
+def _spacing(value: str, extra: Optional[Dict[str, str]] = None) -> Optional[str]:
+    return SPACING.get(value) or (extra or {}).get(value) or _arbitrary(value)
+
+
+def _hex_rgb(hexcode: str) -> Optional[Tuple[str, Optional[str]]]:
+    h = hexcode.lstrip("#")
+    if len(h) in (3, 4):
+        h = "".join(c * 2 for c in h)
+    if len(h) not in (6, 8) or not re.fullmatch(r"[0-9a-fA-F]+", h):
+        return None
+    rgb = " ".join(str(int(h[i:i + 2], 16)) for i in (0, 2, 4))
+    alpha = f"{int(h[6:8], 16) / 255:.3g}" if len(h) == 8 else None
+    return rgb, alpha
+
+
+def _color(value: str, prop: str, opacity_var: Optional[str]) -> Optional[List[str]]:
+    """Declarações de cor: 'gray-900', 'gray-900/80', '[#00A6FB]', 'white', 'current'..."""
+    alpha = None
+    if "/" in value and not value.startswith("["):
+        value, mod = value.rsplit("/", 1)
+        alpha = OPACITIES.get(mod) or _arbitrary(mod)
+        if alpha is None:
+            return None
+    if value in COLOR_KEYWORDS:
+        return [f"{prop}:{COLOR_KEYWORDS[value]}"]
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None:
+        if not arbitrary.startswith("#"):
+            if re.match(r"(rgba?|hsla?)\(", arbitrary):
+                return [f"{prop}:{arbitrary}"]
+            return None
+        parsed = _hex_rgb(arbitrary)
+    else:
+        parsed = _hex_rgb(COLORS[value]) if value in COLORS else None
+    if parsed is None:
+        return None
+    rgb, own_alpha = parsed
+    alpha = alpha or own_alpha
+    if alpha is not None:
+        return [f"{prop}:rgb({rgb} / {alpha})"]
+    if opacity_var is None:
+        return [f"{prop}:rgb({rgb})"]
+    return [f"{opacity_var}:1", f"{prop}:rgb({rgb} / var({opacity_var}))"]
+
+
+def _is_length(value: str) -> bool:
+    return bool(re.match(r"^-?[\d.]+(px|rem|em|%|vh|vw|ch|pt)$|^(calc|clamp|min|max)\(", value))
+
+
+_SIDES = {"t": ["top"], "r": ["right"], "b": ["bottom"], "l": ["left"], "x": ["left", "right"], "y": ["top", "bottom"]}
+_CORNERS = {
+    "t": ["top-left", "top-right"], "r": ["top-right", "bottom-right"], "b": ["bottom-right", "bottom-left"],
+    "l": ["top-left", "bottom-left"], "tl": ["top-left"], "tr": ["top-right"], "br": ["bottom-right"], "bl": ["bottom-left"],
+}
+
+
+def _functional(prefix: str, value: str, neg: bool) -> Optional[Tuple[str, List[str], str]]:
+    """(plugin, declarações, sufixo do seletor) para prefix-value, ou None se não for utilitário."""
+    def length(v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return None
+        return _negate(v) if neg else v
+
+    # Espaçamento (margem aceita negativos e auto)
+    if prefix in ("m", "mx", "my", "mt", "mr", "mb", "ml"):
+        v = length(_spacing(value, {"auto": "auto"}))
+        if v is None:
+            return None
+        plugin = {"m": "margin", "mx": "marginX", "my": "marginX"}.get(prefix, "marginSide")
+        sides = ["margin"] if prefix == "m" else [f"margin-{s}" for s in _SIDES[prefix[1]]]
+        return plugin, [f"{p}:{v}" for p in sides], ""
+    if prefix in ("p", "px", "py", "pt", "pr", "pb", "pl") and not neg:
+        v = _spacing(value)
+        if v is None:
+            return None
+        plugin = {"p": "padding", "px": "paddingX", "py": "paddingX"}.get(prefix, "paddingSide")
+        sides = ["padding"] if prefix == "p" else [f"padding-{s}" for s in _SIDES[prefix[1]]]
+        return plugin, [f"{p}:{v}" for p in sides], ""
+    if prefix in ("inset", "inset-x", "inset-y", "top", "right", "bottom", "left"):
+        v = length(_spacing(value, {"auto": "auto", "full": "100%"}) or _fraction(value))
+        if v is None:
+            return None
+        if prefix == "inset":
+            return "inset", [f"inset:{v}"], ""
+        if prefix.startswith("inset-"):
+            return "insetX", [f"{p}:{v}" for p in _SIDES[prefix[-1]]], ""
+        return "insetSide", [f"{prefix}:{v}"], ""
+    if prefix == "space-x" or prefix == "space-y":
+        v = length(_spacing(value))
+        if v is None:
+            return None
+        suffix = " > :not([hidden]) ~ :not([hidden])"
+        if prefix == "space-x":
+            decls = ["--tw-space-x-reverse:0", f"margin-right:calc({v} * var(--tw-space-x-reverse))",
+                     f"margin-left:calc({v} * calc(1 - var(--tw-space-x-reverse)))"]
+        else:
+            decls = ["--tw-space-y-reverse:0", f"margin-top:calc({v} * calc(1 - var(--tw-space-y-reverse)))",
+                     f"margin-bottom:calc({v} * var(--tw-space-y-reverse))"]
+        return "space", decls, suffix
+    if prefix in ("gap", "gap-x", "gap-y") and not neg:
+        v = _spacing(value)
+        if v is None:
+            return None
+        prop = {"gap": "gap", "gap-x": "column-gap", "gap-y": "row-gap"}[prefix]
+        return ("gap" if prefix == "gap" else "gapX"), [f"{prop}:{v}"], ""
+    if prefix == "z":
+        v = Z_INDEX.get(value) or _arbitrary(value)
+        return ("zIndex", [f"z-index:{'-' + v if neg else v}"], "") if v else None
+    if prefix == "order" and (value.isdigit() or value in ("first", "last", "none")):
+        return "order", [f"order:{ {'first': '-9999', 'last': '9999', 'none': '0'}.get(value, value) }"], ""
+    if neg:
+        if prefix in ("translate-x", "translate-y"):
+            pass
+        elif prefix == "rotate" and value in ROTATES:
+            return "rotate", ["--tw-rotate:-" + ROTATES[value], f"transform:{_TRANSFORM}"], ""
+        else:
+            return None
+
+    # Dimensões
+    sizes = {"auto": "auto", "full": "100%", "min": "min-content", "max": "max-content", "fit": "fit-content"}
+    if prefix == "w":
+        v = _spacing(value, dict(sizes, screen="100vw")) or _fraction(value)
+        return ("width", [f"width:{v}"], "") if v else None
+    if prefix == "h":
+        v = _spacing(value, dict(sizes, screen="100vh")) or _fraction(value)
+        return ("height", [f"height:{v}"], "") if v else None
+    if prefix == "min-w":
+        v = {"0": "0px", "full": "100%", "min": "min-content", "max": "max-content", "fit": "fit-content"}.get(value) or _arbitrary(value)
+        return ("minWidth", [f"min-width:{v}"], "") if v else None
+    if prefix == "min-h":
+        v = {"0": "0px", "full": "100%", "screen": "100vh", "min": "min-content", "max": "max-content", "fit": "fit-content"}.get(value) or _arbitrary(value)
+        return ("minHeight", [f"min-height:{v}"], "") if v else None
+    if prefix == "max-w":
+        v = MAX_WIDTHS.get(value) or _arbitrary(value)
+        return ("maxWidth", [f"max-width:{v}"], "") if v else None
+    if prefix == "max-h":
+        v = _spacing(value, {"none": "none", "full": "100%", "screen": "100vh", "min": "min-content", "max": "max-content", "fit": "fit-content"})
+        return ("maxHeight", [f"max-height:{v}"], "") if v else None
+    if prefix == "basis":
+        v = _spacing(value, {"auto": "auto", "full": "100%"}) or _fraction(value)
+        return ("flexBasis", [f"flex-basis:{v}"], "") if v else None
+
+    # Grid
+    if prefix == "grid-cols":
+        if value == "none":
+            return "gridTemplateColumns", ["grid-template-columns:none"], ""
+        if value.isdigit() and 1 <= int(value) <= 12:
+            return "gridTemplateColumns", [f"grid-template-columns:repeat({value}, minmax(0, 1fr))"], ""
+        v = _arbitrary(value)
+        return ("gridTemplateColumns", [f"grid-template-columns:{v}"], "") if v else None
+    if prefix == "grid-rows" and value.isdigit() and 1 <= int(value) <= 12:
+        return "gridTemplateRows", [f"grid-template-rows:repeat({value}, minmax(0, 1fr))"], ""
+    if prefix == "col-span":
+        if value == "full":
+            return "gridColumn", ["grid-column:1 / -1"], ""
+        if value.isdigit() and 1 <= int(value) <= 12:
+            return "gridColumn", [f"grid-column:span {value} / span {value}"], ""
+        return None
+
+    # Transformações
+    if prefix in ("translate-x", "translate-y"):
+        v = length(_spacing(value, {"full": "100%"}) or _fraction(value))
+        if v is None:
+            return None
+        return "translate", [f"--tw-{prefix}:{v}", f"transform:{_TRANSFORM}"], ""
+    if prefix in ("scale", "scale-x", "scale-y"):
+        v = SCALES.get(value) or _arbitrary(value)
+        if v is None:
+            return None
+        axes = ["x", "y"] if prefix == "scale" else [prefix[-1]]
+        return "scale", [f"--tw-scale-{a}:{v}" for a in axes] + [f"transform:{_TRANSFORM}"], ""
+    if prefix == "rotate":
+        v = ROTATES.get(value) or _arbitrary(value)
+        return ("rotate", [f"--tw-rotate:{v}", f"transform:{_TRANSFORM}"], "") if v else None
+
+    # Bordas
+    if prefix == "rounded" or prefix.startswith("rounded-"):
+        corner = prefix[len("rounded-"):] if prefix != "rounded" else ""
+        if corner and corner not in _CORNERS:
+            return None
+        v = RADII.get(value) or _arbitrary(value)
+        if v is None:
+            return None
+        if not corner:
+            return "borderRadius", [f"border-radius:{v}"], ""
+        plugin = "borderRadiusSide" if len(corner) == 1 else "borderRadiusCorner"
+        return plugin, [f"border-{c}-radius:{v}" for c in _CORNERS[corner]], ""
+    if prefix == "border" or prefix in ("border-t", "border-r", "border-b", "border-l", "border-x", "border-y"):
+        side = prefix[-1] if prefix != "border" else ""
+        v = BORDER_WIDTHS.get(value)
+        if v is None and _arbitrary(value) and _is_length(_arbitrary(value)):
+            v = _arbitrary(value)
+        if v is not None:
+            if not side:
+                return "borderWidth", [f"border-width:{v}"], ""
+            plugin = "borderWidthX" if side in "xy" else "borderWidthSide"
+            return plugin, [f"border-{s}-width:{v}" for s in _SIDES[side]], ""
+        if value == "DEFAULT":
+            return None
+        if not side:
+            decls = _color(value, "border-color", "--tw-border-opacity")
+            return ("borderColor", decls, "") if decls else None
+        decls = []
+        for s in _SIDES[side]:
+            decls += _color(value, f"border-{s}-color", "--tw-border-opacity") or []
+        return ("borderColorSide", list(dict.fromkeys(decls)), "") if decls else None
+    if prefix == "border-opacity":
+        v = OPACITIES.get(value)
+        return ("borderOpacity", [f"--tw-border-opacity:{v}"], "") if v else None
+
+    # Fundo, texto e cores
+    if prefix == "bg":
+        decls = _color(value, "background-color", "--tw-bg-opacity")
+        return ("backgroundColor", decls, "") if decls else None
+    if prefix == "bg-opacity":
+        v = OPACITIES.get(value) or _arbitrary(value)
+        return ("backgroundOpacity", [f"--tw-bg-opacity:{v}"], "") if v else None
+    if prefix == "text":
+        if value in FONT_SIZES:
+            size, leading = FONT_SIZES[value]
+            return "fontSize", [f"font-size:{size}", f"line-height:{leading}"], ""
+        arbitrary = _arbitrary(value)
+        if arbitrary is not None and _is_length(arbitrary):
+            return "fontSize", [f"font-size:{arbitrary}"], ""
+        decls = _color(value, "color", "--tw-text-opacity")
+        return ("textColor", decls, "") if decls else None
+    if prefix == "text-opacity":
+        v = OPACITIES.get(value)
+        return ("textOpacity", [f"--tw-text-opacity:{v}"], "") if v else None
+    if prefix == "placeholder":
+        decls = _color(value, "color", "--tw-placeholder-opacity")
+        return ("placeholderColor", decls, "::placeholder") if decls else None
+    if prefix == "font":
+        if value in FONT_WEIGHTS:
+            return "fontWeight", [f"font-weight:{FONT_WEIGHTS[value]}"], ""
+        if value in FONT_FAMILIES:
+            return "fontFamily", [f"font-family:{FONT_FAMILIES[value]}"], ""
+        return None
+    if prefix == "leading":
+        v = LINE_HEIGHTS.get(value) or _arbitrary(value)
+        return ("lineHeight", [f"line-height:{v}"], "") if v else None
+    if prefix == "tracking":
+        v = TRACKING.get(value) or _arbitrary(value)
+        return ("letterSpacing", [f"letter-spacing:{v}"], "") if v else None
+    if prefix == "opacity":
+        v = OPACITIES.get(value) or _arbitrary(value)
+        return ("opacity", [f"opacity:{v}"], "") if v else None
+
+    # Sombra, anel, filtros
+    if prefix == "shadow":
+        if value not in SHADOWS:
+            return None
+        shadow = SHADOWS[value]
+        colored = re.sub(r"rgb\(0 0 0 / [\d.]+\)", "var(--tw-shadow-color)", shadow)
+        return "boxShadow", [f"--tw-shadow:{shadow}", f"--tw-shadow-colored:{colored}", _SHADOW], ""
+    if prefix == "ring":
+        if value in RING_WIDTHS:
+            w = RING_WIDTHS[value]
+            return "ringWidth", [
+                "--tw-ring-offset-shadow:var(--tw-ring-inset) 0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color)",
+                f"--tw-ring-shadow:var(--tw-ring-inset) 0 0 0 calc({w} + var(--tw-ring-offset-width)) var(--tw-ring-color)",
+                "box-shadow:var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow, 0 0 #0000)",
+            ], ""
+        decls = _color(value, "--tw-ring-color", "--tw-ring-opacity")
+        return ("ringColor", decls, "") if decls else None
+    if prefix == "ring-opacity":
+        v = OPACITIES.get(value)
+        return ("ringOpacity", [f"--tw-ring-opacity:{v}"], "") if v else None
+    if prefix in ("blur", "backdrop-blur"):
+        v = BLURS.get(value)
+        if v is None:
+            return None
+        v = f"blur({v})" if v else " "
+        if prefix == "blur":
+            return "blur", [f"--tw-blur:{v}", f"filter:{_FILTER}"], ""
+        return "backdropBlur", [f"--tw-backdrop-blur:{v}", f"-webkit-backdrop-filter:{_BACKDROP}", f"backdrop-filter:{_BACKDROP}"], ""
+
+    # Transições
+    if prefix == "transition":
+        v = TRANSITIONS.get(value)
+        if v is None:
+            return None
+        decls = [f"transition-property:{v}"]
+        if value != "none":
+            decls += [f"transition-timing-function:{EASINGS['in-out']}", "transition-duration:150ms"]
+        return "transitionProperty", decls, ""
+    if prefix == "duration":
+        v = DURATIONS.get(value) or _arbitrary(value)
+        return ("transitionDuration", [f"transition-duration:{v}"], "") if v else None
+    if prefix == "ease":
+        v = EASINGS.get(value) or _arbitrary(value)
+        return ("transitionTimingFunction", [f"transition-timing-function:{v}"], "") if v else None
+    return None
+
+
+# Prefixos que aceitam a forma sem valor (border = border-DEFAULT, shadow, rounded...)
+_BARE = {"border", "border-t", "border-r", "border-b", "border-l", "border-x", "border-y", "rounded", "shadow",
+         "ring", "transition", "blur", "backdrop-blur"}
+_PREFIXES = sorted({
+    "m", "mx", "my", "mt", "mr", "mb", "ml", "p", "px", "py", "pt", "pr", "pb", "pl", "inset", "inset-x", "inset-y",
+    "top", "right", "bottom", "left", "space-x", "space-y", "gap", "gap-x", "gap-y", "z", "order", "w", "h",
+    "min-w", "min-h", "max-w", "max-h", "basis", "grid-cols", "grid-rows", "col-span", "translate-x",
+    "translate-y", "scale", "scale-x", "scale-y", "rotate", "border-opacity", "bg", "bg-opacity", "text",
+    "text-opacity", "placeholder", "font", "leading", "tracking", "opacity", "ring-opacity", "duration", "ease",
+    *_BARE, *(f"rounded-{c}" for c in _CORNERS),
+}, key=len, reverse=True)
+
+
+def utility(name: str) -> Optional[Tuple[str, List[str], str]]:
+    """Regra de um utilitário sem variantes: (plugin, declarações, sufixo do seletor)."""
+    if name in _STATIC:
+        plugin, decls = _STATIC[name]
+        return plugin, decls, ""
+    if name.endswith("-DEFAULT"):
+        return None
+    neg = name.startswith("-")
+    if neg:
+        name = name[1:]
+    if name in _BARE:
+        return _functional(name, "DEFAULT", neg)
+    for prefix in _PREFIXES:
+        if name.startswith(prefix + "-"):
+            found = _functional(prefix, name[len(prefix) + 1:], neg)
+            if found is not None:
+                return found
+    return None
+
+
+def _split_variants(candidate: str) -> List[str]:
+    """'md:hover:bg-[#fff]' -> ['md', 'hover', 'bg-[#fff]'] (':' dentro de [] não separa)."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(candidate):
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        elif ch == ":" and depth == 0:
+            parts.append(candidate[start:i])
+            start = i + 1
+    parts.append(candidate[start:])
+    return parts
+
+
+def escape_class(name: str) -> str:
+    return re.sub(r"([^A-Za-z0-9_\-\u00a0-\uffff])", r"\\\1", name)
+
+
+def compile_candidate(candidate: str):
+    """Regra de uma classe candidata, ou None se não for um utilitário: (chave de ordem, medias, css)."""
+    if candidate == "container":
+        return None  # emitido à parte (componente com media queries próprias)
+    *variants, name = _split_variants(candidate)
+    if any(v not in VARIANT_ORDER for v in variants) or len(set(variants)) != len(variants):
+        return None
+    found = utility(name)
+    if found is None:
+        return None
+    plugin, decls, suffix = found
+    selector = "." + escape_class(candidate)
+    elements = "".join(PSEUDO_ELEMENTS[v] for v in variants if v in PSEUDO_ELEMENTS)
+    classes = "".join(PSEUDO_CLASSES[v] for v in variants if v in PSEUDO_CLASSES)
+    groups = "".join(GROUP_VARIANTS[v] for v in variants if v in GROUP_VARIANTS)
+    if suffix == "::placeholder" and elements:
+        return None
+    selector = f"{groups}{selector}{elements}{classes}{suffix}"
+    media = tuple(MEDIA_VARIANTS[v] for v in sorted((v for v in variants if v in MEDIA_VARIANTS), key=VARIANT_ORDER.index))
+    mask = sum(1 << VARIANT_ORDER.index(v) for v in variants)
+    key = (mask, _PLUGIN_INDEX[plugin], candidate)
+    return key, media, f"{selector}{{{';'.join(decls)}}}"
+
+
+_CANDIDATE_RE = re.compile(r"[^\s\"'`<>=;{}(),]+")
+
+
+def extract_candidates(text: str) -> set:
+    """Tokens que podem ser classes (o extrator não entende HTML: varre o texto todo, como o do Tailwind)."""
+    return {tok.rstrip(".:") for tok in _CANDIDATE_RE.findall(text)} - {""}
+
+
+def container_css() -> str:
+    media = "".join(f"@media (min-width: {px}px){{.container{{max-width:{px}px}}}}" for px in SCREENS.values())
+    return ".container{width:100%}" + media
+
+
+def generate(candidates: Iterable[str], preflight: bool = True) -> str:
+    """CSS minificado (preflight + componentes + utilitários) para as classes usadas."""
+    rules = []
+    seen = set()
+    for candidate in candidates:
+        if candidate in seen:
+            continue
+        seen.add(candidate)
+        compiled = compile_candidate(candidate)
+        if compiled is not None:
+            rules.append(compiled)
+    rules.sort(key=lambda r: r[0])
+
+    out = [PREFLIGHT] if preflight else []
+    if "container" in seen:
+        out.append(container_css())
+    # Regras consecutivas com as mesmas media queries ficam num bloco só
+    current: Tuple[str, ...] = ()
+    block: List[str] = []
+
+    def flush():
+        if not block:
+            return
+        css = "".join(block)
+        for query in reversed(current):
+            css = f"@media {query}{{{css}}}"
+        out.append(css)
+        block.clear()
+
+    for _, media, css in rules:
+        if media != current:
+            flush()
+            current = media
+        block.append(css)
+    flush()
+    return "".join(out)
+
+
+def classes_used(candidates: Sequence[str]) -> List[str]:
+    """Candidatos que geram alguma regra (para relatórios)."""
+    return sorted(c for c in set(candidates) if c == "container" or compile_candidate(c) is not None)
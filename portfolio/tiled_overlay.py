@@ -0,0 +1,250 @@
+"""
+Motor de overlay em padrão repetido (usado por watermark_tiled.py).
+
+Em vez de compor o tile milhares de vezes num canvas do tamanho da diagonal,
+monta uma única "célula" periódica do padrão, replica-a em bloco (np.tile,
+ou faixas coladas com Pillow quando NumPy não está instalado) apenas na região
+que a rotação realmente amostra, e aplica a mesma transformação afim que
+Image.rotate + crop aplicariam. Overlays prontos ficam num cache LRU.
+"""
+import math
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+from PIL import Image
+
+from profiling import stage
+
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+
+# Margem extra (px) ao redor da região amostrada: o filtro bicúbico lê 2 px de vizinhança.
+_SAMPLE_MARGIN = 4
+
+
+def build_pattern_cell(text_tile: Image.Image, step_x: int, step_y: int) -> Image.Image:
+    """
+    Retorna a célula step_x x step_y que se repete no padrão, já com as
+    sobreposições entre tiles vizinhos (spacing < 1) compostas na mesma ordem
+    do laço original (linhas de cima para baixo, colunas da esquerda para a direita).
+    Cada tile é composto direto na célula, só na parte que cai dentro dela.
+    """
+    tw, th = text_tile.size
+    nx = math.ceil(tw / step_x) + 1
+    ny = math.ceil(th / step_y) + 1
+    # A célula é o recorte (x0, y0) da grade nx x ny de tiles.
+    x0 = (nx - 1) * step_x
+    y0 = (ny - 1) * step_y
+    cell = Image.new("RGBA", (step_x, step_y), (0, 0, 0, 0))
+    for j in range(ny):
+        for i in range(nx):
+            dx, dy = i * step_x - x0, j * step_y - y0
+            sx0, sy0 = max(0, -dx), max(0, -dy)
+            sx1, sy1 = min(tw, step_x - dx), min(th, step_y - dy)
+            if sx0 < sx1 and sy0 < sy1:
+                cell.alpha_composite(text_tile, (dx + sx0, dy + sy0), (sx0, sy0, sx1, sy1))
+    return cell
+
+
+def _cell_span(phase: int, n: int, size: int):
+    """
+    Trechos [início, fim) da célula (eixo de tamanho size) que cobrem n pixels a
+    partir de phase, e o índice de cada pixel de saída dentro dos trechos colados.
+    """
+    if n >= size:
+        return [(0, size)], (np.arange(n) + phase) % size
+    if phase + n <= size:
+        return [(phase, phase + n)], None
+    return [(phase, size), (0, phase + n - size)], None
+
+
+def tile_pattern(cell: Image.Image, width: int, height: int, phase: Tuple[int, int]) -> Image.Image:
+    """
+    Preenche width x height com a célula repetida; o pixel (0, 0) corresponde
+    ao pixel `phase` da célula. Só o retângulo pedido é montado, a partir dos
+    trechos da célula que ele usa (a célula pode ser bem maior que um recorte
+    do modo em faixas).
+    """
+    sx, sy = cell.size
+    px, py = phase[0] % sx, phase[1] % sy
+
+    if np is not None:
+        row_spans, rows = _cell_span(py, height, sy)
+        col_spans, cols = _cell_span(px, width, sx)
+        arr = np.concatenate([
+            np.concatenate([np.asarray(cell.crop((x0, y0, x1, y1))) for x0, x1 in col_spans], axis=1)
+            for y0, y1 in row_spans
+        ])
+        if rows is not None:
+            arr = arr[rows]
+        if cols is not None:
+            arr = arr[:, cols]
+        return Image.fromarray(np.ascontiguousarray(arr), "RGBA")
+
+    # Sem NumPy: cola a célula em cada posição que cruza o retângulo (paste recorta o excesso).
+    out = Image.new("RGBA", (width, height))
+    for y in range(-py, height, sy):
+        for x in range(-px, width, sx):
+            out.paste(cell, (x, y))
+    return out
+
+
+def rotation_matrix(angle_deg: float, center: Tuple[float, float]) -> list:
+    """Mesma matriz reversa que Image.rotate calcula (sem translate/expand)."""
+    angle = -math.radians(angle_deg)
+    a = round(math.cos(angle), 15)
+    b = round(math.sin(angle), 15)
+    d = round(-math.sin(angle), 15)
+    e = round(math.cos(angle), 15)
+    cx, cy = center
+    c = a * -cx + b * -cy + cx
+    f = d * -cx + e * -cy + cy
+    return [a, b, c, d, e, f]
+
+
+class TiledPattern:
+    """
+    Padrão repetido já rotacionado, pronto para ser renderizado por inteiro ou
+    em recortes (box) — o modo em faixas usa recortes pequenos para manter a
+    memória limitada.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        text_tile: Image.Image,
+        spacing_scale: float = 1.0,
+        angle_deg: float = 30.0,
+        offset: Tuple[int, int] = (0, 0),
+    ):
+        tw, th = text_tile.size
+        diag = int(math.hypot(width, height))
+        self.canvas = diag + max(tw, th) * 2
+        self.width = width
+        self.height = height
+        self.angle_deg = angle_deg
+
+        step_x = max(1, int(tw * spacing_scale))
+        step_y = max(1, int(th * spacing_scale))
+        self.start = (-tw + offset[0], -th + offset[1])
+        self.cell = build_pattern_cell(text_tile, step_x, step_y)
+        self.cell_bytes = step_x * step_y * 4
+        self.left = (self.canvas - width) // 2
+        self.top = (self.canvas - height) // 2
+
+        angle = angle_deg % 360.0
+        self.exact = angle % 90.0 == 0.0
+        a, b, c, d, e, f = rotation_matrix(angle, (self.canvas / 2, self.canvas / 2))
+        # Traz o recorte central para a origem: saída (x, y) == rotacionado (x + left, y + top).
+        c += a * self.left + b * self.top
+        f += d * self.left + e * self.top
+        self.matrix = (a, b, c, d, e, f)
+
+    def render(self, box: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+        """Overlay RGBA da região box=(x0, y0, x1, y1) da imagem (default: imagem inteira)."""
+        bx0, by0, bx1, by1 = box if box is not None else (0, 0, self.width, self.height)
+        bw, bh = bx1 - bx0, by1 - by0
+        start_x, start_y = self.start
+
+        if self.exact:
+            # Rotações exatas são transposições: basta o canvas completo (raro na prática).
+            with stage("overlay"):
+                big = tile_pattern(self.cell, self.canvas, self.canvas, (-start_x, -start_y))
+            with stage("rotate"):
+                rotated = big.rotate(self.angle_deg, resample=Image.BICUBIC, expand=False)
+            return rotated.crop((self.left + bx0, self.top + by0, self.left + bx1, self.top + by1))
+
+        a, b, c, d, e, f = self.matrix
+        if box is not None:
+            c += a * bx0 + b * by0
+            f += d * bx0 + e * by0
+
+        # Caixa (no canvas) efetivamente amostrada pelos cantos da saída.
+        xs, ys = [], []
+        for x, y in ((0, 0), (bw, 0), (0, bh), (bw, bh)):
+            xs.append(a * x + b * y + c)
+            ys.append(d * x + e * y + f)
+        x0 = max(0, math.floor(min(xs)) - _SAMPLE_MARGIN)
+        y0 = max(0, math.floor(min(ys)) - _SAMPLE_MARGIN)
+        x1 = min(self.canvas, math.ceil(max(xs)) + _SAMPLE_MARGIN)
+        y1 = min(self.canvas, math.ceil(max(ys)) + _SAMPLE_MARGIN)
+
+        with stage("overlay"):
+            region = tile_pattern(self.cell, x1 - x0, y1 - y0, (x0 - start_x, y0 - start_y))
+        with stage("rotate"):
+            return region.transform(
+                (bw, bh),
+                Image.AFFINE,
+                (a, b, c - x0, d, e, f - y0),
+                resample=Image.BICUBIC,
+            )
+
+
+def render_tiled_overlay(
+    width: int,
+    height: int,
+    text_tile: Image.Image,
+    spacing_scale: float = 1.0,
+    angle_deg: float = 30.0,
+    offset: Tuple[int, int] = (0, 0),
+) -> Image.Image:
+    """
+    Equivalente a make_tiled_overlay, mas sem o laço de composições e sem
+    materializar nem rotacionar o canvas inteiro da diagonal.
+    """
+    return TiledPattern(width, height, text_tile, spacing_scale, angle_deg, offset).render()
+
+
+class OverlayCache:
+    """
+    Cache LRU de overlays prontos. Limitado por número de entradas e por bytes
+    (um overlay RGBA ocupa largura * altura * 4 bytes).
+    """
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._bytes = 0
+
+    @staticmethod
+    def _size_of(im: Image.Image) -> int:
+        return im.width * im.height * len(im.getbands())
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        im = self._items.get(key)
+        if im is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return im
+
+    def put(self, key: Hashable, im: Image.Image) -> None:
+        size = self._size_of(im)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        if key in self._items:
+            self._bytes -= self._size_of(self._items.pop(key))
+        self._items[key] = im
+        self._bytes += size
+        while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+            _, old = self._items.popitem(last=False)
+            self._bytes -= self._size_of(old)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Cache por processo (cada worker do --jobs mantém o seu).
+OVERLAY_CACHE = OverlayCache()
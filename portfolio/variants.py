@@ -0,0 +1,133 @@
+"""
+Variantes de saída por idioma (--variants), geradas de uma única decodificação.
+
+O site sai em PT, EN e ES e cada idioma tem a sua marca/licença. Em vez de
+rodar a ferramenta três vezes (relendo e decodificando cada figura), o arquivo
+de variantes lista os conjuntos texto/licença/autor/sufixo e cada fonte é
+decodificada e convertida para RGBA uma vez só. Variantes com a mesma marca
+(mesmo texto e geometria) compartilham o overlay e a composição; só a
+gravação (e os metadados) é feita por variante.
+
+    [
+      {"suffix": "pt", "text": "© 2025 Felipe Alberto Lei | Logik Bioinfo", "license": "Todos os direitos reservados."},
+      {"suffix": "en", "text": "© 2025 Felipe Alberto Lei | Logik Bioinfo", "license": "All rights reserved."},
+      {"suffix": "es", "text": "© 2025 Felipe Alberto Lei | Logik Bioinfo", "license": "Todos los derechos reservados."}
+    ]
+
+Campos ausentes herdam --text/--author/--url/--license. Saídas:
+<stem>_wm_<sufixo>.<ext>. O watermark_tiled não grava metadados, então lá
+cada variante precisa de um texto próprio (require_distinct).
+"""
+import json
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+_SUFFIX_RE = re.compile(r"^[A-Za-z0-9-]+$")
+
+
+@dataclass(frozen=True)
+class Variant:
+    suffix: str  # "" = saída sem sufixo (execução sem --variants)
+    text: str
+    author: Optional[str] = None
+    url: Optional[str] = None
+    license: Optional[str] = None
+
+
+def load_variants(
+    path: Path,
+    text: str,
+    author: Optional[str] = None,
+    url: Optional[str] = None,
+    license_text: Optional[str] = None,
+) -> List[Variant]:
+    """Lê o JSON de variantes (lista ou {"variants": [...]}); levanta ValueError se inválido."""
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get("variants")
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"{path}: esperado uma lista não vazia de variantes")
+
+    variants = []
+    seen = set()
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise ValueError(f"{path}: variante {i}: esperado um objeto, veio {type(item).__name__}")
+        suffix = str(item.get("suffix", ""))
+        if not _SUFFIX_RE.match(suffix):
+            raise ValueError(f"{path}: sufixo inválido: {suffix!r} (use letras, números e '-')")
+        if suffix in seen:
+            raise ValueError(f"{path}: sufixo repetido: {suffix}")
+        seen.add(suffix)
+        variants.append(Variant(
+            suffix=suffix,
+            text=item.get("text", text),
+            author=item.get("author", author),
+            url=item.get("url", url),
+            license=item.get("license", license_text),
+        ))
+    return variants
+
+
+def require_distinct(variants: List[Variant], path: Path, fields: Tuple[str, ...]) -> None:
+    """
+    Levanta ValueError se duas variantes só diferem em campos que a ferramenta
+    não grava (ex.: watermark_tiled não escreve metadados, então variantes com
+    o mesmo texto sairiam byte a byte iguais).
+    """
+    seen: Dict[Tuple, str] = {}
+    for v in variants:
+        key = tuple(getattr(v, f) for f in fields)
+        if key in seen:
+            raise ValueError(
+                f"{path}: variantes '{seen[key]}' e '{v.suffix}' gerariam saídas idênticas "
+                f"(a saída só depende de: {', '.join(fields)})"
+            )
+        seen[key] = v.suffix
+
+
+def single_variant(
+    text: str, author: Optional[str] = None, url: Optional[str] = None, license_text: Optional[str] = None
+) -> List[Variant]:
+    """Execução sem --variants: uma saída, sem sufixo."""
+    return [Variant("", text, author, url, license_text)]
+
+
+def output_stem(stem: str, suffix: str) -> str:
+    return f"{stem}_wm_{suffix}" if suffix else f"{stem}_wm"
+
+
+def is_output_stem(stem: str, variants: Optional[List[Variant]] = None) -> bool:
+    """
+    Evita reprocessar as saídas quando --outdir é a própria pasta de entrada:
+    <stem>_wm ou <stem>_wm_<sufixo> de uma das variantes configuradas (uma
+    fonte como fig_wm_2024 continua sendo fonte).
+    """
+    suffixes = {""} | {v.suffix for v in variants or ()}
+    return any(stem.endswith(output_stem("", s)) for s in suffixes)
+
+
+def group_by_watermark(variants: List[Variant], wm_kwargs: Dict) -> List[Tuple[Dict, List[Variant]]]:
+    """
+    Agrupa as variantes cuja marca é idêntica (só os metadados mudam): cada
+    grupo é composto uma vez e gravado uma vez por variante.
+    """
+    groups: Dict[str, Tuple[Dict, List[Variant]]] = {}
+    for v in variants:
+        groups.setdefault(v.text, (dict(wm_kwargs, text=v.text), []))[1].append(v)
+    return list(groups.values())
+
+
+def variants_params(variants: List[Variant]) -> List[Dict]:
+    """Representação das variantes para os parâmetros do manifesto."""
+    return [asdict(v) for v in variants]
+
+
+def add_variants_args(parser) -> None:
+    parser.add_argument(
+        "--variants",
+        help="JSON com as variantes (sufixo/texto/licença/autor); decodifica cada fonte uma vez e grava todas.",
+    )
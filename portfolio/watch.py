@@ -0,0 +1,160 @@
+"""
+Modo --watch: observa as pastas de entrada e reprocessa o que mudou.
+
+No Linux usa inotify (via ctypes, sem dependências extras); nos demais
+sistemas, ou se o inotify não estiver disponível, compara (tamanho, mtime)
+dos arquivos a cada poucos centésimos de segundo. Rajadas de escrita (um
+programa gravando o PNG em vários passos, editor que salva via renomeação)
+são agrupadas: o lote só é disparado depois de `debounce` segundos sem
+eventos novos. O reprocessamento em si fica a cargo da ferramenta, que usa o
+manifesto de build para refazer apenas as saídas desatualizadas.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Eventos que indicam um arquivo completo: gravação encerrada ou renomeado para a pasta
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+DEFAULT_DEBOUNCE = 0.3
+POLL_INTERVAL = 0.25
+
+
+class InotifyWatcher:
+    kind = "inotify"
+
+    def __init__(self, dirs: Sequence[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.fd = fd
+        self.dirs: Dict[int, Path] = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(fd, os.fsencode(d), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(err, f"inotify_add_watch falhou: {d}")
+            self.dirs[wd] = Path(d)
+
+    def wait(self, timeout: float) -> List[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name and wd in self.dirs:
+                changed.append(self.dirs[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    kind = "polling"
+
+    def __init__(self, dirs: Sequence[Path], interval: float = POLL_INTERVAL):
+        self.dirs = [Path(d) for d in dirs]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snap = {}
+        for d in self.dirs:
+            try:
+                entries = list(os.scandir(d))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        st = entry.stat()
+                        snap[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+        return snap
+
+    def wait(self, timeout: float) -> List[Path]:
+        time.sleep(min(timeout, self.interval))
+        snap = self._scan()
+        changed = [p for p, sig in snap.items() if self._snapshot.get(p) != sig]
+        self._snapshot = snap
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(dirs: Sequence[Path], polling: bool = False):
+    """inotify no Linux (salvo --poll); polling como alternativa."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(dirs)
+        except (OSError, AttributeError) as e:
+            print(f"AVISO: inotify indisponível ({e}); usando polling.")
+    return PollingWatcher(dirs)
+
+
+def watch(
+    dirs: Sequence[Path],
+    on_change: Callable[[List[Path]], None],
+    accept: Callable[[Path], bool],
+    debounce: float = DEFAULT_DEBOUNCE,
+    polling: bool = False,
+) -> None:
+    """
+    Chama on_change(arquivos alterados) a cada lote, até Ctrl+C. accept(path)
+    filtra os eventos relevantes (extensão, saídas da própria ferramenta...).
+    """
+    dirs = [Path(d).resolve() for d in dirs]
+    watcher = open_watcher(dirs, polling)
+    print(f"Observando {', '.join(str(d) for d in dirs)} ({watcher.kind}). Ctrl+C para sair.")
+    pending = set()
+    last_event = 0.0
+    try:
+        while True:
+            changed = [p for p in watcher.wait(debounce if pending else 1.0) if accept(p)]
+            now = time.monotonic()
+            if changed:
+                pending.update(changed)
+                last_event = now
+                continue
+            if pending and now - last_event >= debounce:
+                batch = sorted(p for p in pending if p.exists())
+                pending.clear()
+                if not batch:
+                    continue
+                print(f"Alterado(s): {', '.join(p.name for p in batch)}")
+                try:
+                    on_change(batch)
+                except Exception as e:  # o daemon continua no próximo lote
+                    print(f"ERRO: {e}")
+    except KeyboardInterrupt:
+        print("Encerrado.")
+    finally:
+        watcher.close()
+
+
+def add_watch_args(parser) -> None:
+    parser.add_argument("--watch", action="store_true", help="Continua rodando e reprocessa as entradas alteradas.")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="Espera (s) sem novos eventos antes de reprocessar (default: 0.3).")
+    parser.add_argument("--poll", action="store_true", help="Força o modo polling em vez do inotify.")
@@ -1,9 +1,30 @@
 import argparse
+import io
+import math
+import tempfile
+from functools import partial
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
+from typing import BinaryIO, Iterable, List, Optional, Tuple
 
 from PIL import Image, ImageDraw, ImageFont, PngImagePlugin
 
+import fonts
+from assets import AssetStore, add_dedup_args, replicate_duplicates
+from banded import band_rows_for_budget, composite_banded, report_peak_rss
+from batch import FileResult, file_size, persistent_pool, run_batch
+from decode import add_size_args, load_scaled
+from encoders import DEFAULT_ENCODER, add_encoder_args, save_image
+from invisible_mark import add_invisible_args, embed, invisible_from_args, invisible_params
+from manifest import BuildManifest
+from placeholders import PlaceholderCache, add_placeholder_args, placeholder_info, placeholders_from_args, record_placeholders
+from metadata_patch import metadata_fields, patch_file
+from profiling import StatsCollector, add_profile_args, file_stats, finish_report, record_file, stage
+from shard import Shard, ShardReport, add_shard_args, parse_shard, report_path
+from staged import add_staged_args, run_staged
+from tiled_overlay import rotation_matrix
+from variants import Variant, add_variants_args, group_by_watermark, is_output_stem, load_variants, output_stem, single_variant, variants_params
+from watch import add_watch_args, watch
+
 # piexif é usado para EXIF em JPEG/TIFF; não se aplica a PNG.
 try:
     import piexif
@@ -12,20 +33,12 @@ except Exception:
 
 
 SUPPORTED_EXTS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+METADATA_EXTS = {".png", ".jpg", ".jpeg"}  # --metadata-only
 
 
 def load_font(font_path: Optional[str], base_size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    if font_path:
-        try:
-            return ImageFont.truetype(font_path, base_size)
-        except Exception:
-            pass
-    # Fallback
-    try:
-        # Tenta uma fonte comum do Windows
-        return ImageFont.truetype("C:\\Windows\\Fonts\\arial.ttf", base_size)
-    except Exception:
-        return ImageFont.load_default()
+    # Resolução de fonte com cache (ver fonts.py); fallback para a default bitmap
+    return fonts.load_font(font_path, base_size)
 
 
 def add_visible_watermark(
@@ -43,57 +56,173 @@ def add_visible_watermark(
       - opacity: 0..1
       - scale: fração da largura para definir o tamanho da fonte (~0.06 = 6% da largura)
     """
-    if im.mode != "RGBA":
-        base = im.convert("RGBA")
-    else:
-        base = im.copy()
+    with stage("rgba"):
+        if im.mode != "RGBA":
+            base = im.convert("RGBA")
+        else:
+            base = im.copy()
 
     W, H = base.size
-    font_size = max(14, int(W * scale))
-    font = load_font(font_path, font_size)
-
-    # Camada de watermark
-    overlay = Image.new("RGBA", (W, H), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-
-    # Cor branca com alpha conforme opacidade
-    fill = (255, 255, 255, int(255 * max(0.0, min(1.0, opacity))))
-
-    if mode == "corner":
-        # Tamanho do texto
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        tw = text_bbox[2] - text_bbox[0]
-        th = text_bbox[3] - text_bbox[1]
-        x = W - tw - margin
-        y = H - th - margin
-
-        # Sombra sutil (preta transparente) + texto
-        shadow_fill = (0, 0, 0, int(255 * opacity * 0.8))
-        draw.text((x + 2, y + 2), text, font=font, fill=shadow_fill)
-        draw.text((x, y), text, font=font, fill=fill)
-
-    else:
-        # "diagonal": renderiza em uma camada separada e gira
-        tmp = Image.new("RGBA", (W, H), (0, 0, 0, 0))
-        tmp_draw = ImageDraw.Draw(tmp)
+    font = load_font(font_path, max(14, int(W * scale)))
 
-        # Texto no centro
-        text_bbox = tmp_draw.textbbox((0, 0), text, font=font)
-        tw = text_bbox[2] - text_bbox[0]
-        th = text_bbox[3] - text_bbox[1]
-        center = (W // 2 - tw // 2, H // 2 - th // 2)
+    # Só as regiões que o texto ocupa (girado, na diagonal) são desenhadas e
+    # compostas; o restante do overlay seria transparente e não altera a imagem.
+    with stage("overlay"):
+        overlay = VisibleOverlay(W, H, text, mode, opacity, font, margin)
+    for box in overlay.regions():
+        with stage("overlay"):
+            region = overlay.render(box)
+        with stage("composite"):
+            base.alpha_composite(region, dest=box[:2])
+    return base
 
-        # Sombra leve
-        shadow_fill = (0, 0, 0, int(255 * opacity * 0.6))
-        tmp_draw.text((center[0] + 3, center[1] + 3), text, font=font, fill=shadow_fill)
-        tmp_draw.text(center, text, font=font, fill=fill)
 
-        # Rotaciona ~30 graus
-        tmp = tmp.rotate(30, resample=Image.BICUBIC, expand=False)
-        overlay = Image.alpha_composite(overlay, tmp)
+class VisibleOverlay:
+    """
+    Camada da marca visível ("diagonal" ou "corner") renderizável por recortes
+    (box): o texto é desenhado numa camada pequena e a rotação da diagonal é
+    aplicada só sobre a região pedida. add_visible_watermark renderiza apenas
+    bbox(); o modo em faixas, os recortes de cada faixa.
+    """
 
-    watermarked = Image.alpha_composite(base, overlay)
-    return watermarked
+    # Folga (px) ao redor do texto: cobre a sombra e a vizinhança do filtro bicúbico.
+    PAD = 4
+
+    def __init__(self, width: int, height: int, text: str, mode: str, opacity: float, font, margin: int = 24):
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.text = text
+        self.font = font
+        self.fill = (255, 255, 255, int(255 * max(0.0, min(1.0, opacity))))
+
+        measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        l, t, r, b = measure.textbbox((0, 0), text, font=font)
+        tw, th = r - l, b - t
+        if mode == "corner":
+            self.pos = (width - tw - margin, height - th - margin)
+            self.shadow = ((2, 2), (0, 0, 0, int(255 * opacity * 0.8)))
+        else:
+            self.pos = (width // 2 - tw // 2, height // 2 - th // 2)
+            self.shadow = ((3, 3), (0, 0, 0, int(255 * opacity * 0.6)))
+
+        # Camada com o texto, recortada aos limites da imagem como no desenho em tamanho cheio
+        dx, dy = self.shadow[0]
+        x0 = max(0, self.pos[0] + l - self.PAD)
+        y0 = max(0, self.pos[1] + t - self.PAD)
+        x1 = min(width, self.pos[0] + r + dx + self.PAD)
+        y1 = min(height, self.pos[1] + b + dy + self.PAD)
+        self.layer_origin = (x0, y0)
+        self.layer = Image.new("RGBA", (max(1, x1 - x0), max(1, y1 - y0)), (0, 0, 0, 0))
+        self._draw_text(self.layer, self.layer_origin)
+        self._premultiplied = None
+        if mode != "corner":
+            self.matrix = rotation_matrix(30, (width / 2, height / 2))
+
+    # Largura das colunas em que a diagonal é dividida: cada coluna só cobre a
+    # faixa vertical que o texto girado atravessa naquela coluna.
+    REGION_COLS = 256
+
+    def _corners(self):
+        """Cantos da camada de texto levados à imagem final (inversa da matriz de rotação)."""
+        x0, y0 = self.layer_origin
+        x1, y1 = x0 + self.layer.width, y0 + self.layer.height
+        if self.mode == "corner":
+            return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+        a, b, c, d, e, f = self.matrix
+        det = a * e - b * d
+        out = []
+        for x, y in ((x0, y0), (x1, y0), (x1, y1), (x0, y1)):
+            x, y = x - c, y - f
+            out.append(((e * x - b * y) / det, (a * y - d * x) / det))
+        return out
+
+    def regions(self) -> List[Tuple[int, int, int, int]]:
+        """
+        Caixas da imagem que a marca pode alterar (fora delas o overlay é
+        transparente): a caixa do texto no canto; na diagonal, colunas de
+        REGION_COLS px recortadas ao paralelogramo do texto girado.
+        """
+        if self.mode == "corner":
+            x0, y0 = self.layer_origin
+            return [(x0, y0, x0 + self.layer.width, y0 + self.layer.height)]
+
+        quad = self._corners()
+        pad = self.PAD
+        left = max(0, math.floor(min(x for x, _ in quad)) - pad)
+        right = min(self.width, math.ceil(max(x for x, _ in quad)) + pad)
+        boxes = []
+        for cx0 in range(left, right, self.REGION_COLS):
+            cx1 = min(right, cx0 + self.REGION_COLS)
+            # Trecho do paralelogramo entre x = cx0 - pad e x = cx1 + pad
+            lo, hi = cx0 - pad, cx1 + pad
+            ys = [y for x, y in quad if lo <= x <= hi]
+            for (px, py), (qx, qy) in zip(quad, quad[1:] + quad[:1]):
+                for xv in (lo, hi):
+                    if (px - xv) * (qx - xv) < 0:
+                        ys.append(py + (qy - py) * (xv - px) / (qx - px))
+            if not ys:
+                continue
+            top = max(0, math.floor(min(ys)) - pad)
+            bottom = min(self.height, math.ceil(max(ys)) + pad)
+            if bottom > top:
+                boxes.append((cx0, top, cx1, bottom))
+        return boxes
+
+    def _draw_text(self, canvas: Image.Image, origin: Tuple[int, int]) -> None:
+        draw = ImageDraw.Draw(canvas)
+        (dx, dy), shadow_fill = self.shadow
+        x, y = self.pos[0] - origin[0], self.pos[1] - origin[1]
+        draw.text((x + dx, y + dy), self.text, font=self.font, fill=shadow_fill)
+        draw.text((x, y), self.text, font=self.font, fill=self.fill)
+
+    def render(self, box: Tuple[int, int, int, int]) -> Image.Image:
+        bx0, by0, bx1, by1 = box
+        size = (bx1 - bx0, by1 - by0)
+        if self.mode == "corner":
+            if (bx0, by0) == self.layer_origin and size == self.layer.size:
+                return self.layer  # a própria caixa do texto, já desenhada
+            canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+            self._draw_text(canvas, (bx0, by0))
+            return canvas
+
+        a, b, c, d, e, f = self.matrix
+        ox, oy = self.layer_origin
+        # O Pillow gira RGBA em alpha pré-multiplicado (RGBa), convertendo a
+        # camada inteira a cada chamada; a conversão é feita uma vez só.
+        if self._premultiplied is None:
+            self._premultiplied = self.layer.convert("RGBa")
+        rotated = self._premultiplied.transform(
+            size,
+            Image.AFFINE,
+            (a, b, c + a * bx0 + b * by0 - ox, d, e, f + d * bx0 + e * by0 - oy),
+            resample=Image.BICUBIC,
+        ).convert("RGBA")
+        return Image.alpha_composite(Image.new("RGBA", size, (0, 0, 0, 0)), rotated)
+
+
+def add_visible_watermark_banded(
+    im: Image.Image,
+    out_path: Path,
+    band_rows: int,
+    text: str,
+    mode: str = "diagonal",
+    opacity: float = 0.2,
+    scale: float = 0.06,
+    margin: int = 24,
+    font_path: Optional[str] = None,
+    metadata: Optional[dict] = None,
+    encoder: Optional[str] = None,
+) -> None:
+    """
+    Mesma marca de add_visible_watermark, composta e gravada (PNG com tEXt) em
+    faixas de band_rows linhas, sem cópia RGBA nem overlay em tamanho cheio.
+    """
+    W, H = im.size
+    font = load_font(font_path, max(14, int(W * scale)))
+    with stage("overlay"):
+        overlay = VisibleOverlay(W, H, text, mode, opacity, font, margin)
+    composite_banded(im, out_path, overlay.render, band_rows, text=metadata, encoder=encoder)
 
 
 def save_with_metadata(
@@ -104,12 +233,16 @@ def save_with_metadata(
     url: Optional[str],
     license_text: Optional[str],
     source_ext: str,
+    encoder: str = DEFAULT_ENCODER,
+    fp: Optional[BinaryIO] = None,
 ):
     """
     Salva a imagem com metadados:
       - PNG: tEXt chunks (Copyright, Author, URL, License)
       - JPEG: EXIF Artist/ Copyright (via piexif)
       - TIFF: converte para PNG (com tEXt) por compatibilidade com web
+    A compressão segue o perfil `encoder` (ver encoders.py). Com fp a imagem é
+    codificada nesse buffer em vez de gravada (modo --staged).
     """
     out_ext = out_path.suffix.lower()
 
@@ -125,11 +258,10 @@ def save_with_metadata(
             pnginfo.add_text("License", license_text)
 
         # Para PNG, manter RGBA
-        img.save(out_path.as_posix(), pnginfo=pnginfo, optimize=True)
+        with stage("encode"):
+            save_image(img, out_path, encoder, pnginfo=pnginfo, fp=fp)
 
     elif out_ext in {".jpg", ".jpeg"}:
-        # JPEG não tem alpha
-        rgb = img.convert("RGB")
         exif_bytes = None
         if piexif is not None:
             exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
@@ -141,10 +273,12 @@ def save_with_metadata(
             if author:
                 exif_dict["0th"][piexif.ImageIFD.XPAuthor] = author.encode("utf-16le")
             exif_bytes = piexif.dump(exif_dict)
-        if exif_bytes:
-            rgb.save(out_path.as_posix(), quality=90, subsampling=2, exif=exif_bytes, optimize=True)
-        else:
-            rgb.save(out_path.as_posix(), quality=90, subsampling=2, optimize=True)
+        with stage("encode"):
+            # JPEG não tem alpha: save_image converte para RGB
+            if exif_bytes:
+                save_image(img, out_path, encoder, exif=exif_bytes, fp=fp)
+            else:
+                save_image(img, out_path, encoder, fp=fp)
 
     elif out_ext in {".tif", ".tiff"}:
         # Para web e metadados simples, melhor converter TIFF -> PNG
@@ -158,11 +292,113 @@ def save_with_metadata(
             pnginfo.add_text("URL", url)
         if license_text:
             pnginfo.add_text("License", license_text)
-        img.save(out_png.as_posix(), pnginfo=pnginfo, optimize=True)
+        with stage("encode"):
+            save_image(img, out_png, encoder, pnginfo=pnginfo, fp=fp)
     else:
         # Fallback: salva como PNG
         out_png = out_path.with_suffix(".png")
-        img.save(out_png.as_posix(), optimize=True)
+        with stage("encode"):
+            save_image(img, out_png, encoder, fp=fp)
+
+
+def output_path_for(src: Path, out_dir: Path, keep_ext: bool, banded: bool = False, suffix: str = "") -> Path:
+    """Define a extensão de saída: original com --keep-ext (PNG/JPEG), senão PNG; suffix = variante."""
+    if keep_ext and not banded and src.suffix.lower() in {".png", ".jpg", ".jpeg"}:
+        return (out_dir / output_stem(src.stem, suffix)).with_suffix(src.suffix.lower())
+    # Normaliza para PNG
+    return (out_dir / output_stem(src.stem, suffix)).with_suffix(".png")
+
+
+def watermark_file(
+    src: Path,
+    out_dir: Path,
+    keep_ext: bool,
+    wm_kwargs: dict,
+    author: Optional[str],
+    url: Optional[str],
+    license_text: Optional[str],
+    max_memory: Optional[float] = None,
+    profile: bool = False,
+    encoder: str = DEFAULT_ENCODER,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    variants: Optional[List[Variant]] = None,
+    data: Optional[bytes] = None,
+    placeholders: bool = False,
+    invisible: Optional[dict] = None,
+) -> FileResult:
+    """
+    Marca e salva um único arquivo, uma saída por variante (uma só
+    decodificação); usado tanto no modo serial quanto no pool (--jobs).
+    Com data (modo --staged) a fonte já vem lida e as saídas codificadas
+    voltam em FileResult.outputs para a escrita no processo principal.
+    """
+    variants = variants or single_variant(wm_kwargs["text"], author, url, license_text)
+    with record_file(profile) as timer:
+        try:
+            with Image.open(io.BytesIO(data) if data is not None else src) as source:
+                with stage("decode"):
+                    im = load_scaled(source, max_width, max_height)
+                outputs = []
+                buffered = []  # (saída, bytes) no modo --staged
+                infos = {}  # --placeholders: dimensões e LQIP por saída, da imagem em memória
+                if max_memory:
+                    # Modo em faixas: saída sempre PNG (gravada incrementalmente, com tEXt)
+                    band_rows = band_rows_for_budget(im, max_memory)
+                    for v in variants:
+                        out_path = output_path_for(src, out_dir, keep_ext, banded=True, suffix=v.suffix)
+                        metadata = {"Copyright": v.text, "Author": v.author, "URL": v.url, "License": v.license}
+                        add_visible_watermark_banded(
+                            im, out_path, band_rows, metadata=metadata, encoder=encoder, **dict(wm_kwargs, text=v.text),
+                        )
+                        outputs.append(out_path)
+                else:
+                    # Com mais de uma marca distinta a fonte é convertida uma vez e
+                    # add_visible_watermark só copia a base RGBA para cada uma
+                    groups = group_by_watermark(variants, wm_kwargs)
+                    base = im
+                    if len(groups) > 1 and im.mode != "RGBA":
+                        with stage("rgba"):
+                            base = im.convert("RGBA")
+                    for kwargs, group in groups:
+                        wm = add_visible_watermark(base, **kwargs)
+                        if invisible:
+                            with stage("invisible"):
+                                wm = embed(wm, kwargs["text"], **invisible)
+                        for v in group:
+                            out_path = output_path_for(src, out_dir, keep_ext, suffix=v.suffix)
+                            copyright_text = v.text  # Pode personalizar diferente do texto da marca
+                            buf = io.BytesIO() if data is not None else None
+                            save_with_metadata(
+                                wm,
+                                out_path,
+                                author=v.author,
+                                copyright_text=copyright_text,
+                                url=v.url,
+                                license_text=v.license,
+                                source_ext=src.suffix.lower(),
+                                encoder=encoder,
+                                fp=buf,
+                            )
+                            if buf is not None:
+                                buffered.append((out_path, buf.getvalue()))
+                            outputs.append(out_path)
+                            if placeholders:
+                                with stage("placeholder"):
+                                    infos[out_path.as_posix()] = placeholder_info(wm)
+                        del wm
+                bytes_in = len(data) if data is not None else file_size(src)
+                if buffered:
+                    bytes_out = sum(len(blob) for _, blob in buffered)
+                else:
+                    bytes_out = sum(file_size(p) for p in outputs)
+                stats = file_stats(src.name, timer, bytes_in, bytes_out, im.width * im.height)
+                names = ", ".join(p.name for p in outputs)
+                return FileResult(
+                    True, f"OK: {src.name} -> {names}", bytes_in, stats, outputs=buffered or None, placeholders=infos or None
+                )
+        except Exception as e:
+            return FileResult(False, f"ERRO: {src.name} -> {e}")
 
 
 def process_images(
@@ -178,6 +414,24 @@ def process_images(
     license_text: Optional[str],
     font: Optional[str],
     keep_ext: bool,
+    jobs: int = 1,
+    max_memory: Optional[float] = None,
+    manifest: Optional[BuildManifest] = None,
+    profile: bool = False,
+    stats_json: Optional[str] = None,
+    profile_dump: Optional[str] = None,
+    encoder: str = DEFAULT_ENCODER,
+    encode_report: bool = False,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    variants: Optional[List[Variant]] = None,
+    staged: bool = False,
+    queue_depth: Optional[int] = None,
+    shard: Optional[Shard] = None,
+    shard_report: Optional[str] = None,
+    dedup: bool = False,
+    placeholders: Optional[PlaceholderCache] = None,
+    invisible: Optional[dict] = None,
 ):
     out_dir.mkdir(parents=True, exist_ok=True)
     include = {e.lower().strip().lstrip(".") for e in include_exts} if include_exts else None
@@ -188,45 +442,182 @@ def process_images(
         return
 
     print(f"Processando {len(files)} arquivo(s) de {in_dir} -> {out_dir}")
+    todo = []
     for src in files:
-        stem = src.stem
         ext = src.suffix.lower().lstrip(".")
         if include and ext not in include:
             continue
-        if stem.endswith("_wm"):
+        if is_output_stem(src.stem, variants):
             # Evita reprocessar
             continue
-
+        todo.append(src)
+
+    wm_kwargs = dict(text=text, mode=mode, opacity=opacity, scale=scale, font_path=font)
+    banded = bool(max_memory)
+    # Parâmetros efetivos que determinam o conteúdo da saída (para o manifesto)
+    params = dict(
+        wm_kwargs, tool="watermark_images", author=author, url=url, license=license_text,
+        keep_ext=keep_ext, banded=banded, encoder=encoder,
+    )
+    if max_width or max_height:
+        params.update(max_width=max_width, max_height=max_height)
+    if variants:
+        params["variants"] = variants_params(variants)
+    if invisible:
+        params["invisible"] = invisible_params(invisible)
+    suffixes = [v.suffix for v in variants] if variants else [""]
+
+    def outputs_for(src: Path):
+        return [output_path_for(src, out_dir, keep_ext, banded, suffix) for suffix in suffixes]
+
+    report = None
+    if shard is not None:
+        report = ShardReport(shard, "watermark_images", params, manifest)
+        todo = report.select(todo)
+
+    # Cópias idênticas (mesmo sha256) são processadas uma vez; o shard é
+    # escolhido pelo conteúdo, então todas caem no mesmo shard da canônica
+    dups = {}
+    if dedup:
+        todo, dups = AssetStore(manifest).split(todo)
+        if dups:
+            print(f"Dedup: {sum(len(d) for d in dups.values())} cópia(s) idêntica(s) reaproveitam a saída de outra fonte.")
+
+    if manifest is not None:
+        pending = []
+        for src in todo:
+            if manifest.is_fresh(outputs_for(src), src, params):
+                manifest.skipped += 1
+                if report is not None:
+                    report.skipped(src.name, outputs_for(src))
+                replicate_duplicates(src, dups.get(src, ()), outputs_for, manifest, params, report)
+            else:
+                pending.append(src)
+        todo = pending
+
+    collector = StatsCollector()
+
+    def record(src: Path, res: FileResult):
+        collector.add(res.stats)
+        if manifest is not None and res.ok:
+            manifest.record(outputs_for(src), src, params)
+            manifest.built += 1
+        if report is not None:
+            report.record(src.name, res, outputs_for(src))
+        if res.ok:
+            replicate_duplicates(src, dups.get(src, ()), outputs_for, manifest, params, report)
+        record_placeholders(placeholders, res)
+
+    worker = partial(
+        watermark_file,
+        out_dir=out_dir,
+        keep_ext=keep_ext,
+        wm_kwargs=wm_kwargs,
+        author=author,
+        url=url,
+        license_text=license_text,
+        max_memory=max_memory,
+        # Com --shard os tempos por arquivo vão para o relatório do shard
+        profile=bool(profile or stats_json or profile_dump or encode_report or shard),
+        encoder=encoder,
+        max_width=max_width,
+        max_height=max_height,
+        variants=variants,
+        placeholders=placeholders is not None,
+        invisible=invisible,
+    )
+    if staged:
+        run_staged(todo, worker, jobs=jobs, queue_depth=queue_depth, on_result=record)
+    else:
+        run_batch(todo, worker, jobs=jobs, on_result=record)
+    if max_memory:
+        report_peak_rss(max_memory)
+    if manifest is not None:
+        manifest.save()
+        print(manifest.summary())
+    if placeholders is not None:
+        placeholders.save()
+    if report is not None:
+        report.save(report_path(shard, out_dir, shard_report))
+
+    def rerun(name: str):
+        # Reprocessa numa pasta temporária para não tocar nas saídas registradas no manifesto
+        with tempfile.TemporaryDirectory() as tmp:
+            watermark_file(
+                in_dir / name, Path(tmp), keep_ext, wm_kwargs, author, url, license_text, max_memory,
+                encoder=encoder, max_width=max_width, max_height=max_height, variants=variants,
+                invisible=invisible,
+            )
+
+    finish_report(collector, profile, stats_json, profile_dump, rerun, encode_report=encoder if encode_report else None)
+
+
+def stamp_file(src: Path, out_dir: Path, fields: dict, profile: bool = False) -> FileResult:
+    """Grava só os metadados (ver metadata_patch.py): sem decodificar pixels nem recodificar."""
+    with record_file(profile) as timer:
         try:
-            with Image.open(src) as im:
-                wm = add_visible_watermark(
-                    im,
-                    text=text,
-                    mode=mode,
-                    opacity=opacity,
-                    scale=scale,
-                    font_path=font,
-                )
-                # Define extensão de saída
-                if keep_ext and src.suffix.lower() in {".png", ".jpg", ".jpeg"}:
-                    out_path = (out_dir / f"{stem}_wm").with_suffix(src.suffix.lower())
-                else:
-                    # Normaliza para PNG
-                    out_path = (out_dir / f"{stem}_wm").with_suffix(".png")
-
-                copyright_text = text  # Pode personalizar diferente do texto da marca
-                save_with_metadata(
-                    wm,
-                    out_path,
-                    author=author,
-                    copyright_text=copyright_text,
-                    url=url,
-                    license_text=license_text,
-                    source_ext=src.suffix.lower(),
-                )
-                print(f"OK: {src.name} -> {out_path.name}")
+            out_path = out_dir / src.name
+            with stage("patch"):
+                patch_file(src, out_path, fields)
+            bytes_in = file_size(src)
+            stats = file_stats(src.name, timer, bytes_in, file_size(out_path))
+            return FileResult(True, f"OK: {src.name} -> {out_path.name} (metadados)", bytes_in, stats)
         except Exception as e:
-            print(f"ERRO: {src.name} -> {e}")
+            return FileResult(False, f"ERRO: {src.name} -> {e}")
+
+
+def stamp_images(
+    in_dir: Path,
+    out_dir: Path,
+    include_exts: Optional[Iterable[str]],
+    text: str,
+    author: Optional[str],
+    url: Optional[str],
+    license_text: Optional[str],
+    jobs: int = 1,
+    manifest: Optional[BuildManifest] = None,
+    profile: bool = False,
+    stats_json: Optional[str] = None,
+):
+    """
+    --metadata-only: Copyright/Author/URL/License em PNG e JPEG sem tocar nos
+    pixels. As saídas mantêm o nome; com --outdir igual a --dir o arquivo é
+    atualizado no lugar.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    include = {e.lower().strip().lstrip(".") for e in include_exts} if include_exts else None
+    files = sorted(p for p in in_dir.iterdir() if p.is_file() and p.suffix.lower() in METADATA_EXTS)
+    todo = [p for p in files if not include or p.suffix.lower().lstrip(".") in include]
+    if not todo:
+        print(f"Nenhum PNG/JPEG encontrado em: {in_dir}")
+        return
+
+    print(f"Gravando metadados em {len(todo)} arquivo(s) de {in_dir} -> {out_dir}")
+    fields = metadata_fields(author, text, url, license_text)
+    params = dict(fields, tool="metadata_patch")
+    if manifest is not None:
+        pending = []
+        for src in todo:
+            if manifest.is_fresh([out_dir / src.name], src, params):
+                manifest.skipped += 1
+            else:
+                pending.append(src)
+        todo = pending
+
+    collector = StatsCollector()
+
+    def record(src: Path, res: FileResult):
+        collector.add(res.stats)
+        if manifest is not None and res.ok:
+            manifest.record([out_dir / src.name], src, params)
+            manifest.built += 1
+
+    worker = partial(stamp_file, out_dir=out_dir, fields=fields, profile=bool(profile or stats_json))
+    run_batch(todo, worker, jobs=jobs, on_result=record)
+    if manifest is not None:
+        manifest.save()
+        print(manifest.summary())
+    finish_report(collector, profile, stats_json, None)
 
 
 def main():
@@ -243,6 +634,25 @@ def main():
     parser.add_argument("--license", default="Todos os direitos reservados.", help="Licença para metadados.")
     parser.add_argument("--font", help="Caminho para uma fonte .ttf (opcional). Ex.: C:\\Windows\\Fonts\\arial.ttf")
     parser.add_argument("--keep-ext", action="store_true", help="Tentar manter a extensão (aplica-se a PNG/JPEG).")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos paralelos (1 = serial; 0 = todos os núcleos).")
+    parser.add_argument("--max-memory", type=float, help="Orçamento de memória por imagem (MB): processa em faixas e grava PNG incrementalmente.")
+    parser.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <outdir>/.build-manifest.json).")
+    parser.add_argument("--force", action="store_true", help="Reprocessa tudo, ignorando o manifesto.")
+    parser.add_argument(
+        "--metadata-only",
+        action="store_true",
+        help="Só grava os metadados (PNG tEXt/iTXt, JPEG EXIF/XMP) reescrevendo o arquivo, sem marca nem recodificação.",
+    )
+    add_variants_args(parser)
+    add_staged_args(parser)
+    add_shard_args(parser)
+    add_dedup_args(parser)
+    add_placeholder_args(parser)
+    add_invisible_args(parser)
+    add_size_args(parser)
+    add_encoder_args(parser)
+    add_profile_args(parser)
+    add_watch_args(parser)
     args = parser.parse_args()
 
     in_dir = Path(args.dir).resolve()
@@ -251,20 +661,99 @@ def main():
         print(f"ERRO: diretório de entrada não existe: {in_dir}")
         return
 
-    process_images(
-        in_dir=in_dir,
-        out_dir=out_dir,
-        include_exts=args.include,
-        mode=args.mode,
-        opacity=args.opacity,
-        scale=args.scale,
-        text=args.text,
-        author=args.author,
-        url=args.url,
-        license_text=args.license,
-        font=args.font,
-        keep_ext=args.keep-ext if hasattr(args, "keep-ext") else False,
-    )
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        return
+
+    variants = None
+    if args.variants:
+        try:
+            variants = load_variants(Path(args.variants), args.text, args.author, args.url, args.license)
+        except (OSError, ValueError) as e:
+            print(f"ERRO: variantes: {e}")
+            return
+    if args.metadata_only and variants:
+        print("ERRO: --metadata-only não combina com --variants.")
+        return
+
+    try:
+        invisible = invisible_from_args(args)
+    except RuntimeError as e:
+        print(f"ERRO: {e}")
+        return
+    if invisible and args.max_memory:
+        print("ERRO: --invisible não combina com --max-memory (a marca precisa da imagem inteira).")
+        return
+
+    manifest = BuildManifest.for_outdir(out_dir, args.manifest, force=args.force)
+    if args.metadata_only:
+        run = partial(
+            stamp_images,
+            in_dir=in_dir,
+            out_dir=out_dir,
+            include_exts=args.include,
+            text=args.text,
+            author=args.author,
+            url=args.url,
+            license_text=args.license,
+            jobs=args.jobs,
+            manifest=manifest,
+            profile=args.profile,
+            stats_json=args.stats_json,
+        )
+    else:
+        run = partial(
+            process_images,
+            in_dir=in_dir,
+            out_dir=out_dir,
+            include_exts=args.include,
+            mode=args.mode,
+            opacity=args.opacity,
+            scale=args.scale,
+            text=args.text,
+            author=args.author,
+            url=args.url,
+            license_text=args.license,
+            font=args.font,
+            keep_ext=args.keep_ext,
+            jobs=args.jobs,
+            max_memory=args.max_memory,
+            manifest=manifest,
+            profile=args.profile,
+            stats_json=args.stats_json,
+            profile_dump=args.profile_dump,
+            encoder=args.encoder,
+            encode_report=args.encode_report,
+            max_width=args.max_width,
+            max_height=args.max_height,
+            variants=variants,
+            staged=args.staged,
+            queue_depth=args.queue_depth,
+            shard=shard,
+            shard_report=args.shard_report,
+            dedup=args.dedup,
+            placeholders=placeholders_from_args(args),
+            invisible=invisible,
+        )
+    with persistent_pool(args.jobs if args.watch else 1):
+        run()
+        if args.watch:
+            manifest.force = False  # --force vale só para a primeira passada
+
+            def rebuild(changed):
+                # O manifesto refaz só as saídas das fontes alteradas
+                manifest.built = manifest.skipped = 0
+                run()
+
+            watch(
+                [in_dir],
+                rebuild,
+                accept=lambda p: p.parent == in_dir and p.suffix.lower() in SUPPORTED_EXTS and not is_output_stem(p.stem, variants),
+                debounce=args.debounce,
+                polling=args.poll,
+            )
 
 
 if __name__ == "__main__":
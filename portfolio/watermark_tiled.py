@@ -1,10 +1,28 @@
 import argparse
-import math
+import io
+import tempfile
+from functools import partial
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from PIL import Image, ImageDraw, ImageFont, ImageColor
 
+import fonts
+from assets import AssetStore, add_dedup_args, replicate_duplicates
+from banded import band_rows_for_budget, composite_banded, report_peak_rss
+from batch import FileResult, file_size, persistent_pool, run_batch
+from decode import add_size_args, load_scaled
+from encoders import DEFAULT_ENCODER, add_encoder_args, save_image
+from invisible_mark import add_invisible_args, embed, invisible_from_args, invisible_params
+from manifest import BuildManifest
+from placeholders import PlaceholderCache, add_placeholder_args, placeholder_info, placeholders_from_args, record_placeholders
+from profiling import StatsCollector, add_profile_args, file_stats, finish_report, record_file, stage
+from shard import Shard, ShardReport, add_shard_args, parse_shard, report_path
+from staged import add_staged_args, run_staged
+from tiled_overlay import OVERLAY_CACHE, TiledPattern, render_tiled_overlay
+from variants import Variant, add_variants_args, group_by_watermark, is_output_stem, load_variants, output_stem, require_distinct, single_variant, variants_params
+from watch import add_watch_args, watch
+
 SUPPORTED_EXTS = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
 
 
@@ -18,23 +36,8 @@ def parse_color(color_str: str, alpha: float) -> Tuple[int, int, int, int]:
 
 
 def load_font(font_path: Optional[str], base_size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    """Carrega fonte; tenta fallback no Windows; por fim, default bitmap."""
-    if font_path:
-        try:
-            return ImageFont.truetype(font_path, base_size)
-        except Exception:
-            pass
-    # Tenta uma fonte comum do Windows
-    for cand in [
-        r"C:\Windows\Fonts\arial.ttf",
-        r"C:\Windows\Fonts\calibri.ttf",
-        r"C:\Windows\Fonts\seguiemj.ttf",
-    ]:
-        try:
-            return ImageFont.truetype(cand, base_size)
-        except Exception:
-            continue
-    return ImageFont.load_default()
+    """Carrega fonte (com cache); sem --font usa Arial/Calibri/Segoe ou equivalentes do sistema; por fim, default bitmap."""
+    return fonts.load_font(font_path, base_size)
 
 
 def build_text_tile(
@@ -84,38 +87,14 @@ def make_tiled_overlay(
     - spacing_scale controla a distância entre repetições (1.0 = encosta nas bordas do tile; >1.0 = mais espaço).
     - angle_deg define a rotação final (estilo Shutterstock).
     - offset aplica deslocamento x/y (pixels) para desalinhamento do padrão.
+    - A montagem é feita em bloco por tiled_overlay.render_tiled_overlay (mesmo resultado do laço tile a tile).
     """
-    tw, th = text_tile.size
-
-    # Tamanho maior que a imagem para evitar corte após rotação (usa diagonal)
-    diag = int(math.hypot(width, height))
-    canvas_w = diag + max(tw, th) * 2
-    canvas_h = diag + max(tw, th) * 2
-    big = Image.new("RGBA", (canvas_w, canvas_h), (0, 0, 0, 0))
-
-    step_x = max(1, int(tw * spacing_scale))
-    step_y = max(1, int(th * spacing_scale))
-
-    # Ponto inicial (um pouco antes) para cobrir tudo
-    start_x = -tw + offset[0]
-    start_y = -th + offset[1]
+    return render_tiled_overlay(width, height, text_tile, spacing_scale, angle_deg, offset)
 
-    for y in range(start_y, canvas_h + th, step_y):
-        for x in range(start_x, canvas_w + tw, step_x):
-            big.alpha_composite(text_tile, (x, y))
 
-    # Rotaciona o padrão
-    rotated = big.rotate(angle_deg, resample=Image.BICUBIC, expand=False)
-
-    # Recorta o centro no tamanho da imagem original
-    left = (canvas_w - width) // 2
-    top = (canvas_h - height) // 2
-    overlay = rotated.crop((left, top, left + width, top + height))
-    return overlay
-
-
-def apply_tiled_watermark(
-    image: Image.Image,
+def build_tiled_pattern(
+    width: int,
+    height: int,
     text: str,
     opacity: float = 0.22,
     angle: float = 30.0,
@@ -128,20 +107,9 @@ def apply_tiled_watermark(
     font_path: Optional[str] = None,
     offset_x: int = 0,
     offset_y: int = 0,
-) -> Image.Image:
-    """
-    Aplica o padrão repetido:
-    - scale: tamanho do texto como fração da largura (0.06 = 6% da largura).
-    - spacing: multiplicador da largura/altura do tile para controlar densidade do padrão.
-    - opacity: opacidade do texto (0..1); stroke_opacity idem para contorno.
-    """
-    if image.mode != "RGBA":
-        base = image.convert("RGBA")
-    else:
-        base = image.copy()
-
-    W, H = base.size
-    font_size = max(16, int(W * scale))
+) -> TiledPattern:
+    """Monta fonte, tile e padrão rotacionado para uma imagem width x height."""
+    font_size = max(16, int(width * scale))
     font = load_font(font_path, font_size)
 
     fill = parse_color(color, opacity)
@@ -155,20 +123,155 @@ def apply_tiled_watermark(
         stroke_fill=stroke_fill,
         padding=max(8, font_size // 6),
     )
-
-    overlay = make_tiled_overlay(
-        width=W,
-        height=H,
+    return TiledPattern(
+        width=width,
+        height=height,
         text_tile=tile,
         spacing_scale=max(0.5, spacing),
         angle_deg=angle,
         offset=(offset_x, offset_y),
     )
 
-    out = Image.alpha_composite(base, overlay)
+
+def apply_tiled_watermark(
+    image: Image.Image,
+    text: str,
+    opacity: float = 0.22,
+    angle: float = 30.0,
+    scale: float = 0.06,
+    spacing: float = 2.2,
+    color: str = "#FFFFFF",
+    stroke_width: int = 2,
+    stroke_color: str = "#000000",
+    stroke_opacity: float = 0.5,
+    font_path: Optional[str] = None,
+    offset_x: int = 0,
+    offset_y: int = 0,
+) -> Image.Image:
+    """
+    Aplica o padrão repetido:
+    - scale: tamanho do texto como fração da largura (0.06 = 6% da largura).
+    - spacing: multiplicador da largura/altura do tile para controlar densidade do padrão.
+    - opacity: opacidade do texto (0..1); stroke_opacity idem para contorno.
+    """
+    with stage("rgba"):
+        # alpha_composite devolve uma imagem nova: uma base RGBA (ex.: a
+        # compartilhada pelas variantes) é usada sem cópia
+        base = image if image.mode == "RGBA" else image.convert("RGBA")
+
+    W, H = base.size
+    # Figuras do mesmo tamanho com os mesmos parâmetros reaproveitam o overlay pronto.
+    cache_key = (W, H, text, font_path, scale, opacity, angle, spacing, color,
+                 stroke_width, stroke_color, stroke_opacity, offset_x, offset_y)
+    overlay = OVERLAY_CACHE.get(cache_key)
+    if overlay is None:
+        with stage("overlay"):
+            pattern = build_tiled_pattern(
+                W, H, text, opacity, angle, scale, spacing, color,
+                stroke_width, stroke_color, stroke_opacity, font_path, offset_x, offset_y,
+            )
+        overlay = pattern.render()
+        OVERLAY_CACHE.put(cache_key, overlay)
+
+    with stage("composite"):
+        out = Image.alpha_composite(base, overlay)
     return out
 
 
+def apply_tiled_watermark_banded(
+    image: Image.Image, out_path: Path, max_memory: float, text: str, encoder: Optional[str] = None, **kwargs
+) -> None:
+    """
+    Mesma marca de apply_tiled_watermark, composta e gravada (PNG) em faixas
+    que cabem em max_memory (MB) junto da célula do padrão: nem a cópia RGBA
+    nem o overlay existem em tamanho cheio.
+    """
+    with stage("overlay"):
+        pattern = build_tiled_pattern(image.width, image.height, text, **kwargs)
+    band_rows = band_rows_for_budget(image, max_memory, reserved=pattern.cell_bytes)
+    composite_banded(image, out_path, pattern.render, band_rows, encoder=encoder)
+
+
+def output_path_for(src: Path, out_dir: Path, keep_ext: bool, banded: bool = False, suffix: str = "") -> Path:
+    """Nome de saída: <stem>_wm[_<sufixo>] com a extensão original (--keep-ext, PNG/JPEG) ou PNG."""
+    ext = src.suffix.lower()
+    if keep_ext and not banded and ext in {".png", ".jpg", ".jpeg"}:
+        return (out_dir / output_stem(src.stem, suffix)).with_suffix(ext)
+    return (out_dir / output_stem(src.stem, suffix)).with_suffix(".png")
+
+
+def watermark_file(
+    src: Path,
+    out_dir: Path,
+    keep_ext: bool,
+    wm_kwargs: dict,
+    max_memory: Optional[float] = None,
+    profile: bool = False,
+    encoder: str = DEFAULT_ENCODER,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    variants: Optional[List[Variant]] = None,
+    data: Optional[bytes] = None,
+    placeholders: bool = False,
+    invisible: Optional[dict] = None,
+) -> FileResult:
+    """
+    Aplica a marca em um único arquivo, gravando uma saída por variante (uma
+    só decodificação); usado tanto no modo serial quanto no pool (--jobs).
+    Com data (modo --staged) a fonte já vem lida e as saídas codificadas
+    voltam em FileResult.outputs para a escrita no processo principal.
+    """
+    variants = variants or single_variant(wm_kwargs["text"])
+    with record_file(profile) as timer:
+        try:
+            with Image.open(io.BytesIO(data) if data is not None else src) as source:
+                with stage("decode"):
+                    im = load_scaled(source, max_width, max_height)
+                outputs = []
+                buffered = []  # (saída, bytes) no modo --staged
+                infos = {}  # --placeholders: dimensões e LQIP por saída, da imagem em memória
+                if max_memory:
+                    # Modo em faixas: saída sempre PNG (gravada incrementalmente)
+                    for v in variants:
+                        out_path = output_path_for(src, out_dir, keep_ext, banded=True, suffix=v.suffix)
+                        apply_tiled_watermark_banded(im, out_path, max_memory, encoder=encoder, **dict(wm_kwargs, text=v.text))
+                        outputs.append(out_path)
+                else:
+                    with stage("rgba"):
+                        base = im if im.mode == "RGBA" else im.convert("RGBA")
+                    for kwargs, group in group_by_watermark(variants, wm_kwargs):
+                        out_im = apply_tiled_watermark(base, **kwargs)
+                        if invisible:
+                            with stage("invisible"):
+                                out_im = embed(out_im, kwargs["text"], **invisible)
+                        for v in group:
+                            out_path = output_path_for(src, out_dir, keep_ext, suffix=v.suffix)
+                            with stage("encode"):
+                                if data is not None:
+                                    buf = io.BytesIO()
+                                    save_image(out_im, out_path, encoder, fp=buf)
+                                    buffered.append((out_path, buf.getvalue()))
+                                else:
+                                    save_image(out_im, out_path, encoder)
+                            outputs.append(out_path)
+                            if placeholders:
+                                with stage("placeholder"):
+                                    infos[out_path.as_posix()] = placeholder_info(out_im)
+                        del out_im
+                bytes_in = len(data) if data is not None else file_size(src)
+                if buffered:
+                    bytes_out = sum(len(blob) for _, blob in buffered)
+                else:
+                    bytes_out = sum(file_size(p) for p in outputs)
+                stats = file_stats(src.name, timer, bytes_in, bytes_out, im.width * im.height)
+                names = ", ".join(p.name for p in outputs)
+                return FileResult(
+                    True, f"OK: {src.name} -> {names}", bytes_in, stats, outputs=buffered or None, placeholders=infos or None
+                )
+        except Exception as e:
+            return FileResult(False, f"ERRO: {src.name} -> {e}")
+
+
 def process_dir(
     in_dir: Path,
     out_dir: Path,
@@ -183,6 +286,24 @@ def process_dir(
     stroke_opacity: float,
     font_path: Optional[str],
     keep_ext: bool,
+    jobs: int = 1,
+    max_memory: Optional[float] = None,
+    manifest: Optional[BuildManifest] = None,
+    profile: bool = False,
+    stats_json: Optional[str] = None,
+    profile_dump: Optional[str] = None,
+    encoder: str = DEFAULT_ENCODER,
+    encode_report: bool = False,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    variants: Optional[List[Variant]] = None,
+    staged: bool = False,
+    queue_depth: Optional[int] = None,
+    shard: Optional[Shard] = None,
+    shard_report: Optional[str] = None,
+    dedup: bool = False,
+    placeholders: Optional[PlaceholderCache] = None,
+    invisible: Optional[dict] = None,
 ):
     out_dir.mkdir(parents=True, exist_ok=True)
     files = sorted(p for p in in_dir.iterdir() if p.is_file() and p.suffix.lower() in SUPPORTED_EXTS)
@@ -191,34 +312,104 @@ def process_dir(
         return
 
     print(f"Processando {len(files)} arquivo(s) de {in_dir} -> {out_dir}")
-    for src in files:
-        if src.stem.endswith("_wm"):
-            continue
-        try:
-            with Image.open(src) as im:
-                out_im = apply_tiled_watermark(
-                    im,
-                    text=text,
-                    opacity=opacity,
-                    angle=angle,
-                    scale=scale,
-                    spacing=spacing,
-                    color=color,
-                    stroke_width=stroke_width,
-                    stroke_color=stroke_color,
-                    stroke_opacity=stroke_opacity,
-                    font_path=font_path,
-                )
-
-                out_path = (out_dir / f"{src.stem}_wm").with_suffix(src.suffix.lower() if keep_ext and src.suffix.lower() in {'.png', '.jpg', '.jpeg'} else ".png")
-                # JPEG não suporta alpha: converte para RGB ao salvar
-                if out_path.suffix.lower() in {".jpg", ".jpeg"}:
-                    out_im.convert("RGB").save(out_path.as_posix(), quality=90, subsampling=2, optimize=True)
-                else:
-                    out_im.save(out_path.as_posix(), optimize=True)
-                print(f"OK: {src.name} -> {out_path.name}")
-        except Exception as e:
-            print(f"ERRO: {src.name} -> {e}")
+    todo = [src for src in files if not is_output_stem(src.stem, variants)]
+    wm_kwargs = dict(
+        text=text,
+        opacity=opacity,
+        angle=angle,
+        scale=scale,
+        spacing=spacing,
+        color=color,
+        stroke_width=stroke_width,
+        stroke_color=stroke_color,
+        stroke_opacity=stroke_opacity,
+        font_path=font_path,
+    )
+    # Parâmetros efetivos que determinam o conteúdo da saída (para o manifesto)
+    params = dict(wm_kwargs, tool="watermark_tiled", keep_ext=keep_ext, banded=bool(max_memory), encoder=encoder)
+    if max_width or max_height:
+        params.update(max_width=max_width, max_height=max_height)
+    if variants:
+        params["variants"] = variants_params(variants)
+    if invisible:
+        params["invisible"] = invisible_params(invisible)
+    suffixes = [v.suffix for v in variants] if variants else [""]
+
+    def outputs_for(src: Path):
+        return [output_path_for(src, out_dir, keep_ext, bool(max_memory), suffix) for suffix in suffixes]
+
+    report = None
+    if shard is not None:
+        report = ShardReport(shard, "watermark_tiled", params, manifest)
+        todo = report.select(todo)
+
+    # Cópias idênticas (mesmo sha256) são processadas uma vez; o shard é
+    # escolhido pelo conteúdo, então todas caem no mesmo shard da canônica
+    dups = {}
+    if dedup:
+        todo, dups = AssetStore(manifest).split(todo)
+        if dups:
+            print(f"Dedup: {sum(len(d) for d in dups.values())} cópia(s) idêntica(s) reaproveitam a saída de outra fonte.")
+
+    if manifest is not None:
+        pending = []
+        for src in todo:
+            if manifest.is_fresh(outputs_for(src), src, params):
+                manifest.skipped += 1
+                if report is not None:
+                    report.skipped(src.name, outputs_for(src))
+                replicate_duplicates(src, dups.get(src, ()), outputs_for, manifest, params, report)
+            else:
+                pending.append(src)
+        todo = pending
+
+    collector = StatsCollector()
+
+    def record(src: Path, res: FileResult):
+        collector.add(res.stats)
+        if manifest is not None and res.ok:
+            manifest.record(outputs_for(src), src, params)
+            manifest.built += 1
+        if report is not None:
+            report.record(src.name, res, outputs_for(src))
+        if res.ok:
+            replicate_duplicates(src, dups.get(src, ()), outputs_for, manifest, params, report)
+        record_placeholders(placeholders, res)
+
+    # Com --shard os tempos por arquivo vão para o relatório do shard
+    instrumented = bool(profile or stats_json or profile_dump or encode_report or shard)
+    worker = partial(
+        watermark_file, out_dir=out_dir, keep_ext=keep_ext, wm_kwargs=wm_kwargs,
+        max_memory=max_memory, profile=instrumented, encoder=encoder,
+        max_width=max_width, max_height=max_height, variants=variants, placeholders=placeholders is not None,
+        invisible=invisible,
+    )
+    if staged:
+        run_staged(todo, worker, jobs=jobs, queue_depth=queue_depth, on_result=record)
+    else:
+        run_batch(todo, worker, jobs=jobs, on_result=record)
+    if max_memory:
+        report_peak_rss(max_memory)
+    if manifest is not None:
+        manifest.save()
+        print(manifest.summary())
+    if placeholders is not None:
+        placeholders.save()
+    if report is not None:
+        report.save(report_path(shard, out_dir, shard_report))
+
+    def rerun(name: str):
+        # Reprocessa numa pasta temporária para não tocar nas saídas registradas no manifesto.
+        # A primeira passada (serial) deixou o overlay em cache: sem limpar, o dump omite a construção dele
+        OVERLAY_CACHE.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            watermark_file(
+                in_dir / name, Path(tmp), keep_ext, wm_kwargs, max_memory,
+                encoder=encoder, max_width=max_width, max_height=max_height, variants=variants,
+                invisible=invisible,
+            )
+
+    finish_report(collector, profile, stats_json, profile_dump, rerun, encode_report=encoder if encode_report else None)
 
 
 def main():
@@ -228,7 +419,7 @@ def main():
     ap.add_argument("--text", default="© 2025 Felipe Alberto Lei | Logik Bioinfo", help="Texto da marca d'água.")
     ap.add_argument("--opacity", type=float, default=0.22, help="Opacidade do texto (0..1).")
     ap.add_argument("--angle", type=float, default=30.0, help="Ângulo (em graus) da marca d'água.")
-    ap.add_argument("--scale", type=float, default=0.06, help="Tamanho do texto como fração da largura (0.06 = 6%).")
+    ap.add_argument("--scale", type=float, default=0.06, help="Tamanho do texto como fração da largura (0.06 = 6%%).")
     ap.add_argument("--spacing", type=float, default=2.2, help="Multiplicador do tile para espaçamento entre repetições.")
     ap.add_argument("--color", default="#FFFFFF", help="Cor do texto (nome ou hex).")
     ap.add_argument("--stroke-width", type=int, default=2, help="Largura do contorno (melhora contraste).")
@@ -236,6 +427,20 @@ def main():
     ap.add_argument("--stroke-opacity", type=float, default=0.5, help="Opacidade do contorno (0..1).")
     ap.add_argument("--font", help="Fonte .ttf (opcional). Ex.: C:\\Windows\\Fonts\\arial.ttf")
     ap.add_argument("--keep-ext", action="store_true", help="Manter extensão (apenas PNG/JPEG).")
+    ap.add_argument("--jobs", type=int, default=1, help="Processos paralelos (1 = serial; 0 = todos os núcleos).")
+    ap.add_argument("--max-memory", type=float, help="Orçamento de memória por imagem (MB): processa em faixas e grava PNG incrementalmente.")
+    ap.add_argument("--manifest", help="Arquivo de manifesto do build incremental (default: <outdir>/.build-manifest.json).")
+    ap.add_argument("--force", action="store_true", help="Reprocessa tudo, ignorando o manifesto.")
+    add_variants_args(ap)
+    add_staged_args(ap)
+    add_shard_args(ap)
+    add_dedup_args(ap)
+    add_placeholder_args(ap)
+    add_invisible_args(ap)
+    add_size_args(ap)
+    add_encoder_args(ap)
+    add_profile_args(ap)
+    add_watch_args(ap)
     args = ap.parse_args()
 
     in_dir = Path(args.dir).resolve()
@@ -244,7 +449,34 @@ def main():
         print(f"ERRO: diretório de entrada não existe: {in_dir}")
         return
 
-    process_dir(
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as e:
+        print(f"ERRO: {e}")
+        return
+
+    variants = None
+    if args.variants:
+        try:
+            variants = load_variants(Path(args.variants), args.text)
+            # Sem metadados na saída: licença/autor/URL não distinguem variantes
+            require_distinct(variants, Path(args.variants), ("text",))
+        except (OSError, ValueError) as e:
+            print(f"ERRO: variantes: {e}")
+            return
+
+    try:
+        invisible = invisible_from_args(args)
+    except RuntimeError as e:
+        print(f"ERRO: {e}")
+        return
+    if invisible and args.max_memory:
+        print("ERRO: --invisible não combina com --max-memory (a marca precisa da imagem inteira).")
+        return
+
+    manifest = BuildManifest.for_outdir(out_dir, args.manifest, force=args.force)
+    run = partial(
+        process_dir,
         in_dir=in_dir,
         out_dir=out_dir,
         text=args.text,
@@ -258,7 +490,42 @@ def main():
         stroke_opacity=args.stroke_opacity,
         font_path=args.font,
         keep_ext=args.keep_ext,
+        jobs=args.jobs,
+        max_memory=args.max_memory,
+        manifest=manifest,
+        profile=args.profile,
+        stats_json=args.stats_json,
+        profile_dump=args.profile_dump,
+        encoder=args.encoder,
+        encode_report=args.encode_report,
+        max_width=args.max_width,
+        max_height=args.max_height,
+        variants=variants,
+        staged=args.staged,
+        queue_depth=args.queue_depth,
+        shard=shard,
+        shard_report=args.shard_report,
+        dedup=args.dedup,
+        placeholders=placeholders_from_args(args),
+        invisible=invisible,
     )
+    with persistent_pool(args.jobs if args.watch else 1):
+        run()
+        if args.watch:
+            manifest.force = False  # --force vale só para a primeira passada
+
+            def rebuild(changed):
+                # O manifesto refaz só as saídas das fontes alteradas
+                manifest.built = manifest.skipped = 0
+                run()
+
+            watch(
+                [in_dir],
+                rebuild,
+                accept=lambda p: p.parent == in_dir and p.suffix.lower() in SUPPORTED_EXTS and not is_output_stem(p.stem, variants),
+                debounce=args.debounce,
+                polling=args.poll,
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,46 @@
+"""
+Configuração comum dos testes das ferramentas de portfolio/.
+
+Os scripts importam uns aos outros pelo nome (como quando executados de
+dentro de portfolio/), então a pasta entra no sys.path. As ferramentas de
+linha de comando são exercitadas em subprocessos, como no uso real.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageFont
+
+PORTFOLIO = Path(__file__).resolve().parents[1] / "portfolio"
+sys.path.insert(0, str(PORTFOLIO))
+
+
+def default_font(font_path, size):
+    """Fonte embutida do Pillow: o resultado não depende das fontes da máquina."""
+    return ImageFont.load_default(size)
+
+
+def figure(width: int, height: int, seed: int = 0) -> Image.Image:
+    """Figura RGB sintética com ruído (todas as amostras do overlay contam)."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+@pytest.fixture
+def run_tool():
+    """Executa portfolio/<script> e devolve a saída (stdout + stderr); falha se o código de saída != 0."""
+
+    def run(script: str, *args, check: bool = True) -> str:
+        proc = subprocess.run(
+            [sys.executable, str(PORTFOLIO / script), *map(str, args)],
+            capture_output=True, text=True, encoding="utf-8",
+        )
+        output = proc.stdout + proc.stderr
+        if check:
+            assert proc.returncode == 0, output
+        return output
+
+    return run
@@ -0,0 +1,84 @@
+"""Modo em faixas (--max-memory): mesmos pixels do caminho normal, memória e tempo contidos."""
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import banded
+import watermark_images
+import watermark_tiled
+from conftest import PORTFOLIO, default_font, figure
+
+
+@pytest.fixture(autouse=True)
+def fixed_font(monkeypatch):
+    monkeypatch.setattr(watermark_tiled, "load_font", default_font)
+    monkeypatch.setattr(watermark_images, "load_font", default_font)
+    watermark_tiled.OVERLAY_CACHE.clear()
+
+
+@pytest.mark.parametrize("size", [(300, 200), (301, 199)])
+@pytest.mark.parametrize("params", [{}, {"angle": -45, "spacing": 0.7}, {"angle": 0, "offset_x": 7}])
+def test_tiled_bands_match_in_memory(tmp_path, size, params):
+    image = figure(*size)
+    out = tmp_path / "out.png"
+    # Orçamento mínimo: faixas de MIN_BAND_ROWS linhas, várias por imagem
+    watermark_tiled.apply_tiled_watermark_banded(image, out, 0.1, "© Test", **params)
+    expected = np.asarray(watermark_tiled.apply_tiled_watermark(image, "© Test", **params))
+    with Image.open(out) as result:
+        assert np.array_equal(np.asarray(result), expected)
+
+
+@pytest.mark.parametrize("mode", ["diagonal", "corner"])
+def test_visible_bands_match_in_memory(tmp_path, mode):
+    image = figure(400, 300)
+    out = tmp_path / "out.png"
+    watermark_images.add_visible_watermark_banded(image, out, banded.MIN_BAND_ROWS, "© Test", mode=mode)
+    expected = np.asarray(watermark_images.add_visible_watermark(image, "© Test", mode=mode))
+    with Image.open(out) as result:
+        assert np.array_equal(np.asarray(result), expected)
+
+
+def test_band_rows_reserve_pattern_cell():
+    image = Image.new("RGB", (2000, 2000))
+    budget_rows = banded.band_rows_for_budget(image, 64)
+    assert banded.band_rows_for_budget(image, 64, reserved=16 * 1024 * 1024) < budget_rows
+    assert banded.band_rows_for_budget(image, 1) == banded.MIN_BAND_ROWS
+
+
+# Mede, num subprocesso limpo, o pico de RSS de só importar as ferramentas
+_IMPORT_RSS = (
+    "import sys; sys.path.insert(0, sys.argv[1]); "
+    "import watermark_tiled, banded; print(banded.peak_rss_mb())"
+)
+
+
+def _timed(run_tool, *args):
+    start = time.perf_counter()
+    output = run_tool("watermark_tiled.py", *args)
+    return output, time.perf_counter() - start
+
+
+@pytest.mark.skipif(banded.resource is None, reason="pico de RSS indisponível nesta plataforma")
+def test_banded_peak_rss_and_time(tmp_path, run_tool):
+    # Figura grande e fácil de comprimir: o custo medido é o da composição, não o do zlib
+    pixels = np.full((2400, 3200, 3), 235, dtype=np.uint8)
+    pixels[::50] = 0
+    pixels[:, ::70] = (200, 30, 30)
+    src = tmp_path / "in"
+    src.mkdir()
+    Image.fromarray(pixels).save(src / "fig.png")
+    budget = 48  # MB, com a fonte decodificada (~30 MB) inclusa
+
+    _, full_seconds = _timed(run_tool, "--dir", src, "--outdir", tmp_path / "full")
+    output, band_seconds = _timed(run_tool, "--dir", src, "--outdir", tmp_path / "bands", "--max-memory", budget)
+
+    peak = float(re.search(r"Pico de memória \(RSS\): ([\d.]+) MB", output).group(1))
+    floor = float(subprocess.check_output([sys.executable, "-c", _IMPORT_RSS, str(PORTFOLIO)], text=True))
+    # Folga para buffers do zlib/alocador; antes do recorte da célula o pico passava de 3x o orçamento
+    assert peak - floor <= budget * 1.25, f"pico {peak:.0f} MB, base {floor:.0f} MB, orçamento {budget} MB"
+    assert band_seconds <= 3 * full_seconds + 2, f"faixas {band_seconds:.1f} s, normal {full_seconds:.1f} s"
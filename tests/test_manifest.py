@@ -0,0 +1,64 @@
+"""Build incremental: saídas atualizadas são ignoradas; fonte, parâmetros ou --force refazem."""
+import json
+
+import pytest
+
+from conftest import figure
+from manifest import MANIFEST_NAME, BuildManifest
+
+
+@pytest.fixture
+def figs(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    figure(120, 80, seed=1).save(src / "a.png")
+    figure(90, 60, seed=2).save(src / "b.png")
+    return src
+
+
+def _summary(output):
+    return [line for line in output.splitlines() if line.startswith("Build:")][-1]
+
+
+@pytest.mark.parametrize("script", ["watermark_tiled.py", "watermark_images.py"])
+def test_skip_and_force(tmp_path, figs, run_tool, script):
+    out = tmp_path / "out"
+    assert _summary(run_tool(script, "--dir", figs, "--outdir", out)).startswith("Build: 2 gerado(s), 0 ignorado(s)")
+    outputs = sorted(out.glob("*_wm.png"))
+    assert len(outputs) == 2
+    stamps = [p.stat().st_mtime_ns for p in outputs]
+
+    assert _summary(run_tool(script, "--dir", figs, "--outdir", out)).startswith("Build: 0 gerado(s), 2 ignorado(s)")
+    assert [p.stat().st_mtime_ns for p in outputs] == stamps
+
+    assert _summary(run_tool(script, "--dir", figs, "--outdir", out, "--force")).startswith("Build: 2 gerado(s)")
+    # --force não apaga o manifesto: a execução seguinte volta a ignorar
+    assert _summary(run_tool(script, "--dir", figs, "--outdir", out)).startswith("Build: 0 gerado(s), 2 ignorado(s)")
+
+
+def test_rebuilds_changed_source_params_and_output(tmp_path, figs, run_tool):
+    out = tmp_path / "out"
+    run_tool("watermark_tiled.py", "--dir", figs, "--outdir", out)
+
+    figure(120, 80, seed=3).save(figs / "a.png")
+    assert _summary(run_tool("watermark_tiled.py", "--dir", figs, "--outdir", out)).startswith("Build: 1 gerado(s), 1 ignorado(s)")
+
+    assert _summary(run_tool("watermark_tiled.py", "--dir", figs, "--outdir", out, "--opacity", "0.3")).startswith("Build: 2 gerado(s)")
+
+    (out / "b_wm.png").unlink()
+    assert _summary(run_tool("watermark_tiled.py", "--dir", figs, "--outdir", out, "--opacity", "0.3")).startswith("Build: 1 gerado(s), 1 ignorado(s)")
+
+
+def test_manifest_keys_are_relative(tmp_path, figs, run_tool):
+    out = tmp_path / "out"
+    run_tool("watermark_tiled.py", "--dir", figs, "--outdir", out)
+    data = json.loads((out / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert sorted(data["outputs"]) == ["a_wm.png", "b_wm.png"]
+
+
+def test_unreadable_manifest_is_ignored(tmp_path, figs, capsys):
+    path = tmp_path / MANIFEST_NAME
+    path.write_text("{", encoding="utf-8")
+    manifest = BuildManifest(path)
+    assert "manifesto ilegível" in capsys.readouterr().out
+    assert not manifest.is_fresh([tmp_path / "x.png"], figs / "a.png", {})
@@ -0,0 +1,135 @@
+"""--metadata-only: PNG/JPEG com metadados novos, mesmos dados de imagem, repetível."""
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import figure
+from metadata_patch import (
+    PNG_SIGNATURE, TAG_ARTIST, TAG_COPYRIGHT, TAG_XP_AUTHOR, metadata_fields, patch_file,
+)
+
+FIELDS = metadata_fields("Felipe Alberto Lei", "© 2025 Logik Bioinfo", "https://logikbioinfo.com", "Todos os direitos reservados.")
+TAG_MAKE = 0x010F
+
+
+def _png_chunks(data: bytes):
+    pos, chunks = len(PNG_SIGNATURE), []
+    while pos < len(data):
+        length = int.from_bytes(data[pos:pos + 4], "big")
+        chunks.append((data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return chunks
+
+
+def _jpeg_scan(data: bytes) -> bytes:
+    """Do SOS ao fim: os dados entrópicos que não podem mudar."""
+    pos = 2
+    while data[pos + 1] != 0xDA:
+        pos += 2 + int.from_bytes(data[pos + 2:pos + 4], "big")
+    return data[pos:]
+
+
+@pytest.fixture
+def png(tmp_path):
+    from PIL import PngImagePlugin
+
+    info = PngImagePlugin.PngInfo()
+    info.add_text("Author", "autor antigo")
+    info.add_text("Software", "matplotlib")
+    path = tmp_path / "fig.png"
+    figure(64, 48).save(path, pnginfo=info)
+    return path
+
+
+@pytest.fixture
+def jpeg(tmp_path):
+    exif = Image.Exif()
+    exif[TAG_MAKE] = "Scanner"
+    exif[TAG_ARTIST] = "autor antigo"
+    xmp = (
+        b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+        b'<rdf:Description rdf:about="" xmlns:photoshop="http://ns.adobe.com/photoshop/1.0/" photoshop:City="Campinas"/>'
+        b"</rdf:RDF></x:xmpmeta>"
+    )
+    path = tmp_path / "fig.jpg"
+    figure(64, 48).save(path, quality=90, exif=exif.tobytes(), xmp=xmp)
+    return path
+
+
+def test_png_round_trip(png, tmp_path):
+    out = tmp_path / "out.png"
+    patch_file(png, out, FIELDS)
+    before, after = png.read_bytes(), out.read_bytes()
+
+    with Image.open(out) as im:
+        assert im.text["Author"] == "Felipe Alberto Lei"
+        assert im.text["Copyright"] == "© 2025 Logik Bioinfo"
+        assert im.text["License"] == "Todos os direitos reservados."
+        assert im.text["Software"] == "matplotlib"
+        pixels = np.asarray(im)
+    with Image.open(png) as im:
+        assert np.array_equal(pixels, np.asarray(im))
+    idat = lambda data: [body for kind, body in _png_chunks(data) if kind == b"IDAT"]
+    assert idat(after) == idat(before)
+    assert [kind for kind, body in _png_chunks(after) if body.startswith(b"Author\x00")] == [b"tEXt"]
+
+
+def test_png_non_latin1_uses_itxt(png, tmp_path):
+    out = tmp_path / "out.png"
+    patch_file(png, out, {"Author": "フェリペ"})
+    assert any(kind == b"iTXt" for kind, _ in _png_chunks(out.read_bytes()))
+    with Image.open(out) as im:
+        assert im.text["Author"] == "フェリペ"
+
+
+def test_jpeg_round_trip(jpeg, tmp_path):
+    out = tmp_path / "out.jpg"
+    patch_file(jpeg, out, FIELDS)
+    before, after = jpeg.read_bytes(), out.read_bytes()
+    assert _jpeg_scan(after) == _jpeg_scan(before)
+
+    with Image.open(out) as im:
+        exif = im.getexif()
+        assert exif[TAG_ARTIST] == "Felipe Alberto Lei"
+        # ASCII do EXIF gravado em UTF-8 (como o save_with_metadata via piexif); o Pillow lê como Latin-1
+        assert exif[TAG_COPYRIGHT].encode("latin-1").decode("utf-8") == "© 2025 Logik Bioinfo"
+        assert exif[TAG_MAKE] == "Scanner"
+        assert bytes(exif[TAG_XP_AUTHOR]).decode("utf-16-le").rstrip("\x00") == "Felipe Alberto Lei"
+        xmp = im.info["xmp"].decode("utf-8")
+        pixels = np.asarray(im)
+    with Image.open(jpeg) as im:
+        assert np.array_equal(pixels, np.asarray(im))
+    assert 'photoshop:City="Campinas"' in xmp
+    assert "© 2025 Logik Bioinfo" in xmp and "https://logikbioinfo.com" in xmp
+
+
+@pytest.mark.parametrize("fixture", ["png", "jpeg"])
+def test_repatch_is_idempotent(request, fixture, tmp_path):
+    src = request.getfixturevalue(fixture)
+    once, twice = tmp_path / f"once{src.suffix}", tmp_path / f"twice{src.suffix}"
+    patch_file(src, once, FIELDS)
+    patch_file(once, twice, FIELDS)
+    assert twice.read_bytes() == once.read_bytes()
+
+    # Patch no próprio arquivo (troca atômica) também não acumula
+    patch_file(twice, twice, FIELDS)
+    assert twice.read_bytes() == once.read_bytes()
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+
+
+def test_unsupported_format_keeps_destination(tmp_path):
+    src = tmp_path / "fig.gif"
+    figure(8, 8).convert("P").save(src)
+    with pytest.raises(ValueError):
+        patch_file(src, tmp_path / "out.gif", FIELDS)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fig.gif"]
+
+
+def test_partial_fields_keep_existing(png, tmp_path):
+    out = tmp_path / "out.png"
+    patch_file(png, out, {"License": "CC BY 4.0"})
+    with Image.open(io.BytesIO(out.read_bytes())) as im:
+        assert im.text["Author"] == "autor antigo"
+        assert im.text["License"] == "CC BY 4.0"
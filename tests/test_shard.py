@@ -0,0 +1,80 @@
+"""--shard i/N: partição disjunta e completa; o merge acusa shards ausentes e divergências."""
+import json
+
+import pytest
+
+from conftest import figure
+from shard import Shard, merge_reports, parse_shard
+
+N = 3
+
+
+@pytest.fixture
+def figs(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    for i in range(8):
+        figure(40 + i, 30, seed=i).save(src / f"fig{i}.png")
+    return src
+
+
+def _run_shards(run_tool, figs, out, *extra):
+    for i in range(1, N + 1):
+        run_tool("watermark_tiled.py", "--dir", figs, "--outdir", out / f"node{i}", "--shard", f"{i}/{N}", *extra)
+    return [out / f"node{i}" / f"shard-{i}-of-{N}.json" for i in range(1, N + 1)]
+
+
+def test_parse_shard():
+    assert parse_shard(None) is None
+    assert parse_shard("2/4") == Shard(2, 4)
+    for bad in ("0/3", "4/3", "1/0", "a/b", "3"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_partition_is_disjoint_and_complete(tmp_path, figs, run_tool):
+    reports = _run_shards(run_tool, figs, tmp_path)
+    owned = [set(json.loads(p.read_text(encoding="utf-8"))["results"]) for p in reports]
+    names = {p.name for p in figs.iterdir()}
+    assert set().union(*owned) == names
+    assert sum(len(s) for s in owned) == len(names)
+
+    # Cada nó grava só as saídas do seu shard
+    for i, units in enumerate(owned, start=1):
+        written = {p.name for p in (tmp_path / f"node{i}").glob("*_wm.png")}
+        assert written == {name.replace(".png", "_wm.png") for name in units}
+
+    merged = merge_reports(reports)
+    assert merged["complete"], merged["problems"]
+    assert set(merged["units"]) == names
+
+
+def test_partition_follows_content_not_name(tmp_path, figs, run_tool):
+    first = _run_shards(run_tool, figs, tmp_path / "a")
+    (figs / "fig0.png").rename(figs / "renamed.png")
+    second = _run_shards(run_tool, figs, tmp_path / "b")
+    shard_of = lambda reports, name: next(
+        i for i, p in enumerate(reports) if name in json.loads(p.read_text(encoding="utf-8"))["results"]
+    )
+    assert shard_of(first, "fig0.png") == shard_of(second, "renamed.png")
+
+
+def test_merge_reports_missing_and_divergent_shards(tmp_path, figs, run_tool):
+    reports = _run_shards(run_tool, figs, tmp_path)
+    missing = merge_reports(reports[:-1])
+    assert not missing["complete"]
+    assert any(f"{N}/{N}" in p for p in missing["problems"])
+
+    other = tmp_path / "other"
+    run_tool("watermark_tiled.py", "--dir", figs, "--outdir", other, "--shard", f"{N}/{N}", "--opacity", "0.5")
+    divergent = merge_reports(reports[:-1] + [other / f"shard-{N}-of-{N}.json"])
+    assert not divergent["complete"]
+    assert any("'params'" in p for p in divergent["problems"])
+
+
+def test_merge_command_exit_code(tmp_path, figs, run_tool):
+    reports = _run_shards(run_tool, figs, tmp_path)
+    out = tmp_path / "merged.json"
+    assert "OK: 8 unidade(s)" in run_tool("shard.py", "merge", *reports, "--out", out)
+    assert json.loads(out.read_text(encoding="utf-8"))["complete"]
+    assert "ERRO: shard(s) ausente(s)" in run_tool("shard.py", "merge", *reports[:-1], check=False)
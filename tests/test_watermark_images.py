@@ -0,0 +1,67 @@
+"""A marca visível composta só na região do texto sai igual ao caminho original."""
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+import watermark_images
+from conftest import default_font, figure
+
+
+def baseline_visible(im, text, font, mode="diagonal", opacity=0.2, margin=24):
+    """Caminho original: overlay em tamanho cheio e, na diagonal, a camada inteira girada."""
+    base = im.convert("RGBA")
+    W, H = base.size
+    overlay = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+    fill = (255, 255, 255, int(255 * max(0.0, min(1.0, opacity))))
+    if mode == "corner":
+        draw = ImageDraw.Draw(overlay)
+        l, t, r, b = draw.textbbox((0, 0), text, font=font)
+        x, y = W - (r - l) - margin, H - (b - t) - margin
+        draw.text((x + 2, y + 2), text, font=font, fill=(0, 0, 0, int(255 * opacity * 0.8)))
+        draw.text((x, y), text, font=font, fill=fill)
+    else:
+        tmp = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(tmp)
+        l, t, r, b = draw.textbbox((0, 0), text, font=font)
+        x, y = W // 2 - (r - l) // 2, H // 2 - (b - t) // 2
+        draw.text((x + 3, y + 3), text, font=font, fill=(0, 0, 0, int(255 * opacity * 0.6)))
+        draw.text((x, y), text, font=font, fill=fill)
+        overlay = Image.alpha_composite(overlay, tmp.rotate(30, resample=Image.BICUBIC, expand=False))
+    return Image.alpha_composite(base, overlay)
+
+
+@pytest.fixture(autouse=True)
+def fixed_font(monkeypatch):
+    monkeypatch.setattr(watermark_images, "load_font", default_font)
+
+
+def _both(size, mode, image_mode="RGB", **kwargs):
+    image = figure(*size).convert(image_mode)
+    font = default_font(None, max(14, int(size[0] * kwargs.get("scale", 0.06))))
+    expected = baseline_visible(image, "© Test", font, mode, kwargs.get("opacity", 0.2))
+    result = watermark_images.add_visible_watermark(image, "© Test", mode=mode, **kwargs)
+    return np.asarray(result).astype(int), np.asarray(expected).astype(int)
+
+
+@pytest.mark.parametrize("image_mode", ["RGB", "RGBA", "L"])
+@pytest.mark.parametrize("mode", ["diagonal", "corner"])
+def test_matches_baseline(mode, image_mode):
+    result, expected = _both((600, 400), mode, image_mode)
+    assert np.array_equal(result, expected)
+
+
+def test_matches_baseline_large_text():
+    result, expected = _both((320, 240), "diagonal", scale=0.2, opacity=0.7)
+    assert np.array_equal(result, expected)
+
+
+@pytest.mark.parametrize("mode", ["diagonal", "corner"])
+def test_odd_size_rounding(mode):
+    # Em tamanhos ímpares o Pillow arredonda as coordenadas da rotação de um
+    # recorte um pouco diferente da imagem inteira: poucos pixels, +-2 no máximo.
+    result, expected = _both((233, 157), mode)
+    diff = np.abs(result - expected)
+    assert diff.max() <= 2
+    assert np.count_nonzero(diff.any(axis=-1)) <= 8
+    if mode == "corner":
+        assert diff.max() == 0
@@ -0,0 +1,68 @@
+"""O padrão repetido montado em bloco e em cache sai igual ao caminho original."""
+import math
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+import watermark_tiled
+from conftest import default_font, figure
+
+
+def baseline_tiled(image, text, font, opacity=0.22, angle=30.0, spacing=2.2, color="#FFFFFF",
+                   stroke_width=2, stroke_color="#000000", stroke_opacity=0.5, offset_x=0, offset_y=0):
+    """Caminho original: tile a tile numa tela do tamanho da diagonal, girada inteira e recortada."""
+    base = image.convert("RGBA")
+    W, H = base.size
+    fill = watermark_tiled.parse_color(color, opacity)
+    stroke_fill = watermark_tiled.parse_color(stroke_color, stroke_opacity) if stroke_width > 0 else (0, 0, 0, 0)
+    padding = max(8, font.size // 6)
+
+    bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).textbbox((0, 0), text, font=font, stroke_width=stroke_width)
+    tile = Image.new("RGBA", (bbox[2] - bbox[0] + 2 * padding, bbox[3] - bbox[1] + 2 * padding), (0, 0, 0, 0))
+    ImageDraw.Draw(tile).text(
+        (padding, padding), text, font=font, fill=fill, stroke_width=stroke_width, stroke_fill=stroke_fill
+    )
+
+    tw, th = tile.size
+    canvas = int(math.hypot(W, H)) + max(tw, th) * 2
+    big = Image.new("RGBA", (canvas, canvas), (0, 0, 0, 0))
+    spacing = max(0.5, spacing)
+    step_x, step_y = max(1, int(tw * spacing)), max(1, int(th * spacing))
+    for y in range(-th + offset_y, canvas + th, step_y):
+        for x in range(-tw + offset_x, canvas + tw, step_x):
+            big.alpha_composite(tile, (x, y))
+    rotated = big.rotate(angle, resample=Image.BICUBIC, expand=False)
+    left, top = (canvas - W) // 2, (canvas - H) // 2
+    return Image.alpha_composite(base, rotated.crop((left, top, left + W, top + H)))
+
+
+@pytest.fixture(autouse=True)
+def fixed_font(monkeypatch):
+    monkeypatch.setattr(watermark_tiled, "load_font", default_font)
+    watermark_tiled.OVERLAY_CACHE.clear()
+
+
+@pytest.mark.parametrize("size", [(233, 157), (240, 160)])
+@pytest.mark.parametrize("params", [
+    {},
+    {"angle": 0},
+    {"angle": -45, "spacing": 0.7, "offset_x": 5, "offset_y": -3},
+    {"spacing": 1.0, "stroke_width": 0},
+    {"scale": 0.12, "opacity": 0.6, "color": "#3366CC"},
+])
+def test_matches_baseline(size, params):
+    image = figure(*size)
+    params = dict(params)
+    scale = params.pop("scale", 0.06)
+    font = default_font(None, max(16, int(size[0] * scale)))
+    expected = np.asarray(baseline_tiled(image, "© Test", font, **params))
+    result = np.asarray(watermark_tiled.apply_tiled_watermark(image, "© Test", scale=scale, **params))
+    assert np.array_equal(result, expected)
+
+
+def test_cached_overlay_gives_same_output():
+    first = np.asarray(watermark_tiled.apply_tiled_watermark(figure(200, 120, seed=1), "© Test"))
+    second = np.asarray(watermark_tiled.apply_tiled_watermark(figure(200, 120, seed=1), "© Test"))
+    assert len(watermark_tiled.OVERLAY_CACHE) == 1
+    assert np.array_equal(first, second)